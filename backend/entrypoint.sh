@@ -5,24 +5,17 @@ until nc -z db 5432; do
   sleep 1
 done
 
-echo "Postgres is up - running migrations"
-python manage.py migrate --noinput
+# migrate, collectstatic and the initial games in one process; each step is
+# skipped when its inputs are unchanged (BOOT_FORCE=1 runs them all)
+echo "Postgres is up - preparing the app"
+python manage.py boot ${BOOT_FORCE:+--force}
 
-echo "Collecting static files"
-python manage.py collectstatic --noinput
-
-echo "Checking if initial games need to be loaded..."
-python - << 'EOF'
-from games.models import GameModel
-from django.core.management import call_command
-
-# Load fixture only if DB is empty
-if not GameModel.objects.exists():
-    print("No games found — loading initial_games.json")
-    call_command('loaddata', 'initial_games.json')
-else:
-    print("Games already exist — skipping fixture load")
-EOF
+# DJANGO_SERVER=asgi serves the same project with uvicorn workers (async views
+# under /api/async/ then run on the event loop instead of a thread per request)
+if [ "$DJANGO_SERVER" = "asgi" ]; then
+  echo "Starting Gunicorn (ASGI, uvicorn workers)"
+  exec gunicorn exam_project.asgi:application -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000
+fi
 
 echo "Starting Gunicorn"
 exec gunicorn exam_project.wsgi:application --bind 0.0.0.0:8000
@@ -15,6 +15,7 @@ class UserAdmin(auth_admin.UserAdmin):
         ('Personal info', {'fields': ('first_name', 'last_name', 'profile_picture', 'money')}),
         ('Permissions', {'fields': ('is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions')}),
         ('Important dates', {'fields': ('last_login', 'date_joined')}),
+        ('Activity', {'fields': ('games_count', 'bought_count', 'comments_count')}),
     )
 
     add_fieldsets = (
@@ -24,6 +25,7 @@ class UserAdmin(auth_admin.UserAdmin):
         }),
     )
 
-    list_display = ('id', 'email', 'first_name', 'last_name', 'is_staff', 'is_active', 'profile_picture')
+    list_display = ('id', 'email', 'first_name', 'last_name', 'is_staff', 'is_active', 'profile_picture', 'games_count')
+    readonly_fields = ('games_count', 'bought_count', 'comments_count')
     search_fields = ('email', 'first_name', 'last_name')
     ordering = ('email',)
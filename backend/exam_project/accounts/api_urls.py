@@ -5,6 +5,7 @@ from .api_views import (
     UserDetailApiView,
     SignUpApiView,
     DeleteUserApiView,
+    AuthUserCacheStatsApiView,
 )
 
 urlpatterns = [
@@ -13,4 +14,5 @@ urlpatterns = [
     path('users/<int:pk>/', UserDetailApiView.as_view(), name='accounts_user_detail'),
     path('signup/', SignUpApiView.as_view(), name='accounts_signup'),
     path('delete/<int:pk>/', DeleteUserApiView.as_view(), name='accounts_delete'),
+    path('auth-cache/', AuthUserCacheStatsApiView.as_view(), name='accounts_auth_cache'),
 ]
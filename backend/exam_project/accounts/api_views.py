@@ -6,15 +6,27 @@ from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.parsers import MultiPartParser, FormParser
+from exam_project.common.conditional import conditional_get, timestamp, weak_etag
+from .user_cache import user_cache
 from .serializers import AppUserSerializer, AppUserUpdateSerializer
 
 User = get_user_model()
 
 
+def me_validators(request, *args, **kwargs):
+    # request.user is already loaded by authentication: no extra query
+    user = request.user
+    return weak_etag('user', user.pk, timestamp(user.updated_at)), user.updated_at
+
+
 class MeRetrieveUpdateApiView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
 
+    @conditional_get(me_validators)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_object(self):
         return self.request.user
 
@@ -108,3 +120,11 @@ class DeleteUserApiView(APIView):
 
         user.delete()
         return Response(status=204)
+
+
+class AuthUserCacheStatsApiView(APIView):
+    """Hit/miss counters of the authenticated-user cache in the worker serving this request."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(user_cache.stats())
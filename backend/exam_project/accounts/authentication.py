@@ -0,0 +1,47 @@
+"""
+JWT authentication with the user lookup served from accounts.user_cache.
+
+A cache hit skips the `SELECT ... FROM accounts_appuser` that simplejwt runs
+for every request. The active and revoked-token checks still run on every
+hit. Without a shared cache backend the user cache is off and this is plain
+JWTAuthentication.
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from exam_project.accounts.user_cache import cache_id, user_cache, user_version
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        if not user_cache.enabled:
+            return super().get_user(validated_token)
+        user_id = self.get_user_id(validated_token)
+        version = user_version(user_id)
+        user = user_cache.lookup(cache_id(user_id), version)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.store(cache_id(user_id), user, version)
+            return user
+        return self.check_user(user, validated_token)
+
+    @staticmethod
+    def get_user_id(validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    @staticmethod
+    def check_user(user, validated_token):
+        """simplejwt's per-request checks, for a user that did not come from the database."""
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
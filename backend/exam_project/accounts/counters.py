@@ -0,0 +1,82 @@
+"""
+Denormalized per-user counters on AppUser.
+
+Kept up to date incrementally by accounts.signals; code paths that bypass
+model signals (bulk_create, raw SQL) must call `adjust_user_counter` themselves.
+`reconcile_user_counters` rebuilds every counter from the source tables.
+Both invalidate the cached authenticated users (accounts.user_cache).
+"""
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from exam_project.accounts.user_cache import invalidate_users
+
+UserModel = get_user_model()
+
+
+def counted_relations():
+    from exam_project.common.models import BoughtGame, GameComment
+    from exam_project.games.models import GameModel
+
+    return {
+        'games_count': GameModel,
+        'bought_count': BoughtGame,
+        'comments_count': GameComment,
+    }
+
+
+def adjust_user_counter(field, deltas):
+    """Apply `{user_id: delta}` to `field`, one UPDATE per distinct delta."""
+    by_delta = {}
+    for user_id, delta in Counter(deltas).items():
+        if user_id is not None and delta:
+            by_delta.setdefault(delta, []).append(user_id)
+
+    for delta, user_ids in by_delta.items():
+        UserModel.objects.filter(pk__in=user_ids).update(**{
+            field: Greatest(F(field) + delta, Value(0)),
+            'updated_at': timezone.now(),
+        })
+        invalidate_users(user_ids)
+
+
+def _count_subquery(model):
+    return Coalesce(
+        Subquery(
+            model.objects
+            .filter(user=OuterRef('pk'))
+            .order_by()
+            .values('user')
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def reconcile_user_counters(users=None):
+    """
+    Recompute counters in bulk, for every user or only the `users` queryset.
+    Returns the number of users that had drifted.
+    """
+    relations = counted_relations()
+    actual = {f'actual_{field}': _count_subquery(model) for field, model in relations.items()}
+
+    drift = Q()
+    for field in relations:
+        drift |= ~Q(**{field: F(f'actual_{field}')})
+    users = UserModel.objects.all() if users is None else users
+    drifted = list(users.annotate(**actual).filter(drift).values_list('pk', flat=True))
+
+    if drifted:
+        UserModel.objects.filter(pk__in=drifted).update(
+            updated_at=timezone.now(),
+            **{field: _count_subquery(model) for field, model in relations.items()},
+        )
+        invalidate_users(drifted)
+    return len(drifted)
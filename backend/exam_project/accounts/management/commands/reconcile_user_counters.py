@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from exam_project.accounts.counters import reconcile_user_counters
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the games/bought/comments counters on every user in bulk"
+
+    def handle(self, *args, **kwargs):
+        drifted = reconcile_user_counters()
+        if drifted:
+            self.stdout.write(self.style.WARNING(f"Fixed counters for {drifted} user(s)."))
+        else:
+            self.stdout.write(self.style.SUCCESS("All user counters are in sync."))
@@ -0,0 +1,53 @@
+# Generated by Django 4.2 on 2026-10-18 16:14
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    AppUser = apps.get_model('accounts', 'AppUser')
+    relations = {
+        'games_count': apps.get_model('games', 'GameModel'),
+        'bought_count': apps.get_model('common', 'BoughtGame'),
+        'comments_count': apps.get_model('common', 'GameComment'),
+    }
+    AppUser.objects.update(**{
+        field: Coalesce(
+            Subquery(
+                model.objects.filter(user=OuterRef('pk')).order_by().values('user')
+                .annotate(total=Count('pk')).values('total'),
+                output_field=IntegerField(),
+            ),
+            0,
+        )
+        for field, model in relations.items()
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('games', '0007_gamemodel_search_vector'),
+        ('common', '0003_gamecomment_profile_picture'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appuser',
+            name='bought_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='appuser',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='appuser',
+            name='games_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -25,9 +25,17 @@ class AppUser(AbstractBaseUser, PermissionsMixin):
     last_name = models.CharField(max_length=30, blank=True, null=True)
     money = models.PositiveIntegerField(default=0)
     profile_picture = models.ImageField(upload_to="profile_pics/", blank=True, null=True)
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     date_joined = models.DateTimeField(default=timezone.now)
+    # auto_now only covers save(); queryset updates of money/counters set it explicitly
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Denormalized counters, maintained by accounts.signals (see accounts.counters)
+    games_count = models.PositiveIntegerField(default=0, editable=False)
+    bought_count = models.PositiveIntegerField(default=0, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
 
     objects = AppUserManager()
 
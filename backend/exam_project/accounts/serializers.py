@@ -1,12 +1,10 @@
 from rest_framework import serializers
 from .models import AppUser
-from ..games.models import GameModel
 
 
 class AppUserSerializer(serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
     display_name = serializers.ReadOnlyField()
-    games_count = serializers.SerializerMethodField()
 
     class Meta:
         model = AppUser
@@ -14,13 +12,9 @@ class AppUserSerializer(serializers.ModelSerializer):
             'id', 'email', 'first_name', 'last_name',
             'full_name', 'display_name',
             'money', 'profile_picture',
-            'games_count',
+            'games_count', 'bought_count', 'comments_count',
         ]
-        read_only_fields = ['id', 'full_name', 'display_name', 'games_count']
-
-    def get_games_count(self, obj):
-        # Count games created by this user
-        return GameModel.objects.filter(user=obj).count()
+        read_only_fields = ['id', 'full_name', 'display_name', 'games_count', 'bought_count', 'comments_count']
 
 
 class AppUserUpdateSerializer(serializers.ModelSerializer):
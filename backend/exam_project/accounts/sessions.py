@@ -0,0 +1,161 @@
+"""
+Cache-first session engine for the HTML views (SESSION_ENGINE).
+
+Like django.contrib.sessions.backends.cached_db, a session is read from the
+cache and only falls back to django_session on a miss, so a signed-in page
+costs no session query. Writes are lazier:
+
+* creating a session, and any change to the login state (the `_auth_user_*`
+  keys), is written through to the database at once, so a login survives a
+  cache flush and a logout is never undone by it;
+* any other change goes to the cache at once and to the database on the first
+  save at least SESSION_PERSIST_INTERVAL seconds after the last database
+  write. A session saved on every request (SESSION_SAVE_EVERY_REQUEST) is
+  therefore not rewritten every time. If its cache entry is evicted, the
+  session falls back to the last persisted copy.
+
+Expired rows are deleted in batches: one batch every PURGE_EVERY session
+inserts, and `clearsessions` loops `clear_expired` until none are left, so
+django_session stays bounded instead of growing forever.
+
+The cache must be shared by every worker (memcached, Redis, the database
+cache...): with a per-process LocMemCache a logout handled by one worker would
+leave the session alive in the others' caches. The engine refuses to start on
+such a backend, see `check_cache`.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from exam_project.common.cache_backends import is_shared
+
+KEY_PREFIX = 'exam_project.accounts.sessions'
+AUTH_KEY_PREFIX = '_auth_user'
+PERSIST_INTERVAL = getattr(settings, 'SESSION_PERSIST_INTERVAL', 300)
+PURGE_BATCH_SIZE = getattr(settings, 'SESSION_PURGE_BATCH_SIZE', 1000)
+# Purge one batch of expired sessions every PURGE_EVERY inserts
+PURGE_EVERY = 100
+INSERTS_KEY = 'accounts:session-inserts'
+
+
+def check_cache(cache):
+    if not is_shared(cache):
+        raise ImproperlyConfigured(
+            f'{__name__} needs a cache shared by all workers, but SESSION_CACHE_ALIAS '
+            f'"{settings.SESSION_CACHE_ALIAS}" is a {type(cache).__name__}. Configure a shared '
+            f'backend or use SESSION_ENGINE = "django.contrib.sessions.backends.db".'
+        )
+    return cache
+
+
+def _auth_state(data):
+    return {key: value for key, value in data.items() if key.startswith(AUTH_KEY_PREFIX)}
+
+
+class SessionStore(DBStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        self._cache = check_cache(caches[settings.SESSION_CACHE_ALIAS])
+        # {'data', 'auth', 'persisted_at'}: what the cache holds for this session
+        self._entry = None
+        super().__init__(session_key)
+
+    @property
+    def cache_key(self):
+        return self.cache_key_prefix + self._get_or_create_session_key()
+
+    def load(self):
+        try:
+            entry = self._cache.get(self.cache_key)
+        except Exception:
+            # Some backends (e.g. memcache) reject invalid keys, as in cached_db
+            entry = None
+
+        if entry is None:
+            s = self._get_session_from_db()
+            if s is None:
+                self._entry = None
+                return {}
+            data = self.decode(s.session_data)
+            entry = {'data': data, 'auth': _auth_state(data), 'persisted_at': time.time()}
+            self._cache.set(self.cache_key, entry, self.get_expiry_age(expiry=s.expire_date))
+
+        self._entry = entry
+        return entry['data']
+
+    def exists(self, session_key):
+        return (
+            session_key
+            and (self.cache_key_prefix + session_key) in self._cache
+            or super().exists(session_key)
+        )
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        entry = self._entry
+
+        persist = (
+            must_create
+            or entry is None
+            or _auth_state(data) != entry['auth']
+            or time.time() - entry['persisted_at'] >= PERSIST_INTERVAL
+        )
+        if persist:
+            super().save(must_create)
+            entry = {'auth': _auth_state(data), 'persisted_at': time.time()}
+            if must_create:
+                self._count_insert()
+
+        self._entry = {**entry, 'data': data}
+        self._cache.set(self.cache_key, self._entry, self.get_expiry_age())
+
+    def delete(self, session_key=None):
+        super().delete(session_key)
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        self._cache.delete(self.cache_key_prefix + session_key)
+
+    def _count_insert(self):
+        try:
+            inserts = self._cache.incr(INSERTS_KEY)
+        except ValueError:
+            self._cache.add(INSERTS_KEY, 1, timeout=None)
+            inserts = 1
+        if inserts % PURGE_EVERY == 0:
+            purge_expired_sessions()
+
+    @classmethod
+    def clear_expired(cls, batch_size=PURGE_BATCH_SIZE):
+        """Delete every expired session, one batch at a time; returns how many were removed."""
+        total = 0
+        while True:
+            deleted = purge_expired_sessions(batch_size)
+            total += deleted
+            if deleted < batch_size:
+                return total
+
+
+def purge_expired_sessions(batch_size=PURGE_BATCH_SIZE, now=None):
+    """Delete up to `batch_size` expired sessions; returns how many were removed."""
+    model = SessionStore.get_model_class()
+    expired = (
+        model.objects
+        .filter(expire_date__lt=now or timezone.now())
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    deleted, _ = model.objects.filter(pk__in=list(expired)).delete()
+    return deleted
+
+
+# SessionMiddleware imports the engine when the workers start: fail there
+if settings.SESSION_ENGINE == __name__:
+    check_cache(caches[settings.SESSION_CACHE_ALIAS])
@@ -0,0 +1,67 @@
+from contextvars import ContextVar
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from exam_project.accounts.counters import adjust_user_counter
+from exam_project.accounts.user_cache import invalidate_users
+from exam_project.common.models import BoughtGame, GameComment
+from exam_project.games.models import GameModel
+
+UserModel = get_user_model()
+
+COUNTER_FIELDS = {
+    GameModel: 'games_count',
+    BoughtGame: 'bought_count',
+    GameComment: 'comments_count',
+}
+
+# Users currently being deleted: their cascaded rows need no counter updates
+_deleting_user_ids = ContextVar('deleting_user_ids', default=frozenset())
+
+
+@receiver(pre_delete, sender=UserModel)
+def mark_user_deleting(sender, instance, **kwargs):
+    _deleting_user_ids.set(_deleting_user_ids.get() | {instance.pk})
+
+
+@receiver(post_delete, sender=UserModel)
+def unmark_user_deleting(sender, instance, **kwargs):
+    _deleting_user_ids.set(_deleting_user_ids.get() - {instance.pk})
+
+
+@receiver(post_save, sender=UserModel)
+@receiver(post_delete, sender=UserModel)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_users([instance.pk])
+
+
+@receiver(post_init, sender=GameModel)
+def remember_game_owner(sender, instance, **kwargs):
+    # Games can change owner (admin); remember who was counted. Skip deferred loads.
+    if 'user_id' in instance.__dict__:
+        instance._counted_user_id = instance.user_id
+
+
+@receiver(post_save, sender=GameModel)
+@receiver(post_save, sender=BoughtGame)
+@receiver(post_save, sender=GameComment)
+def count_created(sender, instance, created, **kwargs):
+    field = COUNTER_FIELDS[sender]
+    if created:
+        adjust_user_counter(field, {instance.user_id: 1})
+    elif sender is GameModel and hasattr(instance, '_counted_user_id'):
+        if instance._counted_user_id != instance.user_id:
+            adjust_user_counter(field, {instance._counted_user_id: -1, instance.user_id: 1})
+
+    if sender is GameModel:
+        instance._counted_user_id = instance.user_id
+
+
+@receiver(post_delete, sender=GameModel)
+@receiver(post_delete, sender=BoughtGame)
+@receiver(post_delete, sender=GameComment)
+def count_deleted(sender, instance, **kwargs):
+    if instance.user_id not in _deleting_user_ids.get():
+        adjust_user_counter(COUNTER_FIELDS[sender], {instance.user_id: -1})
@@ -1,9 +1,41 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from exam_project.accounts import sessions
+from exam_project.accounts.counters import reconcile_user_counters
+from exam_project.accounts.sessions import SessionStore
+from exam_project.accounts.user_cache import UserCache, user_cache
+from exam_project.accounts.user_context import user_context
+from exam_project.common.models import BoughtGame, GameComment
+from exam_project.context_processors import user_money
+from exam_project.games.models import GameModel
+from exam_project.games.purchases import purchase_game
 
 UserModel = get_user_model()
 
+# A cache every process would see, as cached sessions and the user cache require
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.mkdtemp(),
+    }
+}
+
 
 class AccountsTests(TestCase):
     def test_user_can_register(self):
@@ -23,3 +55,222 @@ class AccountsTests(TestCase):
         })
         self.assertEqual(response.status_code, 302)
         self.assertIn('_auth_user_id', self.client.session)
+
+
+class UserCounterTests(TestCase):
+    def setUp(self):
+        self.seller = UserModel.objects.create_user(email='seller@example.com', password='StrongPass123!')
+        self.buyer = UserModel.objects.create_user(email='buyer@example.com', password='StrongPass123!')
+        self.game = GameModel.objects.create(title='Counted', category='ACTION', price='20.00', user=self.seller)
+        BoughtGame.objects.create(user=self.buyer, game=self.game)
+        GameComment.objects.create(user=self.buyer, game=self.game, text='Nice')
+
+    def test_counters_follow_creates_and_cascades(self):
+        self.seller.refresh_from_db()
+        self.buyer.refresh_from_db()
+        self.assertEqual(self.seller.games_count, 1)
+        self.assertEqual((self.buyer.bought_count, self.buyer.comments_count), (1, 1))
+
+        self.game.delete()
+        self.seller.refresh_from_db()
+        self.buyer.refresh_from_db()
+        self.assertEqual(self.seller.games_count, 0)
+        self.assertEqual((self.buyer.bought_count, self.buyer.comments_count), (0, 0))
+
+    def test_owner_change_moves_count(self):
+        self.game.user = self.buyer
+        self.game.save()
+        self.seller.refresh_from_db()
+        self.buyer.refresh_from_db()
+        self.assertEqual((self.seller.games_count, self.buyer.games_count), (0, 1))
+
+    def test_seed_bulk_create_is_counted(self):
+        self.client.login(username='seller@example.com', password='StrongPass123!')
+        self.client.get(reverse('seed games'))
+        self.seller.refresh_from_db()
+        self.assertEqual(self.seller.games_count, GameModel.objects.filter(user=self.seller).count())
+
+    def test_reconcile_fixes_drift(self):
+        UserModel.objects.update(games_count=7, bought_count=0)
+        self.assertEqual(reconcile_user_counters(), 2)
+        self.seller.refresh_from_db()
+        self.buyer.refresh_from_db()
+        self.assertEqual((self.seller.games_count, self.buyer.bought_count), (1, 1))
+        self.assertEqual(reconcile_user_counters(), 0)
+
+    def test_users_list_has_no_per_row_count_query(self):
+        admin = UserModel.objects.create_superuser(email='admin@example.com', password='StrongPass123!')
+        client = APIClient()
+        client.force_authenticate(admin)
+        with self.assertNumQueries(2):  # COUNT for pagination + one page of users
+            response = client.get(reverse('accounts_users'))
+        counts = {u['email']: u['games_count'] for u in response.json()['results']}
+        self.assertEqual(counts['seller@example.com'], 1)
+
+
+class MeConditionalGetTests(TestCase):
+    def test_me_etag_changes_with_balance(self):
+        user = UserModel.objects.create_user(email='me@example.com', password='StrongPass123!', money=50)
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse('accounts_me')
+        etag = client.get(url)['ETag']
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        seller = UserModel.objects.create_user(email='seller@example.com', password='StrongPass123!')
+        game = GameModel.objects.create(title='Wallet', category='ACTION', price='20.00', user=seller)
+        purchase_game(user, game.pk)
+        user.refresh_from_db()
+        client.force_authenticate(user)
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(CACHES=SHARED_CACHES)
+class AuthUserCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.user = UserModel.objects.create_user(email='cached@example.com', password='StrongPass123!', money=100)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.url = reverse('accounts_me')
+
+    def test_repeated_token_skips_the_user_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).json()['email'], 'cached@example.com')
+        self.assertEqual((user_cache.hits, user_cache.misses), (1, 1))
+
+    def test_purchase_and_save_invalidate(self):
+        seller = UserModel.objects.create_user(email='shop@example.com', password='StrongPass123!')
+        game = GameModel.objects.create(title='Cached Buy', category='ACTION', price='19.50', user=seller)
+        self.client.get(self.url)
+
+        self.assertEqual(self.client.post(reverse('games_buy', args=[game.pk])).status_code, 201)
+        self.assertEqual(self.client.get(self.url).json()['money'], 80)
+
+        UserModel.objects.filter(pk=self.user.pk).update(first_name='Bypassed')
+        self.assertNotEqual(self.client.get(self.url).json()['first_name'], 'Bypassed')  # TTL-bound staleness
+
+        self.user.refresh_from_db()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_off_without_a_shared_cache(self):
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            self.assertFalse(user_cache.enabled)
+            for _ in range(2):
+                with self.assertNumQueries(1):
+                    self.client.get(self.url)
+        self.assertEqual((user_cache.hits, user_cache.misses), (0, 0))
+
+    def test_lru_and_ttl(self):
+        now = [0.0]
+        cache = UserCache(max_size=2, ttl=10, clock=lambda: now[0])
+        for user_id in ('1', '2', '3'):
+            cache.store(user_id, self.user, version=1)
+        self.assertIsNone(cache.lookup('1', 1))
+        self.assertIsNotNone(cache.lookup('2', 1))
+        self.assertIsNot(cache.lookup('2', 1), self.user)
+        self.assertIsNone(cache.lookup('3', 2))  # stale version
+        now[0] = 11
+        self.assertIsNone(cache.lookup('2', 1))
+        self.assertEqual((cache.hits, cache.evictions), (2, 1))
+
+    def test_stats_are_admin_only(self):
+        self.assertEqual(self.client.get(reverse('accounts_auth_cache')).status_code, 403)
+        admin = UserModel.objects.create_superuser(email='admin@example.com', password='StrongPass123!')
+        client = APIClient()
+        client.force_authenticate(admin)
+        stats = client.get(reverse('accounts_auth_cache')).json()
+        self.assertLessEqual({'hits', 'misses', 'hit_rate', 'size', 'pid'}, set(stats))
+
+
+class UserContextTests(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(email='ctx@example.com', password='StrongPass123!', money=250)
+        self.client.force_login(self.user)
+
+    def test_context_processor_is_lazy(self):
+        loads = []
+        request = RequestFactory().get('/')
+        request.user = SimpleLazyObject(lambda: loads.append(1) or self.user)
+
+        context = user_money(request)
+        self.assertEqual(loads, [])
+        self.assertIs(context['user_context'], user_context(request))
+        self.assertEqual((str(context['profile_money']), context['user_context'].owned_count), ('250', 0))
+        self.assertEqual(loads, [1])
+
+    def test_pages_show_balance_and_bought_games_skip_count(self):
+        seller = UserModel.objects.create_user(email='ctx-seller@example.com', password='StrongPass123!')
+        for i in range(3):
+            purchase_game(self.user, GameModel.objects.create(title=f'Ctx {i}', category='ACTION', price='10.00', user=seller).pk)
+
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, 'Balance:&nbsp;$220.00')
+
+        # session, user, page of bought games, total spent
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('bought games'))
+        self.assertContains(response, '<strong>$30.00</strong>')
+        self.assertEqual(response.context['page_obj'].paginator.count, 3)
+
+
+@override_settings(CACHES=SHARED_CACHES, SESSION_ENGINE='exam_project.accounts.sessions')
+class CachedSessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel.objects.create_user(email='session@example.com', password='StrongPass123!')
+        self.client.force_login(self.user)
+
+    def session(self):
+        return SessionStore(self.client.cookies[settings.SESSION_COOKIE_NAME].value)
+
+    def test_signed_in_page_skips_the_session_query(self):
+        self.client.get(reverse('index'))
+        with CaptureQueriesContext(connection) as cached:
+            self.client.get(reverse('index'))
+        self.assertFalse(any('django_session' in q['sql'] for q in cached.captured_queries))
+
+        with override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db'):
+            client = Client()
+            client.force_login(self.user)
+            with CaptureQueriesContext(connection) as db:
+                client.get(reverse('index'))
+        self.assertEqual(len(db), len(cached) + 1)
+
+    def test_login_state_is_written_through_and_other_keys_lazily(self):
+        session = self.session()
+        session['basket'] = [1, 2]
+        session.save()
+        self.assertNotIn('basket', Session.objects.get(pk=session.session_key).get_decoded())
+        self.assertEqual(self.session()['basket'], [1, 2])
+
+        with mock.patch.object(sessions, 'PERSIST_INTERVAL', 0):
+            session['basket'] = [3]
+            session.save()
+        self.assertEqual(Session.objects.get(pk=session.session_key).get_decoded()['basket'], [3])
+
+        cache.delete(session.cache_key)  # evicted: falls back to the persisted copy
+        self.assertEqual(self.session()['_auth_user_id'], str(self.user.pk))
+
+        self.client.logout()
+        self.assertFalse(Session.objects.filter(pk=session.session_key).exists())
+        self.assertEqual(self.client.get(reverse('bought games')).status_code, 302)
+
+    def test_expired_sessions_are_purged_in_batches(self):
+        past = timezone.now() - timedelta(days=1)
+        Session.objects.bulk_create(
+            Session(session_key=f'expired{i:025d}', session_data='', expire_date=past) for i in range(5)
+        )
+        self.assertEqual(sessions.purge_expired_sessions(batch_size=2), 2)
+        self.assertEqual(SessionStore.clear_expired(batch_size=2), 3)
+        self.assertEqual(Session.objects.count(), 1)  # the signed-in one
+
+    def test_refuses_a_per_process_cache(self):
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            with self.assertRaisesMessage(ImproperlyConfigured, 'LocMemCache'):
+                SessionStore()
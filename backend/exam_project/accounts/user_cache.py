@@ -0,0 +1,159 @@
+"""
+Per-process cache of authenticated users (see accounts.authentication).
+
+Each worker keeps a bounded LRU of AppUser instances with a TTL, so a
+repeated bearer token costs no SELECT on AppUser. Every entry remembers the
+user's version, a counter in the default Django cache that `invalidate_users`
+bumps. A hit therefore costs one cache read, and a change made by any worker
+invalidates the entry in all of them.
+
+That only holds when the default cache is shared by the workers. With a
+per-process backend (LocMemCache, the default) one worker's bump never reaches
+the others, which would keep authenticating a deactivated user until the TTL
+ran out: the cache is then disabled (`UserCache.enabled`) and every request
+loads its user from the database.
+
+Anything that writes AppUser rows must call `invalidate_users`:
+post_save/post_delete do it through accounts.signals. Queryset updates
+(balances in games.purchases, counters in accounts.counters) call it
+themselves.
+"""
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.db import transaction
+
+from exam_project.common.cache_backends import is_shared
+
+VERSION_KEY = 'accounts:user-version:{}'
+
+
+class UserCache:
+    class _Entry:
+        __slots__ = ('user', 'version', 'expires')
+
+        def __init__(self, user, version, expires):
+            self.user, self.version, self.expires = user, version, expires
+
+    def __init__(self, max_size, ttl, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    @property
+    def enabled(self):
+        # Checked per request: the cache backend can change under override_settings
+        return self.max_size > 0 and is_shared(caches[DEFAULT_CACHE_ALIAS])
+
+    def lookup(self, user_id, version):
+        """A private copy of the cached user, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and (entry.version != version or entry.expires <= self.clock()):
+                del self._entries[user_id]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            # Views mutate request.user (refresh_from_db, save); never hand out the cached instance
+            return copy.copy(entry.user)
+
+    def store(self, user_id, user, version):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = self._Entry(copy.copy(user), version, self.clock() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                if self._entries.pop(user_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'pid': os.getpid(),
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+user_cache = UserCache(
+    max_size=getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 60),
+)
+
+
+# =====================================================
+# SHARED VERSIONS
+# =====================================================
+def cache_id(user_id):
+    # Token claims may carry the id as a string
+    return str(user_id)
+
+
+def user_version(user_id):
+    key = VERSION_KEY.format(cache_id(user_id))
+    version = cache.get(key)
+    if version is None:
+        # Seeded from the clock, like the catalog version: a lost key never
+        # re-validates entries stored under an older value
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def auser_version(user_id):
+    key = VERSION_KEY.format(cache_id(user_id))
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def _bump(user_ids):
+    ids = [cache_id(user_id) for user_id in user_ids if user_id is not None]
+    user_cache.discard(ids)
+    for user_id in ids:
+        key = VERSION_KEY.format(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def invalidate_users(user_ids):
+    """Drop cached copies of these users in every worker, now and again once the transaction commits."""
+    user_ids = list(user_ids)
+    _bump(user_ids)
+    # A request between the UPDATE and COMMIT may have re-cached the old row
+    transaction.on_commit(lambda: _bump(user_ids))
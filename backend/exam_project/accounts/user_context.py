@@ -0,0 +1,41 @@
+"""
+Per-request view of the signed-in user for templates and views.
+
+`user_context(request)` returns one `UserContext` per request. Its values
+(balance, owned-count, games-count) are computed on first access and kept for
+the rest of the request, so views and base.html share them instead of each
+reading request.user again. Nothing touches request.user, and so the session
+and AppUser lookups, until a value is read.
+
+The counts are the denormalized counters on AppUser (see accounts.counters),
+so none of them costs a COUNT query.
+"""
+from functools import cached_property
+
+
+class UserContext:
+    def __init__(self, request):
+        self.request = request
+
+    @cached_property
+    def user(self):
+        user = self.request.user
+        return user if user.is_authenticated else None
+
+    @cached_property
+    def balance(self):
+        return self.user.money if self.user else None
+
+    @cached_property
+    def owned_count(self):
+        return self.user.bought_count if self.user else 0
+
+    @cached_property
+    def games_count(self):
+        return self.user.games_count if self.user else 0
+
+
+def user_context(request):
+    if not hasattr(request, '_user_context'):
+        request._user_context = UserContext(request)
+    return request._user_context
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from exam_project.common.models import GameComment, BoughtGame
+from exam_project.common.models import GameComment, BoughtGame, IdempotencyKey
 
 
 @admin.register(GameComment)
@@ -14,3 +14,9 @@ class BoughtGameAdmin(admin.ModelAdmin):
     list_display = ('game', 'user')
     search_fields = ('user__email', 'game__title')
     list_filter = ('game',)
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ('key', 'user', 'status_code', 'created_at', 'expires_at')
+    search_fields = ('key', 'user__email')
@@ -1,7 +1,11 @@
 from django.urls import path
-from exam_project.common.api_views import CommentListCreateApiView, CommentDeleteApiView
+from exam_project.common.api_views import (
+    CommentListCreateApiView, CommentDeleteApiView, DatabasePoolStatsApiView, ExportApiView,
+)
 
 urlpatterns = [
     path("comments/<int:game_id>/", CommentListCreateApiView.as_view(), name="comment_list_create"),
     path("comments/delete/<int:pk>/", CommentDeleteApiView.as_view(), name="comment_delete"),
+    path("db-pool/", DatabasePoolStatsApiView.as_view(), name="db_pool_stats"),
+    path("exports/<slug:name>.<slug:file_format>", ExportApiView.as_view(), name="export"),
 ]
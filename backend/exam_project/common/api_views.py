@@ -1,19 +1,69 @@
+import hashlib
+
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import generics, permissions
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from exam_project.common.conditional import conditional_get, timestamp, weak_etag
+from exam_project.common.db.pool import pool_stats
+from exam_project.common.exports import EXPORTS, FORMATS, buffered, export_lines, gzip_stream
 from exam_project.common.models import GameComment
 from exam_project.common.serializers import GameCommentSerializer
+from exam_project.games.models import GameModel
+from exam_project.games.pagination_sort import CommentPagination
 
 from rest_framework.parsers import MultiPartParser, FormParser
 
 
+def comment_stats(game_id):
+    # The game's denormalized comment counters (games.signals): a primary-key
+    # lookup instead of aggregating the game's comments
+    return GameModel.objects.filter(pk=game_id).values_list('comments_count', 'comments_updated_at')
+
+
+def comments_etag(request, game_id, stats):
+    total, changed = stats or (0, None)
+    params = hashlib.sha1(request.META.get('QUERY_STRING', '').encode()).hexdigest()[:16]
+    return weak_etag('comments', game_id, total, timestamp(changed), params)
+
+
+def comments_validators(request, game_id, *args, **kwargs):
+    # ETag only, as before: a page's Last-Modified would need its own comments' times
+    return comments_etag(request, game_id, comment_stats(game_id).first()), None
+
+
+def game_comments(game_id):
+    return (
+        GameComment.objects
+        .filter(game_id=game_id)
+        .select_related("user")
+        .order_by("created_at", "id")
+    )
+
+
+def comments_total(game_id):
+    return GameModel.objects.filter(pk=game_id).values_list("comments_count", flat=True)
+
+
 class CommentListCreateApiView(generics.ListCreateAPIView):
 
     serializer_class = GameCommentSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)  # Allow file uploads
+    pagination_class = CommentPagination
+
+    @conditional_get(comments_validators)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
     def get_queryset(self):
-        game_id = self.kwargs["game_id"]
-        return GameComment.objects.filter(game_id=game_id).order_by("created_at")
+        return game_comments(self.kwargs["game_id"])
+
+    def get_total_count(self):
+        return comments_total(self.kwargs["game_id"]).first() or 0
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -27,7 +77,8 @@ class CommentListCreateApiView(generics.ListCreateAPIView):
         serializer.save(
             user=user,
             game_id=self.kwargs["game_id"],
-            profile_picture=user.profile_picture
+            profile_picture=user.profile_picture,
+            profile_picture_variants=user.profile_picture_variants,
         )
 
 
@@ -37,3 +88,29 @@ class CommentDeleteApiView(generics.DestroyAPIView):
 
     def get_queryset(self):
         return GameComment.objects.filter(user=self.request.user)
+
+
+class ExportApiView(APIView):
+    """Admin-only gzipped NDJSON/CSV dump of a whole table, streamed row by row."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, name, file_format):
+        if name not in EXPORTS or file_format not in FORMATS:
+            raise NotFound("Unknown export.")
+
+        filename = f"{name}-{timezone.now():%Y%m%d-%H%M%S}.{file_format}.gz"
+        response = StreamingHttpResponse(
+            gzip_stream(buffered(export_lines(name, file_format))),
+            content_type="application/gzip",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["Cache-Control"] = "no-store"
+        return response
+
+
+class DatabasePoolStatsApiView(APIView):
+    """Connection pool counters (see common.db) of the worker serving this request."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({'engine': connection.settings_dict['ENGINE'], 'pools': pool_stats()})
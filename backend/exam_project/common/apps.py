@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'exam_project.common'
+
+    def ready(self):
+        from exam_project.common import signals  # noqa: F401
@@ -0,0 +1,152 @@
+"""
+Async building blocks for read-only JSON endpoints.
+
+DRF views are synchronous: under ASGI every request to one is handed to a
+worker thread. `AsyncAPIView` is a plain Django async class-based view that
+keeps the parts of the DRF contract the clients rely on (JWT authentication,
+`{"detail": ...}` error bodies, a DRF `Request` for query_params and absolute
+URLs, filter backends, pagination, conditional GET) and reads the database
+only through the async ORM (`aget`, `afirst`, `acount`, `async for`).
+
+Under WSGI the same views still work: Django runs them in a per-request event
+loop.
+"""
+from calendar import timegm
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from exam_project.accounts.authentication import CachedJWTAuthentication
+from exam_project.accounts.user_cache import auser_version, cache_id, user_cache
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """CachedJWTAuthentication whose cache misses go through the async ORM."""
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        enabled = user_cache.enabled
+        if enabled:
+            version = await auser_version(user_id)
+            user = user_cache.lookup(cache_id(user_id), version)
+            if user is not None:
+                return self.check_user(user, validated_token)
+
+        try:
+            user = await self.user_model.objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+        self.check_user(user, validated_token)
+        if enabled:
+            user_cache.store(cache_id(user_id), user, version)
+        return user
+
+
+class AsyncAPIView(View):
+    """
+    Async GET-only API view. Subclasses implement `async def get()` and may
+    override `get_validators()` for conditional GET, like `conditional_get`
+    does for the DRF views.
+    """
+    http_method_names = ['get', 'head']
+    authentication = AsyncJWTAuthentication()
+    authentication_required = False
+    filter_backends = ()
+    pagination_class = None
+    renderer = JSONRenderer()
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.request = Request(request)
+        self.paginator = self.pagination_class() if self.pagination_class else None
+        try:
+            await self.initial(self.request)
+            response = await self.conditional(self.request, *args, **kwargs)
+        except (Http404, exceptions.APIException) as exc:
+            response = self.handle_exception(exc)
+        return response
+
+    async def initial(self, request):
+        if request.method.lower() not in self.http_method_names:
+            raise exceptions.MethodNotAllowed(request.method)
+
+        result = await self.authentication.aauthenticate(request)
+        request.user = result[0] if result else AnonymousUser()
+        if self.authentication_required and not request.user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+
+    async def conditional(self, request, *args, **kwargs):
+        # django.views.decorators.http.condition, which is not async-aware in Django 4.2
+        etag, last_modified = await self.get_validators(*args, **kwargs) or (None, None)
+        etag = quote_etag(etag) if etag else None
+        last_modified = timegm(last_modified.utctimetuple()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await self.get(request, *args, **kwargs)
+
+        if response.status_code == 200:
+            if last_modified and not response.has_header('Last-Modified'):
+                response.headers['Last-Modified'] = http_date(last_modified)
+            if etag:
+                response.headers.setdefault('ETag', etag)
+        return response
+
+    async def get_validators(self, *args, **kwargs):
+        """`(etag, last_modified)` for the requested resource, or None."""
+        return None
+
+    async def afilter_queryset(self, queryset):
+        for backend in self.filter_backends:
+            backend = backend()
+            if hasattr(backend, 'afilter_queryset'):
+                queryset = await backend.afilter_queryset(self.request, queryset, self)
+            else:
+                queryset = backend.filter_queryset(self.request, queryset, self)
+        return queryset
+
+    async def apaginate_queryset(self, queryset):
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+
+    def get_paginated_data(self, data):
+        return self.paginator.get_paginated_response(data).data
+
+    def render(self, data, status=200, headers=None):
+        return HttpResponse(
+            self.renderer.render(data), status=status, headers=headers, content_type='application/json',
+        )
+
+    def exception_payload(self, exc):
+        """`(status, data)` of the error response for an Http404 or APIException."""
+        if isinstance(exc, Http404):
+            exc = exceptions.NotFound(*exc.args)
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        return exc.status_code, data
+
+    def handle_exception(self, exc):
+        headers = {}
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            headers['WWW-Authenticate'] = self.authentication.authenticate_header(self.request)
+        status, data = self.exception_payload(exc)
+        return self.render(data, status, headers)
@@ -0,0 +1,6 @@
+from django.urls import path
+from exam_project.common.async_views import CommentListAsyncView
+
+urlpatterns = [
+    path("comments/<int:game_id>/", CommentListAsyncView.as_view(), name="comment_list_async"),
+]
@@ -0,0 +1,24 @@
+"""
+Async (ASGI) comment feed, under /api/async/common/. Same payload and ETag as
+CommentListCreateApiView's GET.
+"""
+from exam_project.common.api_views import comment_stats, comments_etag, comments_total, game_comments
+from exam_project.common.async_api import AsyncAPIView
+from exam_project.common.serializers import GameCommentSerializer
+from exam_project.games.pagination_sort import CommentPagination
+
+
+class CommentListAsyncView(AsyncAPIView):
+    authentication_required = True
+    pagination_class = CommentPagination
+
+    async def get_validators(self, game_id):
+        return comments_etag(self.request, game_id, await comment_stats(game_id).afirst()), None
+
+    async def aget_total_count(self):
+        return await comments_total(self.kwargs["game_id"]).afirst() or 0
+
+    async def get(self, request, game_id):
+        page = await self.apaginate_queryset(game_comments(game_id))
+        data = GameCommentSerializer(page, many=True, context={"request": request}).data
+        return self.render(self.get_paginated_data(data))
@@ -0,0 +1,363 @@
+"""
+End-to-end API benchmarks with query-count budgets (see the `bench_api` command).
+
+Every endpoint is requested through the real URLconf with Django's test client
+against data sets from `games.loadgen` of increasing size. For each endpoint and
+size we record p50/p95 latency, the SQL query count and the response size.
+
+A run fails when
+* an endpoint issues more queries than its declared budget. Budgets are
+  constants, so an N+1 shows up as soon as the data set grows; or
+* a stored baseline exists for this database vendor and size, and the endpoint
+  now uses more queries, or its p95 got slower by more than the tolerance.
+
+`run_sessions` (the `bench_sessions` command) measures the same HTML pages
+once per session engine, to compare accounts.sessions with Django's database
+backend. accounts.sessions needs a shared cache backend (DJANGO_CACHE_BACKEND).
+
+`run_pool_benchmark` (the `bench_db_pool` command) serves pages through the
+WSGI handler, so connections are closed after every request as under
+gunicorn. It compares requests/sec of the pooled PostgreSQL engine (common.db)
+with a new connection per request.
+
+`run_concurrency` (the `bench_concurrency` command) is different: it drives an
+already running server over plain HTTP with many concurrent, optionally slow,
+clients, to compare the WSGI and ASGI deployments.
+"""
+import asyncio
+import json
+import math
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.utils import load_backend
+from django.test import Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from exam_project.common.db.pool import close_pools, pool_stats
+from exam_project.common.models import BoughtGame
+from exam_project.games import loadgen
+from exam_project.games.models import GameModel
+
+BASELINE_PATH = Path(settings.BASE_DIR) / 'benchmarks' / 'api_baseline.json'
+
+SIZES = {
+    'small': dict(users=200, games=2_000, purchases=5_000, comments=1_000),
+    'medium': dict(users=2_000, games=20_000, purchases=50_000, comments=10_000),
+    'large': dict(users=20_000, games=200_000, purchases=500_000, comments=100_000),
+}
+
+
+class Endpoint:
+    def __init__(self, name, url, budget, method='get', html=False, cold_cache=False):
+        self.name = name
+        self.url = url  # callable(context, iteration) -> path
+        self.budget = budget
+        self.method = method
+        self.html = html
+        self.cold_cache = cold_cache
+
+
+ENDPOINTS = (
+    Endpoint('games_list', lambda ctx, i: reverse('games_list_create'), budget=2, cold_cache=True),
+    Endpoint('games_facets', lambda ctx, i: reverse('games_facets'), budget=1, cold_cache=True),
+    Endpoint('games_detail', lambda ctx, i: reverse('games_detail', args=[ctx['game_id']]), budget=2, cold_cache=True),
+    Endpoint('games_buy', lambda ctx, i: reverse('games_buy', args=[ctx['buy_ids'][i]]), budget=11, method='post'),
+    Endpoint('comments', lambda ctx, i: reverse('comment_list_create', args=[ctx['game_id']]), budget=3),
+    Endpoint('accounts_me', lambda ctx, i: reverse('accounts_me'), budget=1),
+    # HTML views log in with a session: 2 of the queries are session + user with
+    # the database session engine (the cached one reads the session from the cache)
+    Endpoint('index', lambda ctx, i: reverse('index'), budget=4, html=True),
+    Endpoint('game_details', lambda ctx, i: reverse('game details', args=[ctx['game_id']]), budget=5, html=True),
+)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def build_context(repeat):
+    """Pick the worst-case game (most comments) and a buyer who can afford `repeat` purchases."""
+    users = loadgen.generated_users()
+    viewer = users.filter(games_count=0).order_by('pk').first() or users.order_by('pk').first()
+    users.filter(pk=viewer.pk).update(money=10_000_000)
+    viewer.refresh_from_db()
+
+    game_id = (
+        GameModel.objects.filter(user__in=users)
+        .order_by('-comments_count', 'pk')
+        .values_list('pk', flat=True)
+        .first()
+    )
+    owned = BoughtGame.objects.filter(user=viewer).values('game_id')
+    buy_ids = list(
+        GameModel.objects.filter(user__in=users)
+        .exclude(user=viewer).exclude(pk__in=owned)
+        .order_by('pk')
+        .values_list('pk', flat=True)[:repeat]
+    )
+    return {'viewer': viewer, 'game_id': game_id, 'buy_ids': buy_ids}
+
+
+def measure(endpoint, context, repeat):
+    viewer = context['viewer']
+    if endpoint.html:
+        client = Client()
+        client.force_login(viewer)
+    else:
+        client = APIClient()
+        client.force_authenticate(viewer)
+
+    timings, queries, size = [], 0, 0
+    for i in range(min(repeat, len(context['buy_ids'])) if endpoint.method == 'post' else repeat):
+        if endpoint.cold_cache:
+            cache.clear()
+        path = endpoint.url(context, i)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(client, endpoint.method)(path)
+            timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{endpoint.name}: {path} returned {response.status_code}")
+        queries = max(queries, len(captured))
+        size = max(size, len(response.content))
+
+    return {
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'queries': queries,
+        'bytes': size,
+        'budget': endpoint.budget,
+    }
+
+
+def run_size(size, repeat, seed=42, log=None):
+    """Regenerate the `size` data set and measure every endpoint on it."""
+    loadgen.clear_load_data()
+    loadgen.generate(**SIZES[size], seed=seed, log=log)
+    context = build_context(repeat)
+    return {endpoint.name: measure(endpoint, context, repeat) for endpoint in ENDPOINTS}
+
+
+def check_results(results, baseline=None, tolerance=0.5, min_delta_ms=5.0):
+    """
+    Failure messages for `{size: {endpoint: stats}}`. `baseline` has the same
+    shape, already narrowed to the current database vendor.
+    """
+    failures = []
+    for size, endpoints in results.items():
+        for name, stats in endpoints.items():
+            if stats['queries'] > stats['budget']:
+                failures.append(f"{size}/{name}: {stats['queries']} queries, budget is {stats['budget']}")
+
+            previous = (baseline or {}).get(size, {}).get(name)
+            if not previous:
+                continue
+            if stats['queries'] > previous['queries']:
+                failures.append(f"{size}/{name}: {stats['queries']} queries, baseline was {previous['queries']}")
+            limit = previous['p95_ms'] * (1 + tolerance)
+            if stats['p95_ms'] > limit and stats['p95_ms'] - previous['p95_ms'] > min_delta_ms:
+                failures.append(
+                    f"{size}/{name}: p95 {stats['p95_ms']}ms, baseline was {previous['p95_ms']}ms "
+                    f"(+{tolerance:.0%} allowed)"
+                )
+    return failures
+
+
+def load_baseline(path=BASELINE_PATH):
+    """Stored results for the current database vendor, or {}."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f).get(connection.vendor, {})
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    path = Path(path)
+    try:
+        with open(path, encoding='utf-8') as f:
+            stored = json.load(f)
+    except FileNotFoundError:
+        stored = {}
+    stored.setdefault(connection.vendor, {}).update(results)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(stored, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+# =====================================================
+# SESSION ENGINES
+# =====================================================
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached': 'exam_project.accounts.sessions',
+}
+
+
+def run_sessions(size, repeat, seed=42, save_every_request=False, log=None):
+    """`{engine: {endpoint: stats}}` for the HTML endpoints on the `size` data set."""
+    loadgen.clear_load_data()
+    loadgen.generate(**SIZES[size], seed=seed, log=log)
+    context = build_context(repeat)
+    pages = [endpoint for endpoint in ENDPOINTS if endpoint.html]
+
+    results = {}
+    for name, engine in SESSION_ENGINES.items():
+        # measure() builds its client here, so the middleware picks up the engine
+        with override_settings(SESSION_ENGINE=engine, SESSION_SAVE_EVERY_REQUEST=save_every_request):
+            results[name] = {endpoint.name: measure(endpoint, context, repeat) for endpoint in pages}
+    return results
+
+
+# =====================================================
+# CONNECTION POOLING
+# =====================================================
+POOL_MODES = {
+    'connect-per-request': 'django.db.backends.postgresql',
+    'pooled': 'exam_project.common.db',
+}
+
+
+def pool_paths():
+    """Pages that always reach the database (no catalog-cache hit without a query)."""
+    game_id = GameModel.objects.order_by('pk').values_list('pk', flat=True).first()
+    if game_id is None:
+        raise ValueError('No games to request: load some data first (e.g. generate_load_data).')
+    return [
+        reverse('games_detail', args=[game_id]),
+        reverse('comment_list_create', args=[game_id]),
+        reverse('index'),
+    ]
+
+
+def _serve(handler, engine, paths, count, timings, errors):
+    # Connections are per thread: give this one a wrapper for `engine`
+    settings_dict = {**connections.settings[DEFAULT_DB_ALIAS], 'ENGINE': engine, 'CONN_MAX_AGE': 0}
+    connections[DEFAULT_DB_ALIAS] = load_backend(engine).DatabaseWrapper(settings_dict, DEFAULT_DB_ALIAS)
+    factory = RequestFactory()
+    try:
+        for i in range(count):
+            environ = factory.get(paths[i % len(paths)]).environ
+            started = time.perf_counter()
+            response = handler(environ, lambda status, headers: None)
+            b''.join(response)
+            response.close()  # request_finished: closes (or checks in) the connection
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+    finally:
+        connections[DEFAULT_DB_ALIAS].close()
+        del connections[DEFAULT_DB_ALIAS]
+
+
+def run_pool_benchmark(requests, threads=1):
+    """`{mode: stats}` for `requests` page loads spread over `threads` threads, per POOL_MODES entry."""
+    if connection.vendor != 'postgresql':
+        raise ValueError('The pool benchmark needs PostgreSQL.')
+    paths = pool_paths()
+    handler = WSGIHandler()
+
+    results = {}
+    for mode, engine in POOL_MODES.items():
+        close_pools()
+        timings, errors = [], []
+        workers = [
+            threading.Thread(target=_serve, args=(handler, engine, paths, requests // threads, timings, errors))
+            for _ in range(threads)
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        results[mode] = {
+            'threads': threads,
+            'requests': len(timings),
+            'errors': len(errors),
+            'rps': round(len(timings) / elapsed, 1),
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'pool': pool_stats().get(DEFAULT_DB_ALIAS) if engine == POOL_MODES['pooled'] else None,
+        }
+    close_pools()
+    return results
+
+
+# =====================================================
+# CONCURRENCY (RUNNING SERVERS)
+# =====================================================
+async def _fetch(url, headers, slow_ms, timeout):
+    """One GET over a fresh connection; returns (status, latency_ms). Status 0 means no response."""
+    parts = urlsplit(url)
+    target = parts.path + (f'?{parts.query}' if parts.query else '')
+    head = '\r\n'.join([
+        f'GET {target} HTTP/1.1',
+        f'Host: {parts.netloc}',
+        'Connection: close',
+        *(f'{name}: {value}' for name, value in headers.items()),
+    ]).encode() + b'\r\n\r\n'
+
+    started = time.perf_counter()
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(parts.hostname, parts.port or 80), timeout)
+    try:
+        if slow_ms:
+            # A slow client: the request arrives in two pieces, slow_ms apart
+            writer.write(head[:len(head) // 2])
+            await writer.drain()
+            await asyncio.sleep(slow_ms / 1000)
+            head = head[len(head) // 2:]
+        writer.write(head)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    status = response.split(b' ', 2)[1] if response.startswith(b'HTTP/') else b'0'
+    return int(status), (time.perf_counter() - started) * 1000
+
+
+async def _load(url, concurrency, total, headers, slow_ms, timeout):
+    latencies, errors = [], 0
+    remaining = iter(range(total))
+
+    async def client():
+        nonlocal errors
+        for _ in remaining:
+            try:
+                status, latency = await _fetch(url, headers, slow_ms, timeout)
+            except (OSError, asyncio.TimeoutError):
+                status = 0
+            if 200 <= status < 400:
+                latencies.append(latency)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 1) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95), 1) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99), 1) if latencies else None,
+    }
+
+
+def run_concurrency(url, concurrency, requests, headers=None, slow_ms=0, timeout=30.0):
+    """Send `requests` GETs to `url` from `concurrency` clients at once."""
+    return asyncio.run(_load(url, concurrency, requests, headers or {}, slow_ms, timeout))
@@ -0,0 +1,154 @@
+"""
+Container start-up steps for the `boot` command (see entrypoint.sh).
+
+Every step is skipped when its inputs have not changed since it last ran:
+
+* migrate: the migration files on disk, listed without importing them, are
+  compared with django_migrations in one query. When nothing is unapplied,
+  migrate (and its post_migrate handlers) does not run.
+* collectstatic: the static source tree, as collectstatic's finders list it,
+  is fingerprinted from paths, sizes and mtimes (no file is read), together
+  with the storage class. The fingerprint is written next to the collected
+  files, so a restarted container does not post-process (hash and recompress)
+  every asset again unless one of them changed.
+* initial games: loaded only into an empty catalog.
+
+All steps run in one process, so Django starts once instead of once per
+manage.py call. `run_boot` returns per-phase timings.
+"""
+import hashlib
+import importlib.util
+import os
+import pkgutil
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+
+from exam_project.games.importer import INITIAL_GAMES_FIXTURE, import_file
+from exam_project.games.models import GameModel
+
+STATIC_FINGERPRINT_FILE = '.boot-static-fingerprint'
+# collectstatic's default ignore patterns
+STATIC_IGNORE_PATTERNS = ['CVS', '.*', '*~']
+
+
+# =====================================================
+# FINGERPRINTS
+# =====================================================
+def disk_migrations():
+    """`{(app_label, name)}` of every migration file, found the way MigrationLoader finds them."""
+    found = set()
+    for app_config in apps.get_app_configs():
+        module_name, _ = MigrationLoader.migrations_module(app_config.label)
+        if module_name is None:
+            continue
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except ModuleNotFoundError:
+            continue
+        if spec is None or not spec.submodule_search_locations:
+            continue
+        found.update(
+            (app_config.label, name)
+            for _, name, is_pkg in pkgutil.iter_modules(spec.submodule_search_locations)
+            if not is_pkg and name[0] not in '_~'
+        )
+    return found
+
+
+def unapplied_migrations(using=connection):
+    recorder = MigrationRecorder(using)
+    if not recorder.has_table():
+        return disk_migrations()
+    return disk_migrations() - set(recorder.applied_migrations())
+
+
+def static_fingerprint():
+    """Hash of the static sources collectstatic would copy, from stat() alone."""
+    entries = []
+    for finder in finders.get_finders():
+        for path, storage in finder.list(STATIC_IGNORE_PATTERNS):
+            stat = os.stat(storage.path(path))
+            prefixed = os.path.join(getattr(storage, 'prefix', None) or '', path)
+            entries.append((prefixed, stat.st_size, stat.st_mtime_ns))
+
+    digest = hashlib.sha256(f'{type(staticfiles_storage).__module__}.{type(staticfiles_storage).__name__}'.encode())
+    for entry in sorted(entries):
+        digest.update(repr(entry).encode())
+    return digest.hexdigest(), len(entries)
+
+
+def _fingerprint_path():
+    return Path(settings.STATIC_ROOT) / STATIC_FINGERPRINT_FILE
+
+
+def stored_static_fingerprint():
+    try:
+        return _fingerprint_path().read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+# =====================================================
+# STEPS
+# =====================================================
+def _database(force):
+    connection.ensure_connection()
+    return 'ran', connection.vendor
+
+
+def _migrate(force):
+    unapplied = unapplied_migrations()
+    if not unapplied and not force:
+        return 'skipped', 'no unapplied migrations'
+    call_command('migrate', interactive=False, verbosity=0)
+    return 'ran', f'{len(unapplied)} migration(s) applied'
+
+
+def _collectstatic(force):
+    fingerprint, count = static_fingerprint()
+    if fingerprint == stored_static_fingerprint() and not force:
+        return 'skipped', f'{count} unchanged file(s)'
+    call_command('collectstatic', interactive=False, verbosity=0)
+    _fingerprint_path().write_text(fingerprint + '\n')
+    return 'ran', f'{count} file(s) collected'
+
+
+def _initial_games(force):
+    if GameModel.objects.exists():
+        return 'skipped', 'catalog not empty'
+    stats = import_file(INITIAL_GAMES_FIXTURE, update=False)
+    return 'ran', f'{stats.created} game(s) loaded'
+
+
+STEPS = (
+    ('database', _database),
+    ('migrate', _migrate),
+    ('collectstatic', _collectstatic),
+    ('initial_games', _initial_games),
+)
+
+
+def run_boot(force=False, steps=STEPS, log=None):
+    """Run the start-up steps in order; returns `[{phase, status, ms, detail}]`."""
+    phases = []
+    for name, step in steps:
+        started = time.perf_counter()
+        status, detail = step(force)
+        phases.append({
+            'phase': name,
+            'status': status,
+            'ms': round((time.perf_counter() - started) * 1000, 1),
+            'detail': detail,
+        })
+        if log:
+            log(f"{name}: {status} in {phases[-1]['ms']} ms ({detail})")
+    return phases
@@ -0,0 +1,17 @@
+"""
+Whether a cache backend is shared by all the worker processes.
+
+Cached sessions (accounts.sessions) and the authenticated-user cache
+(accounts.user_cache) rely on every worker seeing the same entries: a logout
+or a deactivation handled by one worker must reach the others. LocMemCache
+keeps a private copy per process and DummyCache stores nothing, so neither
+can back them.
+"""
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+PER_PROCESS_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_shared(cache):
+    return not isinstance(cache, PER_PROCESS_BACKENDS)
@@ -0,0 +1,32 @@
+"""
+Conditional GET (ETag / Last-Modified) for API views.
+
+`conditional_get(validators)` wraps Django's `condition` decorator around a
+view method. `validators(request, *args, **kwargs)` returns a
+`(etag, last_modified)` pair derived from cheap metadata (row timestamps,
+counts, the catalog version) and is evaluated once per request, before the
+object is loaded or serialized. Matching `If-None-Match`/`If-Modified-Since`
+requests get a 304 without running the view.
+"""
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+
+def weak_etag(*parts):
+    return 'W/"{}"'.format('-'.join(str(part) for part in parts))
+
+
+def timestamp(value):
+    return f'{value.timestamp():.6f}' if value else '0'
+
+
+def conditional_get(validators):
+    def cached(request, *args, **kwargs):
+        if not hasattr(request, '_conditional_validators'):
+            request._conditional_validators = validators(request, *args, **kwargs) or (None, None)
+        return request._conditional_validators
+
+    return method_decorator(condition(
+        etag_func=lambda request, *args, **kwargs: cached(request, *args, **kwargs)[0],
+        last_modified_func=lambda request, *args, **kwargs: cached(request, *args, **kwargs)[1],
+    ))
@@ -0,0 +1,92 @@
+"""
+PostgreSQL backend that keeps connections in a per-worker pool.
+
+Django opens a connection on the first query of a request and, with
+CONN_MAX_AGE = 0, closes it when the request finishes. With this ENGINE the
+close hands the connection back to the pool, and the next request's connect
+checks it out again: no TCP handshake or authentication per request. Any
+thread of the worker (gthread workers, ASGI's executor threads) can reuse it,
+which CONN_MAX_AGE's per-thread connections cannot.
+
+Settings live under DATABASES[alias]['POOL']: MAX_SIZE, MAX_LIFETIME,
+TIMEOUT and CHECK_IDLE (see common.db.pool). There is one pool per distinct
+set of connection parameters, so the test runner's connections to the
+`postgres` database never mix with those to the test database.
+"""
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.creation import DatabaseCreation as PostgresCreation
+
+from exam_project.common.db.pool import close_pools, get_pool
+
+# psycopg2's TRANSACTION_STATUS_IDLE and psycopg's TransactionStatus.IDLE
+TRANSACTION_IDLE = 0
+
+POOL_DEFAULTS = {'MAX_SIZE': 10, 'MAX_LIFETIME': 1800, 'TIMEOUT': 10.0, 'CHECK_IDLE': 5.0}
+
+
+def _check(connection):
+    if connection.closed:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    # SELECT 1 opens a transaction unless autocommit is on
+    if connection.info.transaction_status != TRANSACTION_IDLE:
+        connection.rollback()
+    return connection.info.transaction_status == TRANSACTION_IDLE
+
+
+def _reset(connection):
+    """Roll back, then drop the session state (SET, temp tables, prepared statements, advisory locks, LISTEN)."""
+    if connection.closed:
+        return False
+    if connection.info.transaction_status != TRANSACTION_IDLE:
+        connection.rollback()
+    # DISCARD ALL cannot run inside a transaction block. Django reapplies the
+    # time zone (and its other connection state) on the next checkout's connect
+    if not connection.autocommit:
+        connection.autocommit = True
+    with connection.cursor() as cursor:
+        cursor.execute('DISCARD ALL')
+    return connection.info.transaction_status == TRANSACTION_IDLE
+
+
+def pool_for(alias, settings_dict, conn_params):
+    key = (alias, tuple(sorted((name, repr(value)) for name, value in conn_params.items())))
+    options = {**POOL_DEFAULTS, **settings_dict.get('POOL', {})}
+    return get_pool(
+        key,
+        max_size=options['MAX_SIZE'],
+        max_lifetime=options['MAX_LIFETIME'],
+        timeout=options['TIMEOUT'],
+        check_idle=options['CHECK_IDLE'],
+        check=_check,
+        reset=_reset,
+    )
+
+
+class DatabaseCreation(PostgresCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections to the test database would block DROP DATABASE
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_new_connection(self, conn_params):
+        self._pool = pool_for(self.alias, self.settings_dict, conn_params)
+        return self._pool.checkout(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+
+    def _close(self):
+        if self.connection is None:
+            return
+        pool = getattr(self, '_pool', None)
+        with self.wrap_database_errors:
+            if pool is None:
+                return self.connection.close()
+            if self.in_atomic_block:
+                # Django keeps using this object as a closed connection until
+                # the block exits, so it must not go to another thread
+                return pool.discard(self.connection)
+            return pool.checkin(self.connection)
@@ -0,0 +1,277 @@
+"""
+A small, thread-safe pool of DB-API connections, one per worker process.
+
+The pool does not know the driver: `checkout(connect)` gets a factory for new
+connections, and the caller supplies `check` (is this idle connection still
+alive?), `reset` (make a returned connection reusable, False to discard it)
+and `close`. It enforces
+
+* MAX_SIZE: at most this many connections are open (idle + in use); a
+  checkout beyond that waits up to TIMEOUT seconds for a checkin, then raises
+  PoolTimeout;
+* MAX_LIFETIME: connections older than this are closed on checkin/checkout
+  instead of being reused, so server-side memory and failovers are picked up;
+* CHECK_IDLE: an idle connection is health-checked on checkout once it has
+  been idle this long (0 = on every checkout); a failed check discards it and
+  the checkout moves on to the next one.
+
+`check`, `reset` and `close` run without the pool's lock: the connection is
+reserved (counted in the size) while they talk to the server, so one slow
+check never blocks the other threads' checkouts and checkins.
+
+`stats()` reports the size, hits (reused), misses (new connections), waits
+and wait times, timeouts, and recycled/discarded counts. The pools of a worker
+are kept in a registry keyed by (alias, connection parameters), see
+`get_pool` and `pool_stats`.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    class _Entry:
+        __slots__ = ('connection', 'created', 'returned')
+
+        def __init__(self, connection, created):
+            self.connection, self.created, self.returned = connection, created, created
+
+    def __init__(self, max_size=10, max_lifetime=1800, timeout=10.0, check_idle=5.0,
+                 check=None, reset=None, close=None, clock=time.monotonic):
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.check_idle = check_idle
+        self.check = check or (lambda connection: True)
+        self.reset = reset or (lambda connection: True)
+        self.close = close or (lambda connection: connection.close())
+        self.clock = clock
+        self.pid = os.getpid()
+
+        self._idle = deque()  # most recently returned last
+        self._in_use = {}  # id(connection) -> _Entry
+        self._opening = 0
+        self._condition = threading.Condition()
+        self.checkouts = self.hits = self.misses = self.waits = self.timeouts = 0
+        self.recycled = self.discarded = 0
+        self.wait_ms_total = self.wait_ms_max = 0.0
+
+    @property
+    def size(self):
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _expired(self, entry, now):
+        return self.max_lifetime is not None and now - entry.created >= self.max_lifetime
+
+    def _discard(self, entry):
+        try:
+            self.close(entry.connection)
+        except Exception:
+            pass
+
+    def _after_fork(self):
+        # Sockets inherited from the parent must not be used, nor closed (it still owns them)
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self._idle.clear()
+            self._in_use.clear()
+            self._opening = 0
+
+    # =====================================================
+    # CHECKOUT / CHECKIN
+    # =====================================================
+    def checkout(self, connect):
+        """A live connection: an idle one if any, else a new one from `connect()`."""
+        waited = deadline = None
+        with self._condition:
+            self._after_fork()
+            self.checkouts += 1
+
+        while True:
+            with self._condition:
+                entry = None
+                while True:
+                    if self._idle:
+                        # Reserved while it is checked below, so it still counts towards the size
+                        entry = self._idle.pop()
+                        self._in_use[id(entry.connection)] = entry
+                        break
+                    if self.size < self.max_size:
+                        self._opening += 1
+                        break
+                    now = self.clock()
+                    if deadline is None:
+                        self.waits += 1
+                        waited, deadline = now, now + self.timeout
+                    elif now >= deadline:
+                        self.timeouts += 1
+                        self._record_wait(waited)
+                        raise PoolTimeout(
+                            f'No database connection available within {self.timeout}s '
+                            f'(all {self.max_size} of this worker are in use).'
+                        )
+                    self._condition.wait(deadline - now)
+            if entry is None:
+                break
+
+            # Health checks talk to the server: never with the lock held
+            problem = self._problem(entry)
+            if problem is None:
+                with self._condition:
+                    self.hits += 1
+                    self._record_wait(waited)
+                return entry.connection
+            self._discard(entry)
+            with self._condition:
+                self._in_use.pop(id(entry.connection), None)
+                setattr(self, problem, getattr(self, problem) + 1)
+                self._condition.notify()
+
+        try:
+            connection = connect()
+        except Exception:
+            with self._condition:
+                self._opening -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._opening -= 1
+            self.misses += 1
+            self._in_use[id(connection)] = self._Entry(connection, self.clock())
+            self._record_wait(waited)
+        return connection
+
+    def _problem(self, entry):
+        """None if a reserved idle entry can be reused, else the counter to bump."""
+        now = self.clock()
+        if self._expired(entry, now):
+            return 'recycled'
+        if now - entry.returned >= self.check_idle:
+            try:
+                healthy = bool(self.check(entry.connection))
+            except Exception:
+                healthy = False
+            if not healthy:
+                return 'discarded'
+        return None
+
+    def _record_wait(self, waited):
+        if waited is None:
+            return
+        wait_ms = (self.clock() - waited) * 1000
+        self.wait_ms_total += wait_ms
+        self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def checkin(self, connection):
+        with self._condition:
+            if self.pid != os.getpid():
+                return
+            entry = self._in_use.get(id(connection))
+        if entry is None:
+            # Not ours (e.g. opened before a fork or after clear()): just close it
+            self._discard(self._Entry(connection, 0))
+            return
+
+        # The reset runs outside the lock (it may roll back on the server); the
+        # entry stays in _in_use meanwhile, so the size does not change
+        try:
+            reusable = self.reset(connection)
+        except Exception:
+            reusable = False
+        expired = self._expired(entry, self.clock())
+        if not reusable or expired:
+            self._discard(entry)
+
+        with self._condition:
+            # Not owned any more if clear() ran while it was being reset
+            owned = self._in_use.pop(id(connection), None) is not None
+            if not reusable:
+                self.discarded += 1
+            elif expired:
+                self.recycled += 1
+            elif owned:
+                entry.returned = self.clock()
+                self._idle.append(entry)
+            self._condition.notify()
+        if reusable and not expired and not owned:
+            self._discard(entry)
+
+    def discard(self, connection):
+        """Close a checked-out connection that must not be reused."""
+        with self._condition:
+            entry = self._in_use.pop(id(connection), None)
+            self.discarded += 1
+            self._condition.notify()
+        self._discard(entry or self._Entry(connection, 0))
+
+    def clear(self):
+        """Close every idle connection (checked-out ones are closed on checkin)."""
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._in_use.clear()
+            self._condition.notify_all()
+        for entry in idle:
+            self._discard(entry)
+
+    def stats(self):
+        with self._condition:
+            return {
+                'pid': os.getpid(),
+                'size': self.size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'max_size': self.max_size,
+                'max_lifetime': self.max_lifetime,
+                'checkouts': self.checkouts,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / self.checkouts, 3) if self.checkouts else None,
+                'waits': self.waits,
+                'wait_ms_total': round(self.wait_ms_total, 1),
+                'wait_ms_max': round(self.wait_ms_max, 1),
+                'timeouts': self.timeouts,
+                'recycled': self.recycled,
+                'discarded': self.discarded,
+            }
+
+
+# =====================================================
+# REGISTRY
+# =====================================================
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, **options):
+    """The pool for `key` (alias first), created with `options` on first use."""
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(**options)
+        return pool
+
+
+def pool_stats():
+    """`{alias: [stats, ...]}` for this worker's pools."""
+    with _pools_lock:
+        pools = list(_pools.items())
+    found = {}
+    for (alias, *_), pool in pools:
+        found.setdefault(alias, []).append(pool.stats())
+    return found
+
+
+def close_pools():
+    """Close every idle pooled connection of this worker."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.clear()
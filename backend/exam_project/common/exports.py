@@ -0,0 +1,136 @@
+"""
+Streaming NDJSON/CSV exports of the catalog, purchases and users.
+
+Rows are read with `values_list().iterator()`, which uses a server-side
+cursor on PostgreSQL, and are encoded and gzip-compressed one chunk at a time.
+Memory stays flat however large the table is. The same generators back the
+admin-only API endpoint and the `export_data` management command.
+"""
+import csv
+import zlib
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+
+from exam_project.common.models import BoughtGame
+from exam_project.games.models import GameModel
+
+UserModel = get_user_model()
+
+CHUNK_SIZE = 2000
+BUFFER_SIZE = 64 * 1024
+
+# name -> (queryset factory, {column: ORM path})
+EXPORTS = {
+    'games': (
+        lambda: GameModel.objects.order_by('id'),
+        {
+            'id': 'id',
+            'title': 'title',
+            'category': 'category',
+            'price': 'price',
+            'summary': 'summary',
+            'game_picture': 'game_picture',
+            'seller_id': 'user_id',
+            'seller_email': 'user__email',
+            'created_at': 'created_at',
+            'updated_at': 'updated_at',
+        },
+    ),
+    'purchases': (
+        lambda: BoughtGame.objects.order_by('id'),
+        {
+            'id': 'id',
+            'game_id': 'game_id',
+            'game_title': 'game__title',
+            'price': 'game__price',
+            'buyer_id': 'user_id',
+            'buyer_email': 'user__email',
+            'seller_id': 'game__user_id',
+        },
+    ),
+    'users': (
+        lambda: UserModel.objects.order_by('id'),
+        {
+            'id': 'id',
+            'email': 'email',
+            'first_name': 'first_name',
+            'last_name': 'last_name',
+            'money': 'money',
+            'is_staff': 'is_staff',
+            'is_active': 'is_active',
+            'date_joined': 'date_joined',
+            'games_count': 'games_count',
+            'bought_count': 'bought_count',
+            'comments_count': 'comments_count',
+        },
+    ),
+}
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def iter_rows(name):
+    """`(columns, rows)` for an export; rows are fetched lazily in CHUNK_SIZE batches."""
+    queryset, columns = EXPORTS[name]
+    rows = queryset().values_list(*columns.values()).iterator(chunk_size=CHUNK_SIZE)
+    return tuple(columns), rows
+
+
+def _ndjson_lines(columns, rows):
+    encoder = DjangoJSONEncoder(separators=(',', ':'), ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + '\n'
+
+
+class _Echo:
+    """File-like object whose write() hands the formatted line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def _csv_lines(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def export_lines(name, file_format):
+    """Text lines of the export. Raises KeyError for an unknown export or format."""
+    if file_format not in FORMATS:
+        raise KeyError(file_format)
+    columns, rows = iter_rows(name)
+    return _csv_lines(columns, rows) if file_format == 'csv' else _ndjson_lines(columns, rows)
+
+
+def buffered(lines, size=BUFFER_SIZE):
+    """Join small text lines into UTF-8 chunks of roughly `size` bytes."""
+    parts, length = [], 0
+    for line in lines:
+        data = line.encode()
+        parts.append(data)
+        length += len(data)
+        if length >= size:
+            yield b''.join(parts)
+            parts, length = [], 0
+    if parts:
+        yield b''.join(parts)
+
+
+def gzip_stream(chunks, level=6):
+    """Compress byte chunks into a single gzip member as they arrive."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
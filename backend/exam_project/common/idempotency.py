@@ -0,0 +1,163 @@
+"""
+Idempotency-Key support for mutating API endpoints.
+
+The first response to a POST carrying an `Idempotency-Key` header is stored per
+user and key; retries with the same key get that response replayed without the
+view running again. Reusing a key for a different request is rejected, and a
+retry that arrives while the first attempt is still running gets a 409.
+
+The in-progress record is committed before the view runs. If that worker dies
+(OOM kill, gunicorn timeout) nothing ever completes or releases it, so an
+in-progress record older than IDEMPOTENCY_IN_PROGRESS_TIMEOUT seconds counts
+as abandoned and the next retry claims the key again.
+
+Keys live for IDEMPOTENCY_KEY_TTL seconds. Every PURGE_EVERY new keys one
+batch of expired rows is deleted, and `purge_idempotency_keys` clears the
+rest in bulk, so the table stays bounded by traffic within one TTL window.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from exam_project.common.models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_KEY_TTL = getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 60 * 60)
+IDEMPOTENCY_IN_PROGRESS_TIMEOUT = getattr(settings, 'IDEMPOTENCY_IN_PROGRESS_TIMEOUT', 60)
+PURGE_BATCH_SIZE = 500
+# Purge one batch of expired keys every PURGE_EVERY new keys
+PURGE_EVERY = 100
+
+
+def purge_expired_keys(batch_size=PURGE_BATCH_SIZE, now=None):
+    """Delete up to `batch_size` expired keys; returns how many were removed."""
+    expired = (
+        IdempotencyKey.objects
+        .filter(expires_at__lte=now or timezone.now())
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    deleted, _ = IdempotencyKey.objects.filter(pk__in=list(expired)).delete()
+    return deleted
+
+
+def request_fingerprint(request):
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = {key: values for key, values in data.lists()}
+    files = {name: [(f.name, f.size) for f in request.FILES.getlist(name)] for name in request.FILES}
+    payload = json.dumps(
+        [request.method, request.path, data, files],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class IdempotentReplay(Exception):
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class IdempotentMixin:
+    """
+    Hooks into APIView.initial/finalize_response, so it works for views that
+    define their own post() as well as generic create views.
+    """
+    idempotent_methods = ('POST',)
+    idempotency_record = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        key = request.headers.get(IDEMPOTENCY_HEADER, '').strip()
+        if request.method not in self.idempotent_methods or not key or not request.user.is_authenticated:
+            return
+        if len(key) > 255:
+            raise IdempotentReplay(Response(
+                {"detail": "Idempotency-Key is too long."}, status=status.HTTP_400_BAD_REQUEST,
+            ))
+
+        fingerprint = request_fingerprint(request)
+        record, created = self.claim_key(request.user, key, fingerprint)
+        if created:
+            self.idempotency_record = record
+        elif record.fingerprint != fingerprint:
+            raise IdempotentReplay(Response(
+                {"detail": "Idempotency-Key was already used for a different request."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            ))
+        elif record.status_code is None:
+            raise IdempotentReplay(Response(
+                {"detail": "A request with this Idempotency-Key is still in progress."},
+                status=status.HTTP_409_CONFLICT,
+            ))
+        else:
+            raise IdempotentReplay(Response(
+                record.response_body, status=record.status_code, headers={'Idempotent-Replayed': 'true'},
+            ))
+
+    def handle_exception(self, exc):
+        if isinstance(exc, IdempotentReplay):
+            return exc.response
+        try:
+            return super().handle_exception(exc)
+        except Exception:
+            self.release_key()
+            raise
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        record = self.idempotency_record
+        if record is not None:
+            if response.status_code >= 500:
+                # Server errors are not a final answer: let the client retry for real
+                self.release_key()
+            else:
+                # A queryset update: the row is gone if a retry reclaimed it meanwhile
+                IdempotencyKey.objects.filter(pk=record.pk, status_code__isnull=True).update(
+                    status_code=response.status_code, response_body=response.data,
+                )
+                self.idempotency_record = None
+        return response
+
+    def release_key(self):
+        if self.idempotency_record is not None:
+            self.idempotency_record.delete()
+            self.idempotency_record = None
+
+    def claim_key(self, user, key, fingerprint):
+        now = timezone.now()
+        existing = IdempotencyKey.objects.filter(user=user, key=key)
+        record = existing.first()
+        if record is not None:
+            abandoned = (
+                record.status_code is None
+                and record.created_at <= now - timedelta(seconds=IDEMPOTENCY_IN_PROGRESS_TIMEOUT)
+            )
+            if record.expires_at > now and not abandoned:
+                return record, False
+            # Deleted by pk: if a concurrent retry already replaced it, the
+            # create below fails and that retry's record wins
+            record.delete()
+
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=user,
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=IDEMPOTENCY_KEY_TTL),
+                )
+        except IntegrityError:
+            # A concurrent retry claimed it first
+            return existing.get(), False
+
+        if record.pk % PURGE_EVERY == 0:
+            purge_expired_keys(now=now)
+        return record, True
@@ -0,0 +1,169 @@
+"""
+Resized WebP/JPEG derivatives for uploaded pictures.
+
+When a picture is saved, `schedule_variants` queues the work on a small
+background thread pool (after the transaction commits), so uploads never wait
+for Pillow. Each source image is resized to the widths in IMAGE_VARIANT_WIDTHS
+and written next to the other derivatives as
+
+    derivatives/<upload dir>/<stem>.<content hash>.<width>w.<ext>
+
+The content hash makes every derivative URL immutable, so it can be cached
+forever. The generated names are stored on the row in a `*_variants` JSON
+field, together with the source they were built from. Serializers can then
+expose them without touching the filesystem, and they ignore variants whose
+source no longer matches the current picture.
+"""
+import hashlib
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from exam_project.accounts.user_cache import invalidate_users
+from exam_project.common.models import GameComment
+from exam_project.games.cache import bump_catalog_version
+from exam_project.games.models import GameModel
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = getattr(settings, 'IMAGE_VARIANT_WIDTHS', (160, 320, 640))
+VARIANT_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+DERIVATIVES_DIR = 'derivatives'
+
+_executor = ThreadPoolExecutor(max_workers=getattr(settings, 'IMAGE_VARIANT_WORKERS', 2), thread_name_prefix='variants')
+
+
+def variant_name(source_name, digest, width, ext):
+    directory, filename = posixpath.split(source_name)
+    stem = filename.rsplit('.', 1)[0]
+    return posixpath.join(DERIVATIVES_DIR, directory, f'{stem}.{digest}.{width}w.{ext}')
+
+
+def build_variants(source_name, storage=default_storage):
+    """Write all missing derivatives for `source_name`; returns the variants mapping."""
+    with storage.open(source_name, 'rb') as source:
+        data = source.read()
+    digest = hashlib.sha1(data).hexdigest()[:12]
+
+    with Image.open(BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    variants = {'source': source_name}
+    # Never upscale: widths above the original collapse onto the original width
+    widths = sorted({min(width, image.width) for width in VARIANT_WIDTHS})
+    for ext, options in VARIANT_FORMATS.items():
+        variants[ext] = {}
+        for width in widths:
+            name = variant_name(source_name, digest, width, ext)
+            if not storage.exists(name):
+                resized = image.copy()
+                resized.thumbnail((width, image.height * width // image.width or 1), Image.LANCZOS)
+                if options['format'] == 'JPEG' and resized.mode not in ('RGB', 'L'):
+                    resized = resized.convert('RGB')
+                buffer = BytesIO()
+                resized.save(buffer, **options)
+                storage.save(name, ContentFile(buffer.getvalue()))
+            variants[ext][str(width)] = name
+    return variants
+
+
+def update_variants(model, pk, field_name):
+    """Build derivatives for one row's picture and store them on the row."""
+    instance = model.objects.filter(pk=pk).only(field_name).first()
+    picture = getattr(instance, field_name, None)
+    if not picture:
+        return None
+    try:
+        variants = build_variants(picture.name)
+    except (FileNotFoundError, UnidentifiedImageError, OSError) as e:
+        logger.warning("Could not build variants for %s: %s", picture.name, e)
+        return None
+
+    fields = {f'{field_name}_variants': variants}
+    if any(f.name == 'updated_at' for f in model._meta.fields):
+        fields['updated_at'] = timezone.now()
+    # Queryset update: no save() signals, so this cannot re-trigger itself
+    model.objects.filter(pk=pk, **{field_name: picture.name}).update(**fields)
+
+    if model is GameModel:
+        bump_catalog_version()
+    elif model is get_user_model():
+        invalidate_users([pk])
+    elif model is GameComment:
+        # The comment feed's ETag comes from its game
+        GameModel.objects.filter(gamecomment=pk).update(comments_updated_at=timezone.now())
+    return variants
+
+
+def _run_in_background(model, pk, field_name):
+    try:
+        update_variants(model, pk, field_name)
+    except Exception:
+        logger.exception("Image variant job failed for %s #%s", model.__name__, pk)
+    finally:
+        close_old_connections()
+
+
+def is_placeholder(instance, field_name):
+    """Whether the picture is the field's default, shared by every row without an upload."""
+    picture = getattr(instance, field_name)
+    return bool(picture) and picture.name == instance._meta.get_field(field_name).get_default()
+
+
+def needs_variants(instance, field_name):
+    picture = getattr(instance, field_name)
+    variants = getattr(instance, f'{field_name}_variants') or {}
+    return bool(picture) and not is_placeholder(instance, field_name) and variants.get('source') != picture.name
+
+
+def schedule_variants(instance, field_name):
+    """Queue derivative generation for `instance` once the current transaction commits."""
+    if not needs_variants(instance, field_name):
+        return
+    model, pk = type(instance), instance.pk
+    if getattr(settings, 'IMAGE_VARIANTS_ASYNC', True):
+        transaction.on_commit(lambda: _executor.submit(_run_in_background, model, pk, field_name))
+    else:
+        transaction.on_commit(lambda: update_variants(model, pk, field_name))
+
+
+def absolute_url(request, url):
+    """Same result as request.build_absolute_uri(url), resolving scheme and host once per request."""
+    if request is None or not url.startswith('/'):
+        return url
+    if url.startswith('//'):
+        return request.build_absolute_uri(url)
+    base = getattr(request, '_absolute_base', None)
+    if base is None:
+        base = request._absolute_base = request.build_absolute_uri('/')[:-1]
+    return base + url
+
+
+def variant_urls_for(picture_name, variants, request=None):
+    """variant_urls() from the raw column values, for code that works on .values() rows."""
+    variants = variants or {}
+    if not picture_name or variants.get('source') != picture_name:
+        return {}
+    return {
+        ext: {width: absolute_url(request, default_storage.url(name)) for width, name in sizes.items()}
+        for ext, sizes in variants.items() if ext != 'source'
+    }
+
+
+def variant_urls(instance, field_name, request=None):
+    """{format: {width: url}} for the current picture, or {} when not built yet."""
+    picture = getattr(instance, field_name)
+    return variant_urls_for(picture.name if picture else None, getattr(instance, f'{field_name}_variants'), request)
@@ -0,0 +1,195 @@
+"""
+Opt-in per-request SQL/serializer/template instrumentation.
+
+Enable it by adding `RequestMetricsMiddleware` to MIDDLEWARE (the
+REQUEST_METRICS env var does this in settings). Only a sampled fraction of
+requests (REQUEST_METRICS_SAMPLE_RATE) is measured. Unsampled requests cost one
+random() call, plus a ContextVar lookup per serializer `.data` (DRF's and
+FastGameSerializer's, which the games lists use) and per template render. A sampled request gets:
+
+* a `Server-Timing` header (db, serialize, template, total, plus the query
+  count and how many queries were repeated), which browser dev tools show;
+* one JSON log line on the `exam_project.request_metrics` logger, at WARNING
+  when some query shape repeats REQUEST_METRICS_DUPLICATE_THRESHOLD times or
+  more, which is the usual N+1 signature.
+
+Lazy querysets evaluated while serializing or rendering count towards both
+the db time and the serializer/template time.
+"""
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('exam_project.request_metrics')
+
+_current = ContextVar('request_metrics', default=None)
+
+_IN_LIST = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Stable id for a query shape: IN-lists collapsed, whitespace normalized."""
+    normalized = _SPACES.sub(' ', _IN_LIST.sub('(...)', sql)).strip()
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.fingerprints = Counter()
+        self.statements = {}
+        self.timers = {'serialize': 0.0, 'template': 0.0}
+        self._depth = Counter()
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            key, normalized = fingerprint(sql)
+            self.fingerprints[key] += 1
+            self.statements.setdefault(key, normalized[:300])
+
+    def duplicates(self):
+        return [
+            {'fingerprint': key, 'count': count, 'sql': self.statements[key]}
+            for key, count in self.fingerprints.most_common()
+            if count > 1
+        ]
+
+    def server_timing(self, total):
+        repeated = sum(count - 1 for count in self.fingerprints.values())
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries, {repeated} repeated"',
+            f'serialize;dur={self.timers["serialize"] * 1000:.1f}',
+            f'template;dur={self.timers["template"] * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+
+def _timed(timer, func):
+    """Wrap `func` so its outermost call adds to the current request's `timer`."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        metrics = _current.get()
+        if metrics is None or metrics._depth[timer]:
+            return func(*args, **kwargs)
+        metrics._depth[timer] += 1
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.timers[timer] += time.perf_counter() - started
+            metrics._depth[timer] -= 1
+    wrapper._request_metrics = True
+    return wrapper
+
+
+def install_hooks():
+    """Time DRF serialization, the games lists' FastGameSerializer and Django template rendering. Idempotent."""
+    from django.template.backends.django import Template
+    from rest_framework.serializers import BaseSerializer
+
+    from exam_project.games.serializers import FastGameSerializer
+
+    for serializer in (BaseSerializer, FastGameSerializer):
+        if not getattr(serializer.data.fget, '_request_metrics', False):
+            serializer.data = property(_timed('serialize', serializer.data.fget))
+    if not getattr(Template.render, '_request_metrics', False):
+        Template.render = _timed('template', Template.render)
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 1.0)
+        self.duplicate_threshold = getattr(settings, 'REQUEST_METRICS_DUPLICATE_THRESHOLD', 3)
+        install_hooks()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def sampled(self, request):
+        # In DEBUG a single request can be forced with `X-Request-Metrics: 1`
+        if settings.DEBUG and request.headers.get('X-Request-Metrics') == '1':
+            return True
+        return random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled(request):
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with self.wrap_connections(metrics):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        if not self.sampled(request):
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        # Connections are per thread. The async ORM runs each request's queries on
+        # that request's thread-sensitive executor thread, so wrap them over there.
+        stack = await sync_to_async(self.wrap_connections)(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    @staticmethod
+    def wrap_connections(metrics):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics.record_query))
+            return stack.pop_all()
+
+    def finish(self, request, response, metrics, started):
+        total = time.perf_counter() - started
+        response['Server-Timing'] = metrics.server_timing(total)
+        self.log(request, response, metrics, total)
+        return response
+
+    def log(self, request, response, metrics, total):
+        duplicates = metrics.duplicates()
+        suspicious = [d for d in duplicates if d['count'] >= self.duplicate_threshold]
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'queries': metrics.queries,
+            'db_ms': round(metrics.db_time * 1000, 1),
+            'serialize_ms': round(metrics.timers['serialize'] * 1000, 1),
+            'template_ms': round(metrics.timers['template'] * 1000, 1),
+            'duplicates': duplicates[:5],
+        }
+        logger.log(logging.WARNING if suspicious else logging.INFO, json.dumps(record))
@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment
+
+from exam_project.common.benchmarks import (
+    BASELINE_PATH, SIZES, check_results, load_baseline, run_size, save_baseline,
+)
+from exam_project.games import loadgen
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the main API and HTML endpoints against generated data sets of growing size; "
+        "fails on query-budget violations or regressions against the stored baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="small,medium", help=f"Comma-separated, from: {', '.join(SIZES)}")
+        parser.add_argument("--repeat", type=int, default=30, help="Requests per endpoint and size")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--baseline", default=str(BASELINE_PATH))
+        parser.add_argument("--write-baseline", action="store_true", help="Store these results as the new baseline")
+        parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed p95 slowdown (0.5 = +50%%)")
+        parser.add_argument("--json", action="store_true", help="Print the raw results as JSON")
+        parser.add_argument("--keep", action="store_true", help="Keep the generated data afterwards")
+
+    def handle(self, *args, **options):
+        sizes = [size.strip() for size in options["sizes"].split(",") if size.strip()]
+        unknown = set(sizes) - set(SIZES)
+        if unknown:
+            raise CommandError(f"Unknown size(s): {', '.join(sorted(unknown))}")
+
+        # Lets the test client talk to the URLconf (ALLOWED_HOSTS, in-memory mail)
+        setup_test_environment()
+        results = {}
+        try:
+            for size in sizes:
+                self.stderr.write(f"== {size}: {SIZES[size]}")
+                results[size] = run_size(size, options["repeat"], seed=options["seed"], log=self.stderr.write)
+                self.report(size, results[size])
+        finally:
+            if not options["keep"]:
+                loadgen.clear_load_data()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+
+        failures = check_results(results, load_baseline(options["baseline"]), tolerance=options["tolerance"])
+        if options["write_baseline"]:
+            save_baseline(results, options["baseline"])
+            self.stdout.write(f"Baseline written to {options['baseline']}.")
+
+        if failures:
+            for failure in failures:
+                self.stdout.write(self.style.ERROR(failure))
+            raise CommandError(f"{len(failures)} benchmark check(s) failed.")
+        self.stdout.write(self.style.SUCCESS("All endpoints within budget and baseline."))
+
+    def report(self, size, endpoints):
+        self.stdout.write(f"\n{size}")
+        self.stdout.write(f"  {'endpoint':<14} {'p50 ms':>8} {'p95 ms':>8} {'queries':>8} {'budget':>7} {'bytes':>8}")
+        for name, stats in endpoints.items():
+            line = (
+                f"  {name:<14} {stats['p50_ms']:>8} {stats['p95_ms']:>8} "
+                f"{stats['queries']:>8} {stats['budget']:>7} {stats['bytes']:>8}"
+            )
+            self.stdout.write(self.style.ERROR(line) if stats["queries"] > stats["budget"] else line)
@@ -0,0 +1,62 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from exam_project.common.benchmarks import run_concurrency
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares running servers under many concurrent (optionally slow) clients, e.g. the WSGI "
+        "deployment against the ASGI one:\n"
+        "  gunicorn exam_project.wsgi:application -b :8000 -w 4\n"
+        "  gunicorn exam_project.asgi:application -b :8001 -w 4 -k uvicorn.workers.UvicornWorker\n"
+        "  manage.py bench_concurrency --target wsgi=http://127.0.0.1:8000/api/games/ "
+        "--target asgi=http://127.0.0.1:8001/api/async/games/ --slow-client-ms 200"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target", action="append", required=True, metavar="NAME=URL",
+            help="Server and endpoint to load; repeat for each server",
+        )
+        parser.add_argument("--concurrency", default="10,50,200", help="Comma-separated client counts")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per target and concurrency level")
+        parser.add_argument("--slow-client-ms", type=int, default=0, help="Pause in the middle of each request")
+        parser.add_argument("--token", help="JWT access token, for the authenticated endpoints")
+        parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+        parser.add_argument("--json", action="store_true", help="Print the raw results as JSON")
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options["target"]:
+            name, sep, url = target.partition("=")
+            if not sep or not url.startswith("http://"):
+                raise CommandError(f"Expected NAME=http://host:port/path, got {target!r}")
+            targets.append((name, url))
+        try:
+            levels = [int(level) for level in options["concurrency"].split(",") if level.strip()]
+        except ValueError:
+            raise CommandError("--concurrency takes comma-separated integers")
+
+        headers = {"Authorization": f"Bearer {options['token']}"} if options["token"] else {}
+        results = {}
+        self.stdout.write(
+            f"  {'target':<10} {'clients':>8} {'ok':>6} {'errors':>7} {'req/s':>8} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+        )
+        for concurrency in levels:
+            for name, url in targets:
+                stats = run_concurrency(
+                    url, concurrency, options["requests"], headers=headers,
+                    slow_ms=options["slow_client_ms"], timeout=options["timeout"],
+                )
+                results.setdefault(name, []).append(stats)
+                line = (
+                    f"  {name:<10} {concurrency:>8} {stats['requests']:>6} {stats['errors']:>7} {stats['rps']:>8} "
+                    f"{str(stats['p50_ms']):>8} {str(stats['p95_ms']):>8} {str(stats['p99_ms']):>8}"
+                )
+                self.stdout.write(self.style.ERROR(line) if stats["errors"] else line)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
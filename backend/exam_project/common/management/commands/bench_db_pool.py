@@ -0,0 +1,47 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment
+
+from exam_project.common.benchmarks import POOL_MODES, run_pool_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares requests/sec through the WSGI handler with pooled PostgreSQL connections (common.db) "
+        "and with a new connection per request. Runs against the configured database and its data"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Page loads per mode and thread count")
+        parser.add_argument("--threads", default="1,4", help="Comma-separated thread counts (gthread-style workers)")
+        parser.add_argument("--json", action="store_true", help="Print the raw results as JSON")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        results = {}
+        for threads in (int(value) for value in options["threads"].split(",") if value.strip()):
+            try:
+                results[threads] = run_pool_benchmark(options["requests"], threads=threads)
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(
+            f"  {'threads':>7} {'mode':<20} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}"
+            f" {'hits':>6} {'misses':>6} {'waits':>6} {'wait ms':>8}"
+        )
+        for threads, modes in results.items():
+            for mode in POOL_MODES:
+                stats = modes[mode]
+                pool = (stats["pool"] or [{}])[0]
+                self.stdout.write(
+                    f"  {threads:>7} {mode:<20} {stats['rps']:>8} {stats['p50_ms']:>8} {stats['p95_ms']:>8}"
+                    f" {stats['errors']:>7} {pool.get('hits', '-'):>6} {pool.get('misses', '-'):>6}"
+                    f" {pool.get('waits', '-'):>6} {pool.get('wait_ms_total', '-'):>8}"
+                )
+            gain = modes["pooled"]["rps"] / modes["connect-per-request"]["rps"] - 1
+            self.stdout.write(self.style.SUCCESS(f"  {threads:>7} pooled: {gain:+.0%} req/s"))
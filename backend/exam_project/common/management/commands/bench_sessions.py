@@ -0,0 +1,56 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment
+
+from exam_project.common.benchmarks import SESSION_ENGINES, SIZES, run_sessions
+from exam_project.games import loadgen
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares HTML page latency and query counts under the cached session engine "
+        "(accounts.sessions) and Django's database session backend"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", default="small", help=f"One of: {', '.join(SIZES)}")
+        parser.add_argument("--repeat", type=int, default=50, help="Requests per page and engine")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--save-every-request", action="store_true",
+            help="Run with SESSION_SAVE_EVERY_REQUEST, so every page also writes its session",
+        )
+        parser.add_argument("--json", action="store_true", help="Print the raw results as JSON")
+        parser.add_argument("--keep", action="store_true", help="Keep the generated data afterwards")
+
+    def handle(self, *args, **options):
+        if options["size"] not in SIZES:
+            raise CommandError(f"Unknown size: {options['size']}")
+
+        setup_test_environment()
+        try:
+            results = run_sessions(
+                options["size"], options["repeat"], seed=options["seed"],
+                save_every_request=options["save_every_request"], log=self.stderr.write,
+            )
+        finally:
+            if not options["keep"]:
+                loadgen.clear_load_data()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+
+        db, cached = results["db"], results["cached"]
+        self.stdout.write(f"\n{options['size']}: {' vs '.join(SESSION_ENGINES)}")
+        self.stdout.write(
+            f"  {'page':<14} {'db p50':>8} {'db p95':>8} {'queries':>8}"
+            f" {'cached p50':>11} {'cached p95':>11} {'queries':>8} {'p50 gain':>9}"
+        )
+        for name in db:
+            before, after = db[name], cached[name]
+            gain = 1 - after["p50_ms"] / before["p50_ms"] if before["p50_ms"] else 0
+            self.stdout.write(
+                f"  {name:<14} {before['p50_ms']:>8} {before['p95_ms']:>8} {before['queries']:>8}"
+                f" {after['p50_ms']:>11} {after['p95_ms']:>11} {after['queries']:>8} {gain:>9.0%}"
+            )
@@ -0,0 +1,32 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from exam_project.common.boot import run_boot
+
+
+class Command(BaseCommand):
+    help = (
+        "Prepares the container for serving: migrate, collectstatic and the initial games, each skipped "
+        "when its inputs are unchanged; reports per-phase timings"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Run every step, even when nothing changed")
+        parser.add_argument("--json", action="store_true", help="Print the timings as JSON")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        phases = run_boot(force=options["force"])
+        total = round((time.perf_counter() - started) * 1000, 1)
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"phases": phases, "total_ms": total}, indent=2))
+            return
+
+        self.stdout.write(f"  {'phase':<14} {'status':<8} {'ms':>9}  detail")
+        for phase in phases:
+            line = f"  {phase['phase']:<14} {phase['status']:<8} {phase['ms']:>9}  {phase['detail']}"
+            self.stdout.write(self.style.SUCCESS(line) if phase["status"] == "skipped" else line)
+        self.stdout.write(f"  {'total':<14} {'':<8} {total:>9}")
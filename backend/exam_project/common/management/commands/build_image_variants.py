@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from exam_project.common.images import is_placeholder, needs_variants, update_variants
+from exam_project.common.models import GameComment
+from exam_project.games.models import GameModel
+
+UserModel = get_user_model()
+
+TARGETS = (
+    (GameModel, 'game_picture'),
+    (UserModel, 'profile_picture'),
+    (GameComment, 'profile_picture'),
+)
+
+
+class Command(BaseCommand):
+    help = "Backfills resized WebP/JPEG variants for pictures already stored under MEDIA_ROOT"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rebuild rows that already have variants")
+        parser.add_argument("--workers", type=int, default=4)
+
+    def handle(self, *args, **options):
+        jobs = []
+        for model, field_name in TARGETS:
+            rows = (
+                model.objects
+                .exclude(**{f"{field_name}__isnull": True})
+                .exclude(**{field_name: ""})
+                .only("pk", field_name, f"{field_name}_variants")
+            )
+            for row in rows.iterator(chunk_size=500):
+                if is_placeholder(row, field_name):
+                    continue
+                if options["force"] or needs_variants(row, field_name):
+                    jobs.append((model, row.pk, field_name))
+
+        def run(job):
+            try:
+                return update_variants(*job) is not None
+            finally:
+                close_old_connections()
+
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            built = sum(pool.map(run, jobs))
+
+        self.stdout.write(self.style.SUCCESS(f"Built variants for {built} of {len(jobs)} picture(s)."))
@@ -0,0 +1,35 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from exam_project.common.exports import EXPORTS, FORMATS, buffered, export_lines, gzip_stream
+
+
+class Command(BaseCommand):
+    help = "Streams the games, purchases or users table as NDJSON/CSV, optionally gzipped"
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", choices=sorted(EXPORTS))
+        parser.add_argument("--format", dest="file_format", choices=sorted(FORMATS), default="ndjson")
+        parser.add_argument("--output", "-o", default="-", help="File path, or - for stdout")
+        parser.add_argument("--gzip", action="store_true", help="Compress the output (implied by a .gz path)")
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        chunks = buffered(export_lines(options["name"], options["file_format"]))
+        if options["gzip"] or output.endswith(".gz"):
+            chunks = gzip_stream(chunks)
+
+        if output == "-":
+            stream = sys.stdout.buffer
+            for chunk in chunks:
+                stream.write(chunk)
+            stream.flush()
+            return
+
+        written = 0
+        with open(output, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                written += len(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {written} bytes to {output}."))
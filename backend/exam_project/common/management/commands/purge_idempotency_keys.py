@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from exam_project.common.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Deletes expired Idempotency-Key records in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            deleted = purge_expired_keys(batch_size=options["batch_size"])
+            total += deleted
+            if deleted < options["batch_size"]:
+                break
+        self.stdout.write(self.style.SUCCESS(f"Purged {total} expired idempotency key(s)."))
@@ -0,0 +1,184 @@
+"""
+Serving uploaded files (MEDIA_ROOT) in every deployment, not only with DEBUG.
+
+`serve_media` resolves the path safely and answers conditional requests
+(If-None-Match, If-Modified-Since) with a 304 without opening the file. It then
+either
+
+* hands the transfer to the front proxy when MEDIA_ACCEL is set: nginx gets an
+  `X-Accel-Redirect` to an `internal` location under MEDIA_ACCEL_PREFIX that
+  aliases MEDIA_ROOT, while Apache/lighttpd get `X-Sendfile` with the absolute
+  path. The worker is free as soon as the headers are out, and the proxy
+  handles Range itself; or
+* streams the file with FileResponse (a zero-copy sendfile under gunicorn),
+  honouring a single `Range: bytes=...` (with If-Range) with a 206.
+
+Image derivatives carry a content hash in their name (see common.images), so
+they are sent with a year-long `immutable` Cache-Control. Other uploads get
+MEDIA_CACHE_MAX_AGE and are revalidated through their ETag/Last-Modified.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from exam_project.common.images import DERIVATIVES_DIR
+
+MEDIA_ACCEL = getattr(settings, 'MEDIA_ACCEL', '')
+MEDIA_ACCEL_PREFIX = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+MEDIA_CACHE_MAX_AGE = getattr(settings, 'MEDIA_CACHE_MAX_AGE', 60 * 60)
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# derivatives/<dir>/<stem>.<12 hex digest>.<width>w.<ext>, see images.variant_name
+HASHED_NAME = re.compile(rf'^{DERIVATIVES_DIR}/.+\.[0-9a-f]{{12}}\.\d+w\.\w+$')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def is_immutable(path):
+    return bool(HASHED_NAME.match(path))
+
+
+def resolve(path, document_root=None):
+    """Absolute Path of the media file at `path`, or Http404."""
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = Path(safe_join(document_root or settings.MEDIA_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404('Media file not found.')
+    if not fullpath.is_file():
+        raise Http404('Media file not found.')
+    return path, fullpath
+
+
+def parse_range(header, size):
+    """`(start, end)` inclusive for a single satisfiable byte range, 'unsatisfiable', or None to send it all."""
+    match = RANGE.match(header.replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        # Malformed or multi-range: RFC 9110 lets us ignore it
+        return None
+    first, last = match.groups()
+    if size == 0:
+        # No byte range of an empty file is satisfiable, suffix ranges included
+        return 'unsatisfiable'
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return 'unsatisfiable'
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        return 'unsatisfiable'
+    if end < start:
+        return None
+    return start, end
+
+
+def if_range_matches(request, etag, mtime):
+    value = request.headers.get('If-Range')
+    if value is None:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag
+    return parse_http_date_safe(value) == mtime
+
+
+class _FileRange:
+    """Reads `length` bytes of `file` from its current position (no fileno: no sendfile of the whole rest)."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def _validators(stat):
+    mtime = int(stat.st_mtime)
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"', mtime
+
+
+def _cache_headers(response, path, etag, mtime):
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(mtime)
+    if is_immutable(path):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=MEDIA_CACHE_MAX_AGE)
+    return response
+
+
+def _accel_response(path, fullpath, content_type):
+    response = HttpResponse(content_type=content_type)
+    if MEDIA_ACCEL == 'x-accel-redirect':
+        response.headers['X-Accel-Redirect'] = MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + quote(path)
+    elif MEDIA_ACCEL == 'x-sendfile':
+        response.headers['X-Sendfile'] = str(fullpath)
+    else:
+        raise ValueError(f'Unknown MEDIA_ACCEL "{MEDIA_ACCEL}": use "x-accel-redirect" or "x-sendfile".')
+    return response
+
+
+def _file_response(request, fullpath, size, content_type, etag, mtime):
+    byte_range = None
+    if 'Range' in request.headers and if_range_matches(request, etag, mtime):
+        byte_range = parse_range(request.headers['Range'], size)
+
+    if byte_range == 'unsatisfiable':
+        response = HttpResponse(status=416, content_type=content_type)
+        response.headers['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file = fullpath.open('rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        file.seek(start, os.SEEK_SET)
+        response = FileResponse(_FileRange(file, end - start + 1), status=206, content_type=content_type)
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response.headers['Content-Length'] = end - start + 1
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    path, fullpath = resolve(path)
+    stat = fullpath.stat()
+    etag, mtime = _validators(stat)
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=mtime)
+    if conditional is not None:
+        return _cache_headers(conditional, path, etag, mtime)
+
+    content_type, encoding = mimetypes.guess_type(str(fullpath))
+    content_type = content_type or 'application/octet-stream'
+
+    if MEDIA_ACCEL:
+        response = _accel_response(path, fullpath, content_type)
+    else:
+        response = _file_response(request, fullpath, stat.st_size, content_type, etag, mtime)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return _cache_headers(response, path, etag, mtime)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0004_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamecomment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
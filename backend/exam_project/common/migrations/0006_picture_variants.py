@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0005_gamecomment_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamecomment',
+            name='profile_picture_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
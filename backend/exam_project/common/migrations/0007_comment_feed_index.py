@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 16:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0006_picture_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gamecomment',
+            index=models.Index(fields=['game', 'created_at', 'id'], name='comment_game_created_id_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from exam_project.games.models import GameModel
 
@@ -26,8 +27,29 @@ class GameComment(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     text = models.TextField()
     profile_picture = models.ImageField(upload_to="comment_pics/", blank=True, null=True)
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('game', 'user')
+        # Backs the keyset-paginated comment feed (see CommentPagination)
+        indexes = [
+            models.Index(fields=['game', 'created_at', 'id'], name='comment_game_created_id_idx'),
+        ]
 
+
+class IdempotencyKey(models.Model):
+    """First response stored per (user, Idempotency-Key) and replayed to retries."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    # NULL while the first request is still being processed
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    # When the first request started: an old in-progress record is abandoned (see common.idempotency)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ('user', 'key')
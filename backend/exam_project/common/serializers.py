@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .images import absolute_url, variant_urls
 from .models import GameComment
 
 
@@ -6,6 +7,7 @@ class GameCommentSerializer(serializers.ModelSerializer):
 
     user_email = serializers.EmailField(source="user.email", read_only=True)
     profile_picture = serializers.SerializerMethodField()
+    profile_picture_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = GameComment
@@ -14,6 +16,7 @@ class GameCommentSerializer(serializers.ModelSerializer):
             "text",
             "user_email",
             "profile_picture",
+            "profile_picture_variants",
             "created_at",
         ]
 
@@ -21,9 +24,9 @@ class GameCommentSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
 
         if obj.profile_picture and hasattr(obj.profile_picture, "url"):
-            if request:
-                return request.build_absolute_uri(obj.profile_picture.url)
-            return obj.profile_picture.url
+            return absolute_url(request, obj.profile_picture.url)
 
         return None
 
+    def get_profile_picture_variants(self, obj):
+        return variant_urls(obj, "profile_picture", self.context.get("request"))
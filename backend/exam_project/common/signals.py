@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from exam_project.common.images import schedule_variants
+from exam_project.common.models import GameComment
+from exam_project.games.models import GameModel
+
+UserModel = get_user_model()
+
+PICTURE_FIELDS = {
+    GameModel: 'game_picture',
+    UserModel: 'profile_picture',
+    GameComment: 'profile_picture',
+}
+
+
+@receiver(post_save, sender=GameModel)
+@receiver(post_save, sender=UserModel)
+@receiver(post_save, sender=GameComment)
+def build_picture_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_variants(instance, PICTURE_FIELDS[sender])
@@ -1,8 +1,39 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import BytesIO
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image
+from django.core.files.base import ContentFile
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection, connections
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from exam_project.games.models import GameModel
-from exam_project.common.models import GameComment
+from exam_project.games.serializers import FastGameSerializer
+from exam_project.common import benchmarks, boot, media
+from exam_project.common.db.base import DatabaseWrapper as PooledDatabaseWrapper
+from exam_project.common.db.pool import ConnectionPool, PoolTimeout, pool_stats
+from exam_project.common.idempotency import purge_expired_keys, request_fingerprint
+from exam_project.common.instrumentation import RequestMetrics, _current, fingerprint, install_hooks
+from exam_project.common.images import build_variants, update_variants
+from exam_project.common.models import BoughtGame, GameComment, IdempotencyKey
 
 UserModel = get_user_model()
 
@@ -33,3 +64,571 @@ class CommentTests(TestCase):
         response = self.client.post(reverse('delete comment', args=[comment.pk]))
         self.assertEqual(response.status_code, 302)
         self.assertFalse(GameComment.objects.filter(pk=comment.pk).exists())
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        self.buyer = UserModel.objects.create_user(email='buyer@example.com', password='StrongPass123!', money=100)
+        self.seller = UserModel.objects.create_user(email='seller@example.com', password='StrongPass123!')
+        self.game = GameModel.objects.create(title='Retry Me', category='ACTION', price='20.00', user=self.seller)
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+
+    def buy(self, key, pk=None):
+        return self.client.post(reverse('games_buy', args=[pk or self.game.pk]), HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_first_response(self):
+        first = self.buy('abc')
+        self.assertEqual(first.status_code, 201)
+        with self.assertNumQueries(1):
+            retry = self.buy('abc')
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.buyer.refresh_from_db()
+        self.assertEqual(self.buyer.money, 80)
+
+    def test_key_reuse_for_other_request_is_rejected(self):
+        other = GameModel.objects.create(title='Other', category='ACTION', price='20.00', user=self.seller)
+        self.buy('abc')
+        self.assertEqual(self.buy('abc', pk=other.pk).status_code, 422)
+
+    def test_expired_keys_are_purged(self):
+        self.buy('abc')
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(purge_expired_keys(), 1)
+        # An expired key no longer replays
+        self.assertEqual(self.buy('abc').json()['detail'], 'Already purchased.')
+
+    def test_abandoned_in_progress_key_is_reclaimed(self):
+        request = Request(APIRequestFactory().post(reverse('games_buy', args=[self.game.pk])))
+        IdempotencyKey.objects.create(
+            user=self.buyer, key='abc', fingerprint=request_fingerprint(request),
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+        # Still running for all we know
+        self.assertEqual(self.buy('abc').status_code, 409)
+
+        # The worker died mid-request: nothing will ever finish the record
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        response = self.buy('abc')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(IdempotencyKey.objects.get(key='abc').status_code, 201)
+        self.assertEqual(self.buy('abc')['Idempotent-Replayed'], 'true')
+
+
+class CommentConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(email='commenter@example.com', password='StrongPass123!')
+        self.game = GameModel.objects.create(title='Commentable', category='ACTION', price='20.00', user=self.user)
+        self.comment = GameComment.objects.create(user=self.user, game=self.game, text='First')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_etag_changes_when_a_comment_goes_away(self):
+        url = reverse('comment_list_create', args=[self.game.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.comment.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_comes_from_the_game_row(self):
+        url = reverse('comment_list_create', args=[self.game.pk])
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('common_gamecomment', queries[0]['sql'])
+
+        # Same count afterwards, but not the same comments
+        self.comment.delete()
+        GameComment.objects.create(user=self.user, game=self.game, text='Second')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class CommentFeedTests(TestCase):
+    def setUp(self):
+        self.owner = UserModel.objects.create_user(email='owner@example.com', password='StrongPass123!')
+        self.game = GameModel.objects.create(title='Busy', category='ACTION', price='20.00', user=self.owner)
+        for i in range(30):
+            user = UserModel.objects.create_user(email=f'reader{i}@example.com', password='StrongPass123!')
+            GameComment.objects.create(user=user, game=self.game, text=f'Comment {i}')
+        self.url = reverse('comment_list_create', args=[self.game.pk])
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_pages_follow_cursor_in_creation_order(self):
+        texts = []
+        url = self.url
+        while url:
+            body = self.client.get(url).json()
+            self.assertEqual(body['count'], 30)
+            texts += [c['text'] for c in body['results']]
+            url = body['next']
+        self.assertEqual(texts, [f'Comment {i}' for i in range(30)])
+
+    def test_query_budget_does_not_grow_with_page_size(self):
+        # ETag from the game's comment counters, denormalized count, one joined page query
+        with self.assertNumQueries(3):
+            next_url = self.client.get(self.url).json()['next']
+        with self.assertNumQueries(3):
+            self.client.get(next_url)
+
+    def test_count_follows_creates_and_deletes(self):
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.comments_count, 30)
+        GameComment.objects.filter(game=self.game).first().delete()
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.comments_count, 29)
+        self.assertEqual(self.client.get(self.url).json()['count'], 29)
+
+    def test_async_feed_matches_and_keeps_query_budget(self):
+        async_url = reverse('comment_list_async', args=[self.game.pk])
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.owner)}'}
+        self.assertEqual(self.client.get(async_url).status_code, 401)
+
+        # Authentication is one more query: the async view has no force_authenticate
+        with self.assertNumQueries(4):
+            response = self.client.get(async_url, **auth)
+        expected = self.client.get(self.url)
+        self.assertEqual(response['ETag'], expected['ETag'])
+        self.assertEqual(response.content.replace(b'/api/async/', b'/api/'), expected.content)
+        self.assertEqual(self.client.get(async_url, HTTP_IF_NONE_MATCH=response['ETag'], **auth).status_code, 304)
+
+
+# ==========================
+# Image variants
+# ==========================
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root, IMAGE_VARIANTS_ASYNC=False)
+        self.override.enable()
+        self.user = UserModel.objects.create_user(email='pictures@example.com', password='StrongPass123!')
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _upload(self, name, size=(800, 400)):
+        buffer = BytesIO()
+        Image.new('RGBA', size, (200, 30, 30, 255)).save(buffer, format='PNG')
+        return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+    def test_build_variants_never_upscales(self):
+        name = self._upload('game_pics/small.png', size=(200, 100))
+        variants = build_variants(name)
+
+        self.assertEqual(variants['source'], name)
+        self.assertEqual(sorted(variants['webp']), ['160', '200'])
+        for sizes in (variants['webp'], variants['jpeg']):
+            for width, path in sizes.items():
+                self.assertTrue(default_storage.exists(path))
+                with default_storage.open(path) as f, Image.open(f) as image:
+                    self.assertEqual(image.width, int(width))
+
+    def test_variants_built_after_commit_and_exposed_by_api(self):
+        name = self._upload('game_pics/cover.png')
+        with self.captureOnCommitCallbacks(execute=True):
+            game = GameModel.objects.create(
+                title='Pictured', category='ACTION', price='10.00', user=self.user, game_picture=name,
+            )
+
+        game.refresh_from_db()
+        self.assertEqual(game.game_picture_variants['source'], name)
+        self.assertEqual(sorted(game.game_picture_variants['jpeg']), ['160', '320', '640'])
+
+        response = APIClient().get(reverse('games_detail', args=[game.pk]))
+        urls = response.json()['game_picture_variants']
+        self.assertTrue(urls['webp']['320'].startswith('http://testserver/media/derivatives/game_pics/cover.'))
+        self.assertTrue(urls['webp']['320'].endswith('.320w.webp'))
+
+    def test_stale_variants_are_hidden(self):
+        name = self._upload('game_pics/old.png')
+        with self.captureOnCommitCallbacks(execute=True):
+            game = GameModel.objects.create(
+                title='Replaced', category='ACTION', price='10.00', user=self.user, game_picture=name,
+            )
+        game.refresh_from_db()
+
+        game.game_picture = 'game_pics/missing.png'
+        with self.captureOnCommitCallbacks(execute=True):
+            game.save()
+
+        response = APIClient().get(reverse('games_detail', args=[game.pk]))
+        self.assertEqual(response.json()['game_picture_variants'], {})
+
+    def test_default_picture_gets_no_variants(self):
+        with mock.patch('exam_project.common.images.update_variants') as update, \
+                self.captureOnCommitCallbacks(execute=True):
+            game = GameModel.objects.create(title='Placeholder', category='ACTION', price='10.00', user=self.user)
+        self.assertEqual(game.game_picture.name, 'game_pics/no-image.jpg')
+        self.assertTrue((Path(settings.BASE_DIR) / 'mediafiles' / game.game_picture.name).is_file())
+        update.assert_not_called()
+
+    def test_profile_picture_variants_invalidate_the_cached_user(self):
+        self.user.profile_picture = self._upload('profile_pics/me.png')
+        self.user.save()
+        with mock.patch('exam_project.common.images.invalidate_users') as invalidate:
+            update_variants(UserModel, self.user.pk, 'profile_picture')
+        invalidate.assert_called_once_with([self.user.pk])
+
+
+# ==========================
+# Media serving
+# ==========================
+class MediaServingTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        default_storage.save('game_pics/cover.png', ContentFile(bytes(range(256)) * 4))
+        self.hashed = default_storage.save('derivatives/game_pics/cover.0123456789ab.320w.webp', ContentFile(b'webp'))
+        self.url = reverse('media', args=['game_pics/cover.png'])
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_streams_file_with_validators(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(256)) * 4)
+        self.assertEqual((response['Content-Type'], response['Accept-Ranges']), ('image/png', 'bytes'))
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+        hashed = self.client.get(reverse('media', args=[self.hashed]))
+        self.assertEqual(hashed['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_byte_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(10, 20)))
+        self.assertEqual((response['Content-Range'], response['Content-Length']), ('bytes 10-19/1024', '10'))
+
+        suffix = self.client.get(self.url, HTTP_RANGE='bytes=-4')
+        self.assertEqual(b''.join(suffix.streaming_content), bytes(range(252, 256)))
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=5000-').status_code, 416)
+        # A stale If-Range gets the whole file
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE='"old"').status_code, 200)
+
+    def test_ranges_of_an_empty_file_are_unsatisfiable(self):
+        default_storage.save('game_pics/empty.png', ContentFile(b''))
+        url = reverse('media', args=['game_pics/empty.png'])
+        for header in ('bytes=-4', 'bytes=0-', 'bytes=0-0'):
+            response = self.client.get(url, HTTP_RANGE=header)
+            self.assertEqual((response.status_code, response['Content-Range']), (416, 'bytes */0'), header)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_offload_to_proxy(self):
+        with mock.patch.object(media, 'MEDIA_ACCEL', 'x-accel-redirect'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/game_pics/cover.png')
+        self.assertEqual(response.content, b'')
+
+        with mock.patch.object(media, 'MEDIA_ACCEL', 'x-sendfile'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], str(Path(self.media_root) / 'game_pics' / 'cover.png'))
+
+    def test_missing_and_traversal_are_404(self):
+        self.assertEqual(self.client.get(reverse('media', args=['game_pics/none.png'])).status_code, 404)
+        self.assertEqual(self.client.get('/media/../settings.py').status_code, 404)
+        self.assertEqual(self.client.get(reverse('media', args=['game_pics'])).status_code, 404)
+        self.assertEqual(self.client.post(self.url).status_code, 405)
+
+
+# ==========================
+# Boot
+# ==========================
+class BootTests(TestCase):
+    def setUp(self):
+        self.static_src, self.static_root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.asset = Path(self.static_src) / 'app.css'
+        self.asset.write_text('body {}')
+        self.override = override_settings(
+            STATICFILES_DIRS=[self.static_src], STATIC_ROOT=self.static_root,
+            STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+        )
+        self.override.enable()
+        user = UserModel.objects.create_user(email='boot@example.com', password='StrongPass123!')
+        GameModel.objects.create(title='Booted', category='ACTION', price='10.00', user=user)
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.static_src, ignore_errors=True)
+        shutil.rmtree(self.static_root, ignore_errors=True)
+
+    def statuses(self, **kwargs):
+        return {phase['phase']: phase['status'] for phase in boot.run_boot(**kwargs)}
+
+    def test_unchanged_steps_are_skipped(self):
+        self.assertIn(('games', '0011_filter_indexes'), boot.disk_migrations())
+        self.assertEqual(boot.unapplied_migrations(), set())
+
+        self.assertEqual(self.statuses(), {
+            'database': 'ran', 'migrate': 'skipped', 'collectstatic': 'ran', 'initial_games': 'skipped',
+        })
+        self.assertTrue((Path(self.static_root) / 'app.css').exists())
+        self.assertEqual(self.statuses()['collectstatic'], 'skipped')
+
+        self.asset.write_text('body { color: red }')
+        later = time.time() + 10  # collectstatic compares mtimes to the second
+        os.utime(self.asset, (later, later))
+        self.assertEqual(self.statuses()['collectstatic'], 'ran')
+        self.assertEqual((Path(self.static_root) / 'app.css').read_text(), 'body { color: red }')
+        self.assertEqual(self.statuses(force=True)['collectstatic'], 'ran')
+
+    def test_missing_migration_row_triggers_migrate(self):
+        with mock.patch.object(boot, 'disk_migrations', return_value={('games', '9999_future')}):
+            self.assertEqual(boot.unapplied_migrations(), {('games', '9999_future')})
+
+
+# ==========================
+# Connection pool
+# ==========================
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.autocommit = True
+        self.info = mock.Mock(transaction_status=0)
+        self.executed = []
+
+    def close(self):
+        self.closed = True
+
+    def rollback(self):
+        self.info.transaction_status = 0
+
+    def cursor(self):
+        cursor = mock.MagicMock()
+        cursor.__enter__.return_value.execute.side_effect = self.executed.append
+        return cursor
+
+
+class ConnectionPoolTests(TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.pool = ConnectionPool(max_size=2, max_lifetime=100, timeout=0.05, check_idle=10, clock=lambda: self.now)
+
+    def test_reuse_lifetime_and_health_check(self):
+        first = self.pool.checkout(FakeConnection)
+        self.pool.checkin(first)
+        self.assertIs(self.pool.checkout(FakeConnection), first)
+        self.pool.checkin(first)
+
+        self.now = 20  # idle long enough to be checked, and the check fails
+        self.pool.check = lambda connection: False
+        second = self.pool.checkout(FakeConnection)
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+
+        self.now = 200  # past MAX_LIFETIME: closed on checkin
+        self.pool.checkin(second)
+        self.assertTrue(second.closed)
+
+        stats = self.pool.stats()
+        self.assertEqual(
+            (stats['checkouts'], stats['hits'], stats['misses'], stats['discarded'], stats['recycled'], stats['size']),
+            (3, 1, 2, 1, 1, 0),
+        )
+
+    def test_size_limit_waits_then_times_out(self):
+        self.pool.clock = time.monotonic
+        held = [self.pool.checkout(FakeConnection) for _ in range(2)]
+        with self.assertRaises(PoolTimeout):
+            self.pool.checkout(FakeConnection)
+
+        threading.Timer(0.01, self.pool.checkin, [held[0]]).start()
+        self.assertIs(self.pool.checkout(FakeConnection), held[0])
+        stats = self.pool.stats()
+        self.assertEqual((stats['waits'], stats['timeouts'], stats['in_use']), (2, 1, 2))
+        self.assertGreater(stats['wait_ms_max'], 0)
+
+    def test_backend_returns_connections_to_the_pool(self):
+        settings_dict = {**connections.settings['default'], 'ENGINE': 'exam_project.common.db', 'POOL': {'MAX_SIZE': 1}}
+        wrapper = PooledDatabaseWrapper(settings_dict, 'pooled-test')
+        with mock.patch.object(PostgresDatabaseWrapper, 'get_new_connection', side_effect=lambda params: FakeConnection()) as connect:
+            for _ in range(3):
+                wrapper.connection = connection = wrapper.get_new_connection({'dbname': 'pooled'})
+                connection.info.transaction_status = 2  # left in a transaction
+                wrapper.close()
+        self.assertEqual(connect.call_count, 1)
+        stats = pool_stats()['pooled-test'][0]
+        self.assertEqual((stats['hits'], stats['idle']), (2, 1))
+        # Rolled back, then the session state is dropped before the next checkout
+        self.assertEqual(connection.executed, ['DISCARD ALL'] * 3)
+
+    def test_check_and_reset_run_without_the_lock(self):
+        def blocks_others(connection):
+            # Another thread can use the pool while a check or reset is running
+            other = threading.Thread(target=self.pool.stats)
+            other.start()
+            other.join(1)
+            seen.append(other.is_alive())
+            return True
+
+        seen = []
+        self.pool.check_idle = 0
+        self.pool.check = self.pool.reset = blocks_others
+        connection = self.pool.checkout(FakeConnection)
+        self.pool.checkin(connection)
+        self.assertIs(self.pool.checkout(FakeConnection), connection)
+        self.assertEqual(seen, [False, False])
+        self.assertEqual(self.pool.stats()['size'], 1)
+
+    def test_stats_endpoint_is_admin_only(self):
+        client = APIClient()
+        client.force_authenticate(UserModel.objects.create_user(email='pool@example.com', password='StrongPass123!'))
+        self.assertEqual(client.get(reverse('db_pool_stats')).status_code, 403)
+
+        client.force_authenticate(UserModel.objects.create_superuser(email='dba@example.com', password='StrongPass123!'))
+        response = client.get(reverse('db_pool_stats'))
+        self.assertEqual(response.json()['engine'], settings.DATABASES['default']['ENGINE'])
+        with self.assertRaises(ValueError):
+            benchmarks.run_pool_benchmark(1)  # PostgreSQL only
+
+
+# ==========================
+# Exports
+# ==========================
+class ExportTests(TestCase):
+    def setUp(self):
+        self.admin = UserModel.objects.create_superuser(email='admin@example.com', password='StrongPass123!')
+        self.buyer = UserModel.objects.create_user(email='buyer@example.com', password='StrongPass123!')
+        self.game = GameModel.objects.create(title='Exported', category='PUZZLE', price='12.50', user=self.admin)
+        BoughtGame.objects.create(game=self.game, user=self.buyer)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def download(self, name, file_format):
+        response = self.client.get(reverse('export', args=[name, file_format]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        return gzip.decompress(b''.join(response.streaming_content)).decode()
+
+    def test_games_ndjson(self):
+        rows = [json.loads(line) for line in self.download('games', 'ndjson').splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['title'], 'Exported')
+        self.assertEqual(rows[0]['price'], '12.50')
+        self.assertEqual(rows[0]['seller_email'], 'admin@example.com')
+
+    def test_purchases_csv(self):
+        rows = list(csv.DictReader(self.download('purchases', 'csv').splitlines()))
+        self.assertEqual(rows, [{
+            'id': str(BoughtGame.objects.get().pk),
+            'game_id': str(self.game.pk),
+            'game_title': 'Exported',
+            'price': '12.50',
+            'buyer_id': str(self.buyer.pk),
+            'buyer_email': 'buyer@example.com',
+            'seller_id': str(self.admin.pk),
+        }])
+
+    def test_users_export_has_no_passwords_and_is_admin_only(self):
+        rows = [json.loads(line) for line in self.download('users', 'ndjson').splitlines()]
+        self.assertEqual({row['email'] for row in rows}, {'admin@example.com', 'buyer@example.com'})
+        self.assertNotIn('password', rows[0])
+
+        self.client.force_authenticate(self.buyer)
+        self.assertEqual(self.client.get(reverse('export', args=['users', 'csv'])).status_code, 403)
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get(reverse('export', args=['secrets', 'csv'])).status_code, 404)
+
+
+# ==========================
+# Benchmarks
+# ==========================
+class BenchmarkBudgetTests(TestCase):
+    def test_endpoints_stay_within_query_budgets(self):
+        with mock.patch.dict(benchmarks.SIZES, tiny=dict(users=20, games=60, purchases=150, comments=60)):
+            results = {'tiny': benchmarks.run_size('tiny', repeat=2)}
+
+        self.assertEqual(set(results['tiny']), {endpoint.name for endpoint in benchmarks.ENDPOINTS})
+        self.assertEqual(benchmarks.check_results(results), [])
+
+    def test_session_engines_are_compared_on_html_pages(self):
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tempfile.mkdtemp()}}
+        with mock.patch.dict(benchmarks.SIZES, tiny=dict(users=20, games=60, purchases=150, comments=60)), \
+                override_settings(CACHES=shared):
+            results = benchmarks.run_sessions('tiny', repeat=2)
+
+        self.assertEqual(set(results), set(benchmarks.SESSION_ENGINES))
+        for name, stats in results['db'].items():
+            self.assertEqual(results['cached'][name]['queries'], stats['queries'] - 1)
+
+    def test_regressions_against_baseline_are_reported(self):
+        stats = {'p50_ms': 5.0, 'p95_ms': 40.0, 'queries': 3, 'bytes': 100, 'budget': 3}
+        baseline = {'small': {'comments': dict(stats, p95_ms=10.0, queries=2)}}
+
+        failures = benchmarks.check_results({'small': {'comments': stats}}, baseline)
+        self.assertEqual(len(failures), 2)
+        self.assertIn('baseline was 2', failures[0])
+        self.assertIn('p95 40.0ms', failures[1])
+
+
+# ==========================
+# Request metrics
+# ==========================
+METRICS_MIDDLEWARE = ['exam_project.common.instrumentation.RequestMetricsMiddleware', *settings.MIDDLEWARE]
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(email='timed@example.com', password='StrongPass123!')
+        self.game = GameModel.objects.create(title='Timed', category='ACTION', price='20.00', user=self.user)
+
+    @override_settings(MIDDLEWARE=METRICS_MIDDLEWARE, REQUEST_METRICS_SAMPLE_RATE=1.0)
+    def test_sampled_request_gets_server_timing_and_log_line(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.assertLogs('exam_project.request_metrics', 'INFO') as logs:
+            response = client.get(reverse('comment_list_create', args=[self.game.pk]))
+
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="3 queries, 0 repeated"')
+        self.assertIn('serialize;dur=', timing)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record['status'], record['queries']), (200, 3))
+
+        with self.assertLogs('exam_project.request_metrics', 'INFO') as logs:
+            response = self.client.get(reverse('index'))
+        self.assertNotEqual(json.loads(logs.records[0].getMessage())['template_ms'], 0)
+
+    def test_fast_list_serialization_is_timed(self):
+        install_hooks()
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            rows = list(FastGameSerializer.values(GameModel.objects.all()))
+            self.assertEqual(len(FastGameSerializer(rows).data), 1)
+        finally:
+            _current.reset(token)
+        self.assertGreater(metrics.timers['serialize'], 0)
+
+    @override_settings(MIDDLEWARE=METRICS_MIDDLEWARE, REQUEST_METRICS_SAMPLE_RATE=1.0)
+    async def test_async_orm_queries_are_counted_under_asgi(self):
+        with self.assertLogs('exam_project.request_metrics', 'INFO') as logs:
+            response = await self.async_client.get(reverse('games_detail_async', args=[self.game.pk]))
+        self.assertEqual(response.status_code, 200)
+        # ETag lookup and the game itself, both run by the async ORM's worker thread
+        self.assertRegex(response['Server-Timing'], r'desc="2 queries, 0 repeated"')
+        self.assertEqual(json.loads(logs.records[0].getMessage())['queries'], 2)
+
+    @override_settings(MIDDLEWARE=METRICS_MIDDLEWARE, REQUEST_METRICS_SAMPLE_RATE=0.0)
+    def test_unsampled_request_is_untouched(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('games_list_create')))
+
+    def test_repeated_query_shapes_are_grouped(self):
+        metrics = RequestMetrics()
+        execute = lambda sql, params, many, context: None  # noqa: E731
+        for i in range(3):
+            metrics.record_query(execute, 'SELECT * FROM t WHERE id = %s', [i], False, {})
+        metrics.record_query(execute, 'SELECT * FROM t WHERE id IN (%s, %s)', [1, 2], False, {})
+        metrics.record_query(execute, 'SELECT * FROM t WHERE id IN (%s)', [1], False, {})
+
+        self.assertEqual([d['count'] for d in metrics.duplicates()], [3, 2])
+        self.assertEqual(fingerprint('a IN (%s, %s)')[1], 'a IN (...)')
@@ -1,7 +1,13 @@
+from django.utils.functional import SimpleLazyObject
+
+from exam_project.accounts.user_context import user_context
+
+
 def user_money(request):
-    if request.user.is_authenticated:
-        return {
-            'profile_money': request.user.money,
-            'profile_user': request.user,   # if the whole user object is needed
-        }
-    return {}
+    # Lazy: the user is only loaded if the template reads one of these
+    context = user_context(request)
+    return {
+        'user_context': context,
+        'profile_money': SimpleLazyObject(lambda: context.balance),
+        'profile_user': SimpleLazyObject(lambda: context.user),   # if the whole user object is needed
+    }
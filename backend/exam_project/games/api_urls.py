@@ -1,9 +1,11 @@
 from django.urls import path
 from exam_project.games.api_views import (
     GamesListCreateApiView,
+    GameFacetsApiView,
     GameRetrieveUpdateDeleteApiView,
     MyGamesListApiView,
     GameBuyApiView,
+    CheckoutApiView,
     BoughtGamesListApiView,
     SeedGamesApiView,
     LoadGamesApiView
@@ -11,9 +13,11 @@ from exam_project.games.api_views import (
 
 urlpatterns = [
     path('', GamesListCreateApiView.as_view(), name='games_list_create'),
+    path('facets/', GameFacetsApiView.as_view(), name='games_facets'),
     path('mine/', MyGamesListApiView.as_view(), name='games_mine'),
     path('<int:pk>/', GameRetrieveUpdateDeleteApiView.as_view(), name='games_detail'),
     path('<int:pk>/buy/', GameBuyApiView.as_view(), name='games_buy'),
+    path('checkout/', CheckoutApiView.as_view(), name='games_checkout'),
     path('bought-games/', BoughtGamesListApiView.as_view(), name='bought_games_list'),
     path('seed/', SeedGamesApiView.as_view(), name='games_seed'),
     path("load/", LoadGamesApiView.as_view(), name="load_games"),
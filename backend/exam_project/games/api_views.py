@@ -1,17 +1,25 @@
 from datetime import datetime
+import hashlib
 import random
 from decimal import Decimal
 
-from django.db import transaction
-from django.core.management import call_command
 
 from rest_framework import generics, filters, status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
+from exam_project.accounts.counters import adjust_user_counter
+from exam_project.common.conditional import conditional_get, timestamp, weak_etag
+from exam_project.common.idempotency import IdempotentMixin
+from .cache import CatalogCacheMixin, bump_catalog_version, get_catalog_version, normalize_query_params
+from .facets import game_facets
+from .filtering import FILTER_PARAMS, GameFilter
+from .importer import INITIAL_GAMES_FIXTURE, ImportFormatError, import_file
 from .models import GameModel
-from exam_project.common.models import BoughtGame
-from .serializers import GameSerializer, GameUpdateSerializer
+from .purchases import PurchaseError, checkout, purchase_game
+from .serializers import CheckoutSerializer, FastGameSerializer, GameSerializer, GameUpdateSerializer
+from .pagination_sort import GamePagination
+from .search import GameSearchFilter
 from .permission_mixins import (
     IsAuthenticatedMixin,
     OwnerOnlyMixin,
@@ -20,14 +28,75 @@ from .permission_mixins import (
 )
 
 
+# =====================================================
+# CONDITIONAL GET VALIDATORS
+# =====================================================
+def catalog_etag(request, version, per_user=False):
+    params = normalize_query_params(request.query_params, CatalogCacheMixin.cache_query_params)
+    scope = request.user.pk if per_user else 'all'
+    return weak_etag('catalog', version, scope, hashlib.sha1(params.encode()).hexdigest()[:16])
+
+
+def catalog_validators(per_user=False):
+    # Lists change only when the catalog version does: no DB access needed
+    def validators(request, *args, **kwargs):
+        return catalog_etag(request, get_catalog_version(), per_user), None
+    return validators
+
+
+def game_timestamps(pk):
+    return GameModel.objects.filter(pk=pk).values_list('updated_at', 'user__updated_at')
+
+
+def game_etag(pk, row):
+    if row is None:
+        return None
+    game_updated, seller_updated = row
+    return (
+        weak_etag('game', pk, timestamp(game_updated), timestamp(seller_updated)),
+        max(filter(None, row)),
+    )
+
+
+def game_validators(request, pk, *args, **kwargs):
+    return game_etag(pk, game_timestamps(pk).first())
+
+
+# =====================================================
+# FAST LIST PATH
+# =====================================================
+def fast_rows(queryset):
+    # Keyset cursors read the ordering columns (e.g. search_rank) from each row
+    ordering = [f.lstrip('-') for f in queryset.query.order_by if isinstance(f, str)]
+    return FastGameSerializer.values(queryset, *ordering)
+
+
+class FastGameListMixin:
+    """GET lists are built from .values() rows by FastGameSerializer instead of GameSerializer."""
+
+    def list(self, request, *args, **kwargs):
+        rows = fast_rows(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(FastGameSerializer(page, self.get_serializer_context()).data)
+        return Response(FastGameSerializer(rows, self.get_serializer_context()).data)
+
+
 # =====================================================
 # PUBLIC: LIST GAMES (GET) | AUTH REQUIRED: CREATE (POST)
 # =====================================================
-class GamesListCreateApiView(GameQuerysetMixin, generics.ListCreateAPIView):
+class GamesListCreateApiView(
+    IdempotentMixin,
+    CatalogCacheMixin,
+    FastGameListMixin,
+    GameQuerysetMixin,
+    generics.ListCreateAPIView
+):
     serializer_class = GameSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title']
-    ordering_fields = ['price', 'title', 'id']
+    pagination_class = GamePagination
+    filter_backends = [filters.OrderingFilter, GameFilter, GameSearchFilter]
+    ordering_fields = ['price', 'title', 'created_at', 'id']
     ordering = ['-id']
 
     def get_permissions(self):
@@ -35,14 +104,37 @@ class GamesListCreateApiView(GameQuerysetMixin, generics.ListCreateAPIView):
             return [permissions.IsAuthenticated()]
         return [permissions.AllowAny()]
 
+    @conditional_get(catalog_validators())
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
+# =====================================================
+# PUBLIC: FACETS FOR THE CURRENT SEARCH
+# =====================================================
+class GameFacetsApiView(CatalogCacheMixin, GameQuerysetMixin, generics.ListAPIView):
+    """Category counts and a price histogram; one aggregate query, cached by catalog version."""
+    permission_classes = [permissions.AllowAny]
+    filter_backends = [GameFilter, GameSearchFilter]
+    pagination_class = None
+    cache_query_params = ('search', *FILTER_PARAMS)
+
+    @conditional_get(catalog_validators())
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return Response(game_facets(self.filter_queryset(self.get_queryset())))
+
+
 # =====================================================
 # GAME DETAILS / UPDATE / DELETE
 # =====================================================
 class GameRetrieveUpdateDeleteApiView(
+    CatalogCacheMixin,
     OwnerOnlyMixin,
     GameQuerysetMixin,
     generics.RetrieveUpdateDestroyAPIView
@@ -52,6 +144,10 @@ class GameRetrieveUpdateDeleteApiView(
             return [permissions.IsAuthenticated()]
         return [permissions.AllowAny()]
 
+    @conditional_get(game_validators)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_serializer_class(self):
         return GameSerializer if self.request.method == 'GET' else GameUpdateSerializer
 
@@ -59,65 +155,73 @@ class GameRetrieveUpdateDeleteApiView(
 # =====================================================
 # MY GAMES (AUTH ONLY)
 # =====================================================
-class MyGamesListApiView(IsAuthenticatedMixin, MyGamesQuerysetMixin, generics.ListAPIView):
+class MyGamesListApiView(IsAuthenticatedMixin, FastGameListMixin, MyGamesQuerysetMixin, generics.ListAPIView):
     serializer_class = GameSerializer
+    pagination_class = GamePagination
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['price', 'title', 'created_at', 'id']
+    ordering = ['-id']
+
+    @conditional_get(catalog_validators(per_user=True))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
 
 # =====================================================
 # BUY GAME (AUTH ONLY)
 # =====================================================
-class GameBuyApiView(IsAuthenticatedMixin, generics.CreateAPIView):
+class GameBuyApiView(IdempotentMixin, IsAuthenticatedMixin, generics.CreateAPIView):
     serializer_class = GameSerializer
 
     def post(self, request, *args, **kwargs):
-        game_id = kwargs['pk']
-        buyer = request.user
-
-        with transaction.atomic():
-            try:
-                game = GameModel.objects.select_for_update().get(pk=game_id)
-            except GameModel.DoesNotExist:
-                return Response({"detail": "Game not found."}, status=status.HTTP_404_NOT_FOUND)
-
-            # Already bought?
-            if BoughtGame.objects.filter(user=buyer, game=game).exists():
-                return Response({"detail": "Already purchased."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            game = purchase_game(request.user, kwargs['pk'])
+        except PurchaseError as e:
+            return Response({"detail": e.detail}, status=e.status_code)
 
-            # Check funds
-            if buyer.money < game.price:
-                return Response({"detail": "Insufficient funds."}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = GameSerializer(game, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-            # Deduct from buyer
-            buyer.money -= game.price
-            buyer.save(update_fields=['money'])
 
-            # Pay seller ONLY if seller exists
-            seller = game.user
-            if seller is not None:
-                seller.money += game.price
-                seller.save(update_fields=['money'])
+# =====================================================
+# CHECKOUT: BUY SEVERAL GAMES AT ONCE (AUTH ONLY)
+# =====================================================
+class CheckoutApiView(IdempotentMixin, IsAuthenticatedMixin, APIView):
+    def post(self, request, *args, **kwargs):
+        serializer = CheckoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
 
-            # Create purchase record
-            BoughtGame.objects.create(user=buyer, game=game)
+        items = checkout(request.user, serializer.validated_data['game_ids'])
+        purchased = sum(item['status'] == 'purchased' for item in items)
 
-        serializer = GameSerializer(game, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(
+            {"purchased": purchased, "money": request.user.money, "items": items},
+            status=status.HTTP_201_CREATED if purchased else status.HTTP_400_BAD_REQUEST,
+        )
 
 
 # =====================================================
 # BOUGHT GAMES (AUTH ONLY)
 # =====================================================
-class BoughtGamesListApiView(IsAuthenticatedMixin, generics.ListAPIView):
+def bought_games(user):
+    return (
+        GameModel.objects
+        .filter(boughtgame__user=user)
+        .select_related('user')
+        .order_by('-id')
+        .distinct()
+    )
+
+
+class BoughtGamesListApiView(IsAuthenticatedMixin, FastGameListMixin, generics.ListAPIView):
     serializer_class = GameSerializer
 
+    @conditional_get(catalog_validators(per_user=True))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
-        return (
-            GameModel.objects
-            .filter(boughtgame__user=self.request.user)
-            .select_related('user')
-            .order_by('-id')
-            .distinct()
-        )
+        return bought_games(self.request.user)
 
 
 # =====================================================
@@ -128,11 +232,12 @@ class SeedGamesApiView(IsAuthenticatedMixin, generics.CreateAPIView):
 
     def post(self, request, *args, **kwargs):
         categories = [c[0] for c in GameModel._meta.get_field("category").choices]
-        now = datetime.now().strftime("%Y%m%d-%H%M%S")
+        # Short stamp so "Game 20 - <stamp>" fits the 24 character title untruncated
+        now = datetime.now().strftime("%m%d%H%M%S")
 
-        GameModel.objects.bulk_create([
+        games = GameModel.objects.bulk_create([
             GameModel(
-                title=f"Game {i} - {now}"[:24],
+                title=f"Game {i} - {now}",
                 category=random.choice(categories),
                 price=Decimal(random.randrange(100, 280)),
                 summary="Auto-generated",
@@ -140,6 +245,9 @@ class SeedGamesApiView(IsAuthenticatedMixin, generics.CreateAPIView):
             )
             for i in range(1, 21)
         ])
+        # bulk_create skips post_save, so invalidate/count explicitly
+        bump_catalog_version()
+        adjust_user_counter('games_count', {request.user.id: len(games)})
 
         return Response(
             {"detail": "20 games created successfully."},
@@ -152,28 +260,26 @@ class SeedGamesApiView(IsAuthenticatedMixin, generics.CreateAPIView):
 # =====================================================
 class LoadGamesApiView(IsAuthenticatedMixin, APIView):
     """
-    Loads initial_games.json only if no games exist.
-    If the database becomes empty again later, loading is allowed again.
+    Loads the games from initial_games.json that are not in the catalog yet.
+    Existing games (matched by title) are left untouched.
     """
 
     def post(self, request, *args, **kwargs):
-        # If games exist, block loading
-        if GameModel.objects.exists():
-            return Response(
-                {"detail": "Games already exist. Loading skipped."},
-                status=status.HTTP_200_OK
-            )
-
         try:
-            call_command("loaddata", "initial_games.json")
-
+            stats = import_file(INITIAL_GAMES_FIXTURE, update=False)
+        except (OSError, ImportFormatError) as e:
             return Response(
-                {"detail": "Initial games loaded successfully."},
-                status=status.HTTP_201_CREATED
+                {"detail": f"Error loading games: {e}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-        except Exception as e:
+        if not stats.created:
             return Response(
-                {"detail": f"Error loading games: {e}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {"detail": "Games already exist. Loading skipped.", **stats.as_dict()},
+                status=status.HTTP_200_OK
             )
+
+        return Response(
+            {"detail": f"{stats.created} initial games loaded successfully.", **stats.as_dict()},
+            status=status.HTTP_201_CREATED
+        )
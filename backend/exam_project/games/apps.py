@@ -1,5 +1,4 @@
 from django.apps import AppConfig
-from django.core.management import call_command
 
 
 class CommonConfig(AppConfig):
@@ -7,7 +6,4 @@ class CommonConfig(AppConfig):
     name = 'exam_project.games'
 
     def ready(self):
-        try:
-            call_command("load_initial_games")
-        except Exception:
-            pass
+        from exam_project.games import signals  # noqa: F401
@@ -0,0 +1,8 @@
+from django.urls import path
+from exam_project.games.async_views import BoughtGamesAsyncView, GameDetailAsyncView, GamesListAsyncView
+
+urlpatterns = [
+    path('', GamesListAsyncView.as_view(), name='games_list_async'),
+    path('<int:pk>/', GameDetailAsyncView.as_view(), name='games_detail_async'),
+    path('bought-games/', BoughtGamesAsyncView.as_view(), name='bought_games_list_async'),
+]
@@ -0,0 +1,128 @@
+"""
+Async (ASGI) versions of the hot catalog read endpoints, under /api/async/games/.
+
+Each view returns the same payload, validators and response cache entries as
+its DRF counterpart in api_views.py, so clients can switch base URLs freely.
+While a request waits on the database, cache or a slow client, the event loop
+serves other requests instead of holding a worker thread.
+"""
+from django.core.cache import cache
+from django.http import Http404
+from rest_framework import exceptions
+
+from exam_project.common.async_api import AsyncAPIView
+from .api_views import (
+    GameRetrieveUpdateDeleteApiView,
+    GamesListCreateApiView,
+    bought_games,
+    catalog_etag,
+    fast_rows,
+    game_etag,
+    game_timestamps,
+)
+from .cache import (
+    CATALOG_CACHE_TIMEOUT,
+    CatalogCacheMixin,
+    aget_catalog_version,
+    async_single_flight,
+    normalize_query_params,
+    response_cache_key,
+)
+from .models import GameModel
+from .pagination_sort import AsyncPageNumberPagination, GamePagination
+from .serializers import FastGameSerializer, GameSerializer
+
+
+class AsyncCatalogCacheMixin:
+    """
+    Async CatalogCacheMixin. Entries are keyed by the DRF view named in
+    `cache_view`, so both versions of an endpoint fill the same cache.
+    Concurrent misses of a key on this event loop compute the page once.
+    """
+    cache_view = None
+    cache_query_params = CatalogCacheMixin.cache_query_params
+
+    async def get_catalog_version(self):
+        if not hasattr(self, '_catalog_version'):
+            self._catalog_version = await aget_catalog_version()
+        return self._catalog_version
+
+    async def get(self, request, **kwargs):
+        key = response_cache_key(
+            self.cache_view.__name__,
+            request,
+            kwargs,
+            normalize_query_params(request.query_params, self.cache_query_params),
+            await self.get_catalog_version(),
+        )
+        cached = await cache.aget(key)
+        if cached is None:
+            cached = await async_single_flight.do(key, lambda: self._acompute(key, request, **kwargs))
+        status_code, data = cached
+        return self.render(data, status_code)
+
+    async def _acompute(self, key, request, **kwargs):
+        # Another flight may have filled the entry while we waited to lead
+        cached = await cache.aget(key)
+        if cached is not None:
+            return cached
+
+        try:
+            cached = (200, await self.get_data(request, **kwargs))
+        except (Http404, exceptions.APIException) as exc:
+            # Followers get the same error; only successful payloads are stored
+            cached = self.exception_payload(exc)
+        if cached[0] == 200:
+            await cache.aset(key, cached, CATALOG_CACHE_TIMEOUT)
+        return cached
+
+
+# =====================================================
+# PUBLIC: LIST GAMES
+# =====================================================
+class GamesListAsyncView(AsyncCatalogCacheMixin, AsyncAPIView):
+    cache_view = GamesListCreateApiView
+    pagination_class = GamePagination
+    filter_backends = GamesListCreateApiView.filter_backends
+    ordering_fields = GamesListCreateApiView.ordering_fields
+    ordering = GamesListCreateApiView.ordering
+
+    async def get_validators(self, **kwargs):
+        return catalog_etag(self.request, await self.get_catalog_version()), None
+
+    async def get_data(self, request):
+        rows = fast_rows(await self.afilter_queryset(GameModel.objects.all()))
+        page = await self.apaginate_queryset(rows)
+        return self.get_paginated_data(FastGameSerializer(page, {'request': request}).data)
+
+
+# =====================================================
+# PUBLIC: GAME DETAILS
+# =====================================================
+class GameDetailAsyncView(AsyncCatalogCacheMixin, AsyncAPIView):
+    cache_view = GameRetrieveUpdateDeleteApiView
+
+    async def get_validators(self, pk):
+        return game_etag(pk, await game_timestamps(pk).afirst())
+
+    async def get_data(self, request, pk):
+        try:
+            game = await GameModel.objects.select_related('user').aget(pk=pk)
+        except GameModel.DoesNotExist:
+            raise Http404("No GameModel matches the given query.")
+        return GameSerializer(game, context={'request': request}).data
+
+
+# =====================================================
+# BOUGHT GAMES (AUTH ONLY)
+# =====================================================
+class BoughtGamesAsyncView(AsyncAPIView):
+    authentication_required = True
+    pagination_class = AsyncPageNumberPagination
+
+    async def get_validators(self, **kwargs):
+        return catalog_etag(self.request, await aget_catalog_version(), per_user=True), None
+
+    async def get(self, request):
+        page = await self.apaginate_queryset(fast_rows(bought_games(request.user)))
+        return self.render(self.get_paginated_data(FastGameSerializer(page, {'request': request}).data))
@@ -0,0 +1,181 @@
+"""
+Versioned read-through cache for the catalog API.
+
+Cached responses are keyed by the catalog version, so invalidation is a single
+`incr` of that version (done from games.signals on every GameModel save/delete,
+every purchase and every change of a seller's displayed name) instead of
+tracking and deleting individual keys. Stale
+entries simply stop being addressed and expire on their own.
+
+With several worker processes, CACHES must point at a shared backend
+(DJANGO_CACHE_BACKEND) so every worker sees the same version.
+"""
+import asyncio
+import hashlib
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+CATALOG_VERSION_KEY = 'games:catalog-version'
+CATALOG_CACHE_TIMEOUT = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 60)
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a version key lost to eviction never
+        # re-addresses entries cached under an older counter value.
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+async def aget_catalog_version():
+    version = await cache.aget(CATALOG_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = await cache.aget(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        return get_catalog_version()
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one in-flight computation."""
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+single_flight = SingleFlight()
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines: followers await the leader's task on the same event loop."""
+
+    def __init__(self):
+        self._calls = weakref.WeakKeyDictionary()  # event loop -> {key: task}
+
+    async def do(self, key, fn):
+        calls = self._calls.setdefault(asyncio.get_running_loop(), {})
+        task = calls.get(key)
+        if task is None:
+            task = calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: calls.pop(key, None))
+        # A cancelled follower must not cancel the leader's computation
+        return await asyncio.shield(task)
+
+
+async_single_flight = AsyncSingleFlight()
+
+
+def normalize_query_params(query_params, names):
+    normalized = []
+    for name in names:
+        value = query_params.get(name, '').strip()
+        if name == 'search':
+            value = ' '.join(value.lower().split())
+        elif name == 'ordering':
+            value = ','.join(part.strip() for part in value.split(',') if part.strip())
+        elif name == 'category':
+            value = ','.join(sorted({part.strip().upper() for part in value.split(',') if part.strip()}))
+        elif name == 'page' and value == '1':
+            value = ''
+        if value:
+            normalized.append(f'{name}={value}')
+    return '&'.join(normalized)
+
+
+def response_cache_key(name, request, kwargs, params, version):
+    """Cache key of one catalog response; `name` is the DRF view class name."""
+    raw = '|'.join([
+        name,
+        request.build_absolute_uri('/'),
+        ','.join(f'{k}={v}' for k, v in sorted(kwargs.items())),
+        params,
+    ])
+    digest = hashlib.sha1(raw.encode()).hexdigest()
+    return f'games:response:{version}:{digest}'
+
+
+class CatalogCacheMixin:
+    """
+    Serve GET responses of catalog views from the versioned cache.
+
+    Only params listed in `cache_query_params` take part in the key; anything
+    else a client appends does not fragment the cache.
+    """
+    cache_query_params = (
+        'search', 'ordering', 'page', 'pagination', 'cursor',
+        'category', 'min_price', 'max_price', 'seller', 'created_after',
+    )
+
+    def get(self, request, *args, **kwargs):
+        key = self.get_cache_key(request, **kwargs)
+        cached = cache.get(key)
+        if cached is None:
+            cached = single_flight.do(key, lambda: self._compute(key, request, *args, **kwargs))
+        status_code, data = cached
+        return Response(data, status=status_code)
+
+    def get_cache_key(self, request, **kwargs):
+        return response_cache_key(
+            self.__class__.__name__,
+            request,
+            kwargs,
+            normalize_query_params(request.query_params, self.cache_query_params),
+            get_catalog_version(),
+        )
+
+    def _compute(self, key, request, *args, **kwargs):
+        # Another flight may have filled the entry while we waited to lead
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = super().get(request, *args, **kwargs)
+        cached = (response.status_code, response.data)
+        if response.status_code == 200:
+            cache.set(key, cached, CATALOG_CACHE_TIMEOUT)
+        return cached
@@ -0,0 +1,61 @@
+"""
+Facet counts for the catalog browse UI.
+
+`game_facets(queryset)` returns per-category counts and a price histogram for
+whatever `queryset` matches. Every count is a filtered COUNT in a single
+aggregate query (FILTER (WHERE ...) on PostgreSQL), so there is one query per
+request rather than one per category and bucket. The API view also caches the
+result by catalog version (see GameFacetsApiView), so repeated facet requests
+for the same search are cache hits until the catalog changes.
+"""
+from decimal import Decimal
+
+from django.db.models import Count, Max, Min, Q
+
+from exam_project.games.models import Category
+
+# Prices run from 10.00 to 999.99 and are log-normally distributed, so the
+# buckets widen with the price. The last bucket is open-ended.
+PRICE_BUCKET_EDGES = tuple(Decimal(edge) for edge in ('10', '20', '30', '50', '75', '100', '150', '250', '500'))
+
+
+def price_buckets(edges=PRICE_BUCKET_EDGES):
+    """`(low, high)` pairs covering [edges[0], inf); high is None for the last bucket."""
+    return list(zip(edges, [*edges[1:], None]))
+
+
+def _bucket_filter(low, high):
+    return Q(price__gte=low, price__lt=high) if high is not None else Q(price__gte=low)
+
+
+def game_facets(queryset, edges=PRICE_BUCKET_EDGES):
+    buckets = price_buckets(edges)
+    aggregates = {
+        'total': Count('pk'),
+        'min_price': Min('price'),
+        'max_price': Max('price'),
+        **{f'category_{c.name}': Count('pk', filter=Q(category=c.name)) for c in Category},
+        **{f'price_{i}': Count('pk', filter=_bucket_filter(low, high)) for i, (low, high) in enumerate(buckets)},
+    }
+    row = queryset.order_by().aggregate(**aggregates)
+
+    return {
+        'count': row['total'],
+        'categories': [
+            {'value': c.name, 'label': c.value, 'count': row[f'category_{c.name}']}
+            for c in Category
+        ],
+        'price': {
+            'min': _decimal(row['min_price']),
+            'max': _decimal(row['max_price']),
+            'buckets': [
+                {'min': _decimal(low), 'max': _decimal(high), 'count': row[f'price_{i}']}
+                for i, (low, high) in enumerate(buckets)
+            ],
+        },
+    }
+
+
+def _decimal(value):
+    # Same string form as the API's price fields
+    return None if value is None else f'{Decimal(value):.2f}'
@@ -0,0 +1,285 @@
+"""
+Streaming catalog importer.
+
+Reads JSON (a Django fixture or a plain array of objects), NDJSON or CSV, all
+optionally gzipped, one record at a time. The rows are written in batched
+`bulk_create` calls that upsert on the unique `title`. Memory use depends on
+the batch size, not the file size, so this also works on a full catalog dump
+(for example the output of `export_data games`) against a non-empty catalog.
+
+bulk_create skips model signals, so the per-user games_count is adjusted for
+each batch and the catalog version is bumped once at the end.
+"""
+import csv
+import gzip
+import json
+import time
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from exam_project.accounts.counters import adjust_user_counter
+from exam_project.games.cache import bump_catalog_version
+from exam_project.games.models import Category, GameModel
+
+INITIAL_GAMES_FIXTURE = Path(__file__).resolve().parent / 'fixtures' / 'initial_games.json'
+
+BATCH_SIZE = 1000
+READ_SIZE = 64 * 1024
+UPSERT_FIELDS = ['category', 'price', 'updated_at']
+# Only overwritten on upsert when the input has the column
+OPTIONAL_FIELDS = ('summary', 'game_picture')
+
+CATEGORY_BY_LABEL = {label.lower(): name for name, label in Category.choices()}
+MIN_PRICE, MAX_PRICE = Decimal('10.00'), Decimal('999.99')
+TITLE_MAX_LENGTH = GameModel._meta.get_field('title').max_length
+
+UserModel = get_user_model()
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+# =====================================================
+# READERS
+# =====================================================
+def iter_json_array(stream, read_size=READ_SIZE):
+    """Yield the items of a top-level JSON array without loading the whole document."""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = '', 0, False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = stream.read(read_size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    skip(' \t\r\n\ufeff')
+    if buffer[pos:pos + 1] != '[':
+        raise ImportFormatError("Expected a JSON array of records.")
+    pos += 1
+
+    while True:
+        skip(' \t\r\n,')
+        if pos >= len(buffer):
+            raise ImportFormatError("Unexpected end of JSON input.")
+        if buffer[pos] == ']':
+            return
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                break
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ImportFormatError(f"Invalid JSON: {e}") from e
+                fill()
+        pos = end
+        yield item
+
+
+def iter_ndjson(stream):
+    for number, line in enumerate(stream, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ImportFormatError(f"Invalid JSON on line {number}: {e}") from e
+
+
+READERS = {
+    'json': iter_json_array,
+    'ndjson': iter_ndjson,
+    'csv': csv.DictReader,
+}
+
+
+def detect_format(path):
+    suffixes = [s.lower() for s in Path(path).suffixes if s.lower() != '.gz']
+    suffix = suffixes[-1].lstrip('.') if suffixes else ''
+    if suffix == 'jsonl':
+        return 'ndjson'
+    if suffix not in READERS:
+        raise ImportFormatError(f"Cannot tell the format of {path}; pass it explicitly.")
+    return suffix
+
+
+def open_source(path):
+    if str(path).endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def read_records(stream, file_format):
+    return READERS[file_format](stream)
+
+
+# =====================================================
+# NORMALIZATION
+# =====================================================
+def normalize_record(record):
+    """Game field values for one input record, or raise ValueError with the reason."""
+    if 'fields' in record:  # Django fixture entry
+        if record.get('model', 'games.gamemodel').lower() != 'games.gamemodel':
+            raise ValueError(f"unsupported model {record.get('model')}")
+        record = record['fields']
+
+    title = (record.get('title') or '').strip()
+    if not title or len(title) > TITLE_MAX_LENGTH:
+        raise ValueError(f"invalid title {title!r}")
+
+    category = (record.get('category') or '').strip()
+    category = category.upper() if category.upper() in Category.__members__ else CATEGORY_BY_LABEL.get(category.lower())
+    if not category:
+        raise ValueError(f"invalid category {record.get('category')!r}")
+
+    try:
+        price = Decimal(str(record.get('price'))).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"invalid price {record.get('price')!r}")
+    if not MIN_PRICE <= price <= MAX_PRICE:
+        raise ValueError(f"price {price} out of range")
+
+    user_id = next((record[k] for k in ('user_id', 'user', 'seller_id') if record.get(k) not in (None, '')), None)
+    row = {
+        'title': title,
+        'category': category,
+        'price': price,
+        'user_id': int(user_id) if user_id is not None else None,
+    }
+    if 'summary' in record:
+        row['summary'] = record['summary'] or None
+    if 'game_picture' in record:
+        row['game_picture'] = record['game_picture'] or GameModel._meta.get_field('game_picture').default
+    return row
+
+
+# =====================================================
+# WRITER
+# =====================================================
+class ImportStats:
+    def __init__(self):
+        self.read = self.created = self.updated = self.unchanged = self.skipped = 0
+        self.errors = []
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            'read': self.read,
+            'created': self.created,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'skipped': self.skipped,
+            'seconds': round(self.elapsed, 3),
+            'rows_per_sec': round(self.rate, 1),
+        }
+
+
+def _write_batch(batch, update, stats):
+    """Upsert one batch of normalized rows (keyed by title) in a single transaction."""
+    existing = set(GameModel.objects.filter(title__in=batch).values_list('title', flat=True))
+    rows = list(batch.values()) if update else [row for title, row in batch.items() if title not in existing]
+    if not rows:
+        stats.unchanged += len(batch)
+        return
+
+    # Sellers from another database (e.g. an export) may not exist here
+    user_ids = {row['user_id'] for row in rows if row['user_id'] is not None}
+    if user_ids:
+        known = set(UserModel.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+        for row in rows:
+            if row['user_id'] not in known:
+                row['user_id'] = None
+
+    now = timezone.now()
+    games = [GameModel(**row, updated_at=now) for row in rows]
+    with transaction.atomic():
+        if update:
+            # One upsert per set of input columns, so a missing column keeps its stored value
+            by_fields = {}
+            for game, row in zip(games, rows):
+                by_fields.setdefault(tuple(f for f in OPTIONAL_FIELDS if f in row), []).append(game)
+            for optional, group in by_fields.items():
+                GameModel.objects.bulk_create(
+                    group, update_conflicts=True, unique_fields=['title'], update_fields=UPSERT_FIELDS + list(optional),
+                )
+        else:
+            GameModel.objects.bulk_create(games, ignore_conflicts=True)
+
+        # Only inserted rows are new games for their seller; upserts keep the owner
+        owners = {}
+        for game in games:
+            if game.title not in existing and game.user_id is not None:
+                owners[game.user_id] = owners.get(game.user_id, 0) + 1
+        adjust_user_counter('games_count', owners)
+
+    created = sum(1 for title in batch if title not in existing)
+    stats.created += created
+    if update:
+        stats.updated += len(batch) - created
+    else:
+        stats.unchanged += len(batch) - created
+
+
+def import_games(records, batch_size=BATCH_SIZE, update=True, progress=None):
+    """
+    Import an iterable of raw records. With update=False, titles that already
+    exist are left untouched. `progress(stats)` is called after every batch.
+    """
+    stats = ImportStats()
+    batch = {}
+    for record in records:
+        stats.read += 1
+        try:
+            row = normalize_record(record)
+        except (ValueError, TypeError, AttributeError) as e:
+            stats.skipped += 1
+            if len(stats.errors) < 20:
+                stats.errors.append(f"record {stats.read}: {e}")
+            continue
+
+        # A later duplicate title wins, like it would in sequential saves
+        batch.pop(row['title'], None)
+        batch[row['title']] = row
+        if len(batch) >= batch_size:
+            _write_batch(batch, update, stats)
+            batch = {}
+            if progress:
+                progress(stats)
+
+    if batch:
+        _write_batch(batch, update, stats)
+        if progress:
+            progress(stats)
+
+    if stats.created or stats.updated:
+        bump_catalog_version()
+        transaction.on_commit(bump_catalog_version)
+    return stats
+
+
+def import_file(path, file_format=None, **kwargs):
+    file_format = file_format or detect_format(path)
+    with open_source(path) as stream:
+        return import_games(read_records(stream, file_format), **kwargs)
@@ -0,0 +1,304 @@
+"""
+Synthetic catalog data for load testing (see the `generate_load_data` command).
+
+Everything is drawn from one seeded `random.Random`, so the same seed and
+sizes always produce the same users, games, purchases and comments. The
+row ids depend on the database sequences. The distributions are skewed the way
+a real marketplace is:
+
+* sellers: a small share of users sell, and how many games each one lists is
+  Zipf-distributed, so a few sellers own most of the catalog;
+* categories follow a fixed, uneven mix;
+* popularity: purchases pick games from a Zipf distribution over a shuffled
+  ranking, and how many games each buyer owns is exponentially distributed;
+* comments are left on a random subset of purchases, so they pile up on the
+  same popular games.
+
+Rows are written with COPY FROM STDIN on PostgreSQL and with batched
+executemany INSERTs elsewhere. They bypass model signals, so counters and
+the catalog version are fixed up at the end.
+"""
+import io
+import json
+import math
+import random
+import string
+from array import array
+from bisect import bisect_left
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from exam_project.accounts.counters import reconcile_user_counters
+from exam_project.accounts.user_cache import invalidate_users
+from exam_project.common.models import BoughtGame, GameComment
+from exam_project.games.cache import bump_catalog_version
+from exam_project.games.models import GameModel
+
+UserModel = get_user_model()
+
+LOAD_DOMAIN = 'loadgen.invalid'
+PASSWORD = 'LoadTest123!'
+
+CATEGORY_MIX = {
+    'ACTION': 28,
+    'ADVENTURE': 20,
+    'STRATEGY': 15,
+    'PUZZLE': 12,
+    'SPORTS': 11,
+    'BOARD': 8,
+    'OTHER': 6,
+}
+SELLER_SHARE = 0.1
+HISTORY_DAYS = 730
+
+WORDS = (
+    'Dark Lost Iron Neon Last Wild Star Red Deep Dead Void Mega Hyper Pixel Royal Shadow '
+    'Storm Frost Solar Lunar Rogue Cyber Crystal Ember Quest Legend Tales Forge Realm Saga '
+    'Hunt Arena Drift Empire Tower Dungeon Galaxy Kingdom Racer Tactics Odyssey Siege Rush'
+).split()
+FIRST_NAMES = 'Alex Maria Ivan Elena Peter Anna George Sofia Nikolay Daria Martin Vera'.split()
+LAST_NAMES = 'Petrov Ivanova Smith Garcia Novak Dimitrova Kovacs Rossi Berg Silva'.split()
+
+
+class ZipfSampler:
+    """Draws indexes 0..n-1 with P(rank k) ~ 1 / (k + 1) ** s over a seeded random ranking."""
+
+    def __init__(self, n, s, rng):
+        self.rng = rng
+        self.cumulative = list(accumulate(1 / (k + 1) ** s for k in range(n)))
+        self.ranking = list(range(n))
+        rng.shuffle(self.ranking)
+
+    def __call__(self):
+        k = bisect_left(self.cumulative, self.rng.random() * self.cumulative[-1])
+        return self.ranking[min(k, len(self.ranking) - 1)]
+
+
+def base36(n):
+    digits = string.digits + string.ascii_lowercase
+    out = ''
+    while True:
+        n, r = divmod(n, 36)
+        out = digits[r] + out
+        if not n:
+            return out
+
+
+def random_moment(rng, now, days=HISTORY_DAYS):
+    return now - timedelta(seconds=rng.randrange(days * 86400))
+
+
+PRICE_ENDINGS = (Decimal('0.99'), Decimal('0.99'), Decimal('0.49'), Decimal('0.00'))
+
+
+def random_price(rng):
+    # Log-normal around ~33 with a long tail, mostly ending in .99
+    whole = int(min(max(math.exp(rng.gauss(3.5, 0.8)), 10), 999))
+    return Decimal(whole) + rng.choice(PRICE_ENDINGS)
+
+
+# =====================================================
+# WRITERS
+# =====================================================
+def _copy_text(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, dict):
+        value = json.dumps(value)
+    elif hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def insert_rows(model, columns, rows):
+    """Insert one batch of tuples into `model`'s table without going through the ORM."""
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    column_sql = ', '.join(quote(model._meta.get_field(c).column) for c in columns)
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO(''.join('\t'.join(_copy_text(v) for v in row) + '\n' for row in rows))
+            cursor.cursor.copy_expert(f'COPY {table} ({column_sql}) FROM STDIN', buffer)
+        else:
+            fields = [model._meta.get_field(c) for c in columns]
+            params = [
+                [field.get_db_prep_value(value, connection) for field, value in zip(fields, row)]
+                for row in rows
+            ]
+            placeholders = ', '.join(['%s'] * len(columns))
+            cursor.executemany(f'INSERT INTO {table} ({column_sql}) VALUES ({placeholders})', params)
+
+
+class BatchWriter:
+    def __init__(self, model, columns, batch_size):
+        self.model, self.columns, self.batch_size = model, columns, batch_size
+        self.rows = []
+        self.written = 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        insert_rows(self.model, self.columns, self.rows)
+        self.written += len(self.rows)
+        self.rows = []
+
+
+# =====================================================
+# GENERATOR
+# =====================================================
+def generated_users():
+    return UserModel.objects.filter(email__endswith=f'@{LOAD_DOMAIN}')
+
+
+def recount_game_comments(games):
+    """Rebuild GameModel.comments_count and comments_updated_at of the `games` queryset in one UPDATE."""
+    comments = GameComment.objects.filter(game=OuterRef('pk')).order_by().values('game')
+    return games.update(
+        comments_count=Coalesce(
+            Subquery(comments.annotate(total=Count('pk')).values('total'), output_field=IntegerField()),
+            0,
+        ),
+        # Also moves when comments went away, so cached feeds revalidate
+        comments_updated_at=timezone.now(),
+    )
+
+
+def _ids(queryset, field):
+    return set(queryset.order_by().values_list(field, flat=True).distinct())
+
+
+def clear_load_data():
+    """Delete everything a previous run generated, without loading it into memory."""
+    users = generated_users()
+    games = GameModel.objects.filter(user__in=users)
+    # Rows of other users and games that the deletes take with them: no signals
+    # run, so their counters are recounted afterwards
+    touched_users = (
+        _ids(BoughtGame.objects.filter(game__in=games).exclude(user__in=users), 'user')
+        | _ids(GameComment.objects.filter(game__in=games).exclude(user__in=users), 'user')
+    )
+    touched_games = _ids(GameComment.objects.filter(user__in=users).exclude(game__in=games), 'game')
+    # _raw_delete: a single DELETE each; Collector would fetch millions of rows for signals
+    for model in (BoughtGame, GameComment):
+        model.objects.filter(game__in=games)._raw_delete(connection.alias)
+    for rel in UserModel._meta.related_objects:
+        if rel.one_to_many:
+            rel.related_model._base_manager.filter(**{f'{rel.field.name}__in': users})._raw_delete(connection.alias)
+    user_ids = list(users.values_list('pk', flat=True))
+    deleted = users._raw_delete(connection.alias)
+    # No post_delete signals either: drop the deleted users from the auth cache
+    invalidate_users(user_ids)
+    if touched_users:
+        reconcile_user_counters(UserModel.objects.filter(pk__in=touched_users))
+    if touched_games:
+        recount_game_comments(GameModel.objects.filter(pk__in=touched_games))
+    bump_catalog_version()
+    return deleted
+
+
+def generate(users=10_000, games=100_000, purchases=500_000, comments=100_000,
+             seed=42, zipf=1.1, batch_size=10_000, log=None):
+    """Generate the data set; returns a dict of row counts per table."""
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    now = timezone.now()
+
+    # Users: one shared password hash, hashing per row would dominate the run
+    log(f"users: {users}")
+    password = make_password(PASSWORD, salt='loadgen')
+    writer = BatchWriter(UserModel, [
+        'password', 'is_superuser', 'email', 'first_name', 'last_name', 'money', 'profile_picture_variants',
+        'is_staff', 'is_active', 'date_joined', 'updated_at', 'games_count', 'bought_count', 'comments_count',
+    ], batch_size)
+    for i in range(users):
+        joined = random_moment(rng, now)
+        money = int(min(math.exp(rng.gauss(6, 1.2)), 1_000_000))
+        writer.add((
+            password, False, f'user{i}@{LOAD_DOMAIN}', rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+            money, {}, False, True, joined, joined, 0, 0, 0,
+        ))
+    writer.flush()
+    user_ids = array('q', generated_users().order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size))
+
+    # Games: Zipf over a small pool of sellers
+    log(f"games: {games}")
+    sellers = [user_ids[i] for i in sorted(rng.sample(range(len(user_ids)), max(1, int(len(user_ids) * SELLER_SHARE))))]
+    pick_seller = ZipfSampler(len(sellers), 1.2, rng)
+    categories, weights = zip(*CATEGORY_MIX.items())
+    category_cum = list(accumulate(weights))
+    default_picture = GameModel._meta.get_field('game_picture').default
+    writer = BatchWriter(GameModel, [
+        'title', 'category', 'price', 'game_picture', 'game_picture_variants', 'summary', 'user',
+        'created_at', 'updated_at', 'comments_count',
+    ], batch_size)
+    for i in range(games):
+        # "<Word> <Word> <base36 index>" stays unique and within the 24 character limit
+        title = f'{rng.choice(WORDS)} {rng.choice(WORDS)} {base36(i)}'
+        category = rng.choices(categories, cum_weights=category_cum)[0]
+        created = random_moment(rng, now)
+        summary = ' '.join(rng.choices(WORDS, k=rng.randrange(8, 40))).capitalize() + '.'
+        writer.add((
+            title, category, random_price(rng), default_picture, {}, summary, sellers[pick_seller()],
+            created, created, 0,
+        ))
+    writer.flush()
+    game_rows = GameModel.objects.filter(user__email__endswith=f'@{LOAD_DOMAIN}').order_by('pk').values_list('pk', 'user_id')
+    game_ids, game_sellers = array('q'), array('q')
+    for pk, seller_id in game_rows.iterator(chunk_size=batch_size):
+        game_ids.append(pk)
+        game_sellers.append(seller_id)
+
+    # Purchases and comments: per buyer, distinct games drawn by popularity
+    log(f"purchases: ~{purchases}, comments: ~{comments}")
+    pick_game = ZipfSampler(len(game_ids), zipf, rng) if game_ids else None
+    mean_owned = purchases / max(len(user_ids), 1)
+    comment_ratio = min(comments / purchases, 1.0) if purchases else 0
+    purchase_writer = BatchWriter(BoughtGame, ['game', 'user'], batch_size)
+    comment_writer = BatchWriter(GameComment, [
+        'game', 'user', 'text', 'profile_picture_variants', 'created_at', 'updated_at',
+    ], batch_size)
+    for buyer_id in user_ids if pick_game else ():
+        wanted = min(int(rng.expovariate(1 / mean_owned)) if mean_owned else 0, len(game_ids) - 1)
+        owned = set()
+        for _ in range(wanted * 4):
+            if len(owned) >= wanted:
+                break
+            index = pick_game()
+            if game_sellers[index] != buyer_id:
+                owned.add(index)
+        for index in sorted(owned):
+            purchase_writer.add((game_ids[index], buyer_id))
+            if rng.random() < comment_ratio:
+                created = random_moment(rng, now)
+                text = ' '.join(rng.choices(WORDS, k=rng.randrange(3, 25))).capitalize() + '!'
+                comment_writer.add((game_ids[index], buyer_id, text, {}, created, created))
+    purchase_writer.flush()
+    comment_writer.flush()
+
+    log("recounting denormalized counters")
+    reconcile_user_counters(generated_users())
+    recount_game_comments(GameModel.objects.filter(user__email__endswith=f'@{LOAD_DOMAIN}'))
+    bump_catalog_version()
+
+    return {
+        'users': len(user_ids),
+        'games': len(game_ids),
+        'purchases': purchase_writer.written,
+        'comments': comment_writer.written,
+    }
@@ -0,0 +1,124 @@
+import random
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connection
+from django.db.models import Sum
+
+from exam_project.games.models import GameModel
+from exam_project.games.purchases import PurchaseError, charge_amount, purchase_game
+
+UserModel = get_user_model()
+
+BENCH_DOMAIN = "purchase-bench.invalid"
+
+
+class Command(BaseCommand):
+    help = (
+        "Multi-threaded purchase stress test: hammers purchase_game with shared buyers "
+        "and sellers, reports purchases/sec and checks that total money is conserved"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--buyers", type=int, default=20)
+        parser.add_argument("--sellers", type=int, default=5)
+        parser.add_argument("--games-per-seller", type=int, default=20)
+        parser.add_argument("--attempts", type=int, default=2000, help="Total purchase attempts")
+        parser.add_argument("--money", type=int, default=2000, help="Starting balance per buyer")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--keep", action="store_true", help="Keep the benchmark users and games")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        self.cleanup()
+        buyers, games = self.setup_data(rng, options)
+        users = UserModel.objects.filter(email__endswith=f"@{BENCH_DOMAIN}")
+        money_before = users.aggregate(total=Sum("money"))["total"]
+
+        plan = [(rng.choice(buyers), rng.choice(games)) for _ in range(options["attempts"])]
+        chunks = [plan[i::options["threads"]] for i in range(options["threads"])]
+        outcomes = Counter()
+        lock = threading.Lock()
+
+        def worker(chunk):
+            local = Counter()
+            try:
+                for buyer, game_id in chunk:
+                    try:
+                        purchase_game(buyer, game_id)
+                        local["ok"] += 1
+                    except PurchaseError as e:
+                        local[type(e).__name__] += 1
+                    except DatabaseError as e:
+                        local[f"db error: {e.__class__.__name__}"] += 1
+            finally:
+                connection.close()
+                with lock:
+                    outcomes.update(local)
+
+        threads = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        close_old_connections()
+
+        money_after = users.aggregate(total=Sum("money"))["total"]
+        spent = sum(
+            charge_amount(price)
+            for price in GameModel.objects.filter(boughtgame__user__in=users).values_list("price", flat=True)
+        )
+        buyers_after = UserModel.objects.filter(pk__in=[b.pk for b in buyers]).aggregate(total=Sum("money"))["total"]
+
+        self.stdout.write(f"threads={options['threads']} attempts={options['attempts']} elapsed={elapsed:.2f}s")
+        for outcome, count in sorted(outcomes.items()):
+            self.stdout.write(f"  {outcome:<24} {count}")
+        self.stdout.write(f"purchases/sec: {outcomes['ok'] / elapsed:.1f}")
+        self.stdout.write(f"attempts/sec:  {sum(outcomes.values()) / elapsed:.1f}")
+
+        conserved = money_before == money_after
+        balanced = buyers_after == len(buyers) * options["money"] - spent
+        if conserved and balanced:
+            self.stdout.write(self.style.SUCCESS(f"Money conserved: {money_before} before, {money_after} after."))
+        else:
+            self.stdout.write(self.style.ERROR(
+                f"Money NOT conserved: {money_before} before, {money_after} after, "
+                f"buyers hold {buyers_after} but should hold {len(buyers) * options['money'] - spent}."
+            ))
+
+        if not options["keep"]:
+            self.cleanup()
+        if not (conserved and balanced):
+            raise SystemExit(1)
+
+    def setup_data(self, rng, options):
+        categories = [c[0] for c in GameModel._meta.get_field("category").choices]
+        buyers = [
+            UserModel.objects.create_user(email=f"buyer{i}@{BENCH_DOMAIN}", money=options["money"])
+            for i in range(options["buyers"])
+        ]
+        sellers = [
+            UserModel.objects.create_user(email=f"seller{i}@{BENCH_DOMAIN}", money=0)
+            for i in range(options["sellers"])
+        ]
+        games = GameModel.objects.bulk_create([
+            GameModel(
+                title=f"bench {s}-{g}",
+                category=rng.choice(categories),
+                price=rng.randrange(10, 120),
+                summary="Purchase benchmark",
+                user=seller,
+            )
+            for s, seller in enumerate(sellers)
+            for g in range(options["games_per_seller"])
+        ])
+        return buyers, [game.pk for game in games]
+
+    def cleanup(self):
+        UserModel.objects.filter(email__endswith=f"@{BENCH_DOMAIN}").delete()
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from exam_project.games.models import GameModel
+from exam_project.games.serializers import FastGameSerializer, GameSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares GameSerializer(many=True) with FastGameSerializer on list pages of existing games "
+        "(fetch + serialize + render) and checks that both produce identical JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", default="12,50,100", help="Comma-separated page sizes")
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["rows"].split(",")]
+        if GameModel.objects.count() < max(sizes):
+            raise CommandError(f"Needs at least {max(sizes)} games; run generate_load_data first.")
+
+        request = RequestFactory().get("/api/games/")
+        context = {"request": request}
+        renderer = JSONRenderer()
+        queryset = GameModel.objects.select_related("user").order_by("-id")
+
+        def full(size):
+            return renderer.render(GameSerializer(queryset[:size], many=True, context=context).data)
+
+        def fast(size):
+            return renderer.render(FastGameSerializer(FastGameSerializer.values(queryset)[:size], context).data)
+
+        self.stdout.write(f"{'rows':>5} {'GameSerializer':>15} {'fast path':>10} {'speedup':>8}")
+        for size in sizes:
+            if full(size) != fast(size):
+                raise CommandError(f"Outputs differ for a page of {size} rows.")
+            timings = {}
+            for name, func in (("full", full), ("fast", fast)):
+                started = time.perf_counter()
+                for _ in range(options["repeat"]):
+                    func(size)
+                timings[name] = (time.perf_counter() - started) / options["repeat"] * 1000
+            self.stdout.write(
+                f"{size:>5} {timings['full']:>12.2f} ms {timings['fast']:>7.2f} ms "
+                f"{timings['full'] / timings['fast']:>7.1f}x"
+            )
+        self.stdout.write(self.style.SUCCESS("Identical JSON for every page size."))
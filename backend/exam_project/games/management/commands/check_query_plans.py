@@ -0,0 +1,38 @@
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+
+from exam_project.games.query_plans import check_query_plans, plan_cases
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAINs the games list query for the filter/ordering combinations the indexes serve and fails "
+        "when one of them scans, filters or sorts the games table instead (see games.query_plans)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--plans", action="store_true", help="Print every plan, not only failing ones")
+        parser.add_argument(
+            "--every", action="store_true",
+            help="Check every combination, including range filters that need a sort",
+        )
+
+    def handle(self, *args, **options):
+        results = check_query_plans(list(plan_cases(every=options["every"])))
+        failures = 0
+        for params, plan, problems in results:
+            label = "?" + urlencode(params) if params else "(no filters)"
+            if problems:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f"FAIL {label}"))
+                for problem in problems:
+                    self.stdout.write(f"  {problem}")
+            elif options["plans"]:
+                self.stdout.write(f"ok   {label}")
+            if problems or options["plans"]:
+                self.stdout.write("  " + plan.replace("\n", "\n  ") + "\n")
+
+        if failures:
+            raise CommandError(f"{failures} of {len(results)} query plans are not served by an index range or index order.")
+        self.stdout.write(self.style.SUCCESS(f"All {len(results)} query plans are index-backed."))
@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from exam_project.games.loadgen import LOAD_DOMAIN, PASSWORD, clear_load_data, generate, generated_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a reproducible, production-sized data set (users, games, purchases, comments) "
+        "with skewed distributions for load testing; uses COPY on PostgreSQL"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--games", type=int, default=100_000)
+        parser.add_argument("--purchases", type=int, default=500_000, help="Approximate total")
+        parser.add_argument("--comments", type=int, default=100_000, help="Approximate total")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--zipf", type=float, default=1.1, help="Skew of game popularity")
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--clear", action="store_true", help="Delete data from a previous run first")
+        parser.add_argument("--clear-only", action="store_true", help="Delete generated data and stop")
+
+    def handle(self, *args, **options):
+        if options["clear"] or options["clear_only"]:
+            deleted = clear_load_data()
+            self.stdout.write(f"Deleted {deleted} generated user(s) and everything they owned.")
+            if options["clear_only"]:
+                return
+        elif generated_users().exists():
+            raise CommandError(f"Generated data (@{LOAD_DOMAIN}) already exists; rerun with --clear.")
+
+        started = time.perf_counter()
+        counts = generate(
+            users=options["users"],
+            games=options["games"],
+            purchases=options["purchases"],
+            comments=options["comments"],
+            seed=options["seed"],
+            zipf=options["zipf"],
+            batch_size=options["batch_size"],
+            log=lambda message: self.stderr.write(f"[{time.perf_counter() - started:7.1f}s] {message}"),
+        )
+        elapsed = time.perf_counter() - started
+
+        rows = sum(counts.values())
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {summary} in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/sec). "
+            f"Users log in as user<N>@{LOAD_DOMAIN} / {PASSWORD}."
+        ))
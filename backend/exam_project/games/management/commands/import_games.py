@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from exam_project.games.importer import BATCH_SIZE, READERS, ImportFormatError, import_file
+
+
+class Command(BaseCommand):
+    help = "Streams a JSON/NDJSON/CSV (optionally .gz) catalog file into the games table, upserting on title"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", dest="file_format", choices=sorted(READERS),
+                            help="Defaults to the file extension")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--skip-existing", action="store_true",
+                            help="Only insert new titles; leave existing games untouched")
+
+    def handle(self, *args, **options):
+        def progress(stats):
+            self.stderr.write(
+                f"{stats.read} read, {stats.created} created, {stats.updated} updated, "
+                f"{stats.skipped} skipped ({stats.rate:,.0f} rows/sec)"
+            )
+
+        try:
+            stats = import_file(
+                options["path"],
+                file_format=options["file_format"],
+                batch_size=options["batch_size"],
+                update=not options["skip_existing"],
+                progress=progress if options["verbosity"] >= 1 else None,
+            )
+        except (OSError, ImportFormatError) as e:
+            raise CommandError(str(e))
+
+        for error in stats.errors:
+            self.stderr.write(self.style.WARNING(f"Skipped {error}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats.read} record(s) in {stats.elapsed:.1f}s ({stats.rate:,.0f} rows/sec): "
+            f"{stats.created} created, {stats.updated} updated, {stats.unchanged} unchanged, {stats.skipped} skipped."
+        ))
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
-from django.core.management import call_command
-from games.models import GameModel
+
+from exam_project.games.importer import INITIAL_GAMES_FIXTURE, import_file
+from exam_project.games.models import GameModel
 
 
 class Command(BaseCommand):
@@ -10,5 +11,5 @@ class Command(BaseCommand):
         if GameModel.objects.exists():
             self.stdout.write(self.style.WARNING("Games already exist. Skipping fixture load."))
         else:
-            call_command("loaddata", "initial_games.json")
-            self.stdout.write(self.style.SUCCESS("Initial games loaded successfully."))
+            stats = import_file(INITIAL_GAMES_FIXTURE, update=False)
+            self.stdout.write(self.style.SUCCESS(f"Initial games loaded successfully ({stats.created} games)."))
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0005_alter_gamemodel_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gamemodel',
+            index=models.Index(fields=['price', 'id'], name='game_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamemodel',
+            index=models.Index(fields=['title', 'id'], name='game_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamemodel',
+            index=models.Index(fields=['user', 'id'], name='game_user_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamemodel',
+            index=models.Index(fields=['user', 'price', 'id'], name='game_user_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamemodel',
+            index=models.Index(fields=['user', 'title', 'id'], name='game_user_title_id_idx'),
+        ),
+    ]
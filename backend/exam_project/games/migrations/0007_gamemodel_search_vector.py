@@ -0,0 +1,76 @@
+# Generated by Django 4.2 on 2026-10-18 16:11
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+CATEGORY_LABELS = {
+    'ACTION': 'Action',
+    'ADVENTURE': 'Adventure',
+    'PUZZLE': 'Puzzle',
+    'STRATEGY': 'Strategy',
+    'SPORTS': 'Sports',
+    'BOARD': 'Board/Card Game',
+    'OTHER': 'Other',
+}
+
+CATEGORY_LABEL_SQL = "CASE NEW.category {} ELSE '' END".format(
+    ' '.join(f"WHEN '{name}' THEN '{label}'" for name, label in CATEGORY_LABELS.items())
+)
+
+FORWARD_SQL = [
+    f"""
+    CREATE OR REPLACE FUNCTION games_gamemodel_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', {CATEGORY_LABEL_SQL}), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.summary, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE TRIGGER games_gamemodel_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, category, summary ON games_gamemodel
+    FOR EACH ROW EXECUTE FUNCTION games_gamemodel_search_vector_update();
+    """,
+    # Fire the trigger once for existing rows
+    "UPDATE games_gamemodel SET title = title;",
+    "CREATE INDEX game_search_vector_gin ON games_gamemodel USING gin (search_vector);",
+    # Matches the UPPER(title::text) LIKE UPPER(...) Django emits for title__icontains
+    "CREATE INDEX game_title_trgm_gin ON games_gamemodel USING gin (UPPER(title::text) gin_trgm_ops);",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS game_title_trgm_gin;",
+    "DROP INDEX IF EXISTS game_search_vector_gin;",
+    "DROP TRIGGER IF EXISTS games_gamemodel_search_vector_trigger ON games_gamemodel;",
+    "DROP FUNCTION IF EXISTS games_gamemodel_search_vector_update();",
+]
+
+
+def run_on_postgres(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0006_gamemodel_keyset_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='gamemodel',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(run_on_postgres(FORWARD_SQL), run_on_postgres(REVERSE_SQL)),
+    ]
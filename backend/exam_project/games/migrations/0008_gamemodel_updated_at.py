@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0007_gamemodel_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamemodel',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2 on 2026-10-18 16:24
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_comments_count(apps, schema_editor):
+    GameModel = apps.get_model('games', 'GameModel')
+    GameComment = apps.get_model('common', 'GameComment')
+    GameModel.objects.update(comments_count=Coalesce(
+        Subquery(
+            GameComment.objects.filter(game=OuterRef('pk')).order_by().values('game')
+            .annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0009_picture_variants'),
+        ('common', '0006_picture_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamemodel',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_comments_count, migrations.RunPython.noop),
+    ]
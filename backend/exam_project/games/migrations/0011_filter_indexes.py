@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-18 16:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0010_gamemodel_comments_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gamemodel',
+            index=models.Index(fields=['category', 'id'], name='game_category_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamemodel',
+            index=models.Index(fields=['category', 'price', 'id'], name='game_category_price_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamemodel',
+            index=models.Index(fields=['category', 'title', 'id'], name='game_category_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamemodel',
+            index=models.Index(fields=['created_at', 'id'], name='game_created_id_idx'),
+        ),
+    ]
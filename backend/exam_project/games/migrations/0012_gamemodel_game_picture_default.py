@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-18 18:05
+
+from django.db import migrations, models
+
+OLD_DEFAULT = 'profile_pics/no-image.jpg'
+NEW_DEFAULT = 'game_pics/no-image.jpg'
+
+
+def move_default(old, new):
+    def run(apps, schema_editor):
+        GameModel = apps.get_model('games', 'GameModel')
+        GameModel.objects.filter(game_picture=old).update(game_picture=new)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0011_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='gamemodel',
+            name='game_picture',
+            field=models.ImageField(blank=True, default=NEW_DEFAULT, null=True, upload_to='game_pics/'),
+        ),
+        migrations.RunPython(move_default(OLD_DEFAULT, NEW_DEFAULT), move_default(NEW_DEFAULT, OLD_DEFAULT)),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-18 18:40
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+
+def backfill_comments_updated_at(apps, schema_editor):
+    GameModel = apps.get_model('games', 'GameModel')
+    GameComment = apps.get_model('common', 'GameComment')
+    GameModel.objects.update(comments_updated_at=Subquery(
+        GameComment.objects.filter(game=OuterRef('pk')).order_by().values('game')
+        .annotate(latest=Max('updated_at')).values('latest'),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0012_gamemodel_game_picture_default'),
+        ('common', '0006_picture_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamemodel',
+            name='comments_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_comments_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-18 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0013_gamemodel_comments_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gamemodel',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='game_user_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gamemodel',
+            index=models.Index(fields=['category', 'created_at', 'id'], name='game_category_created_id_idx'),
+        ),
+    ]
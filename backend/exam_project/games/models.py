@@ -2,6 +2,7 @@ from decimal import Decimal
 from enum import Enum
 
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core import validators
 from django.db import models
 
@@ -39,10 +40,36 @@ class GameModel(models.Model):
             validators.MaxValueValidator(Decimal('999.99')),  # maximum price
         ],
         null=False, blank=False,)
-    game_picture = models.ImageField(upload_to="game_pics/", blank=True, null=True, default="profile_pics/no-image.jpg")
+    game_picture = models.ImageField(upload_to="game_pics/", blank=True, null=True, default="game_pics/no-image.jpg")
+    # Resized derivatives of game_picture (see common.images)
+    game_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     summary = models.TextField(null=True, blank=True, )
     user = models.ForeignKey(UserModel, on_delete=models.CASCADE, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Kept in sync by games.signals; read by the comment feed instead of COUNT(*)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    # Last time a comment was added, changed or removed; with comments_count it is the feed's ETag
+    comments_updated_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Maintained by a database trigger on PostgreSQL (see games.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        # Composite indexes backing the keyset pagination orderings (see KeysetPagination)
+        indexes = [
+            models.Index(fields=['price', 'id'], name='game_price_id_idx'),
+            models.Index(fields=['title', 'id'], name='game_title_id_idx'),
+            models.Index(fields=['user', 'id'], name='game_user_id_idx'),
+            models.Index(fields=['user', 'price', 'id'], name='game_user_price_id_idx'),
+            models.Index(fields=['user', 'title', 'id'], name='game_user_title_id_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='game_user_created_id_idx'),
+            # Category / created_at filters of the games API (see games.filtering)
+            models.Index(fields=['category', 'id'], name='game_category_id_idx'),
+            models.Index(fields=['category', 'price', 'id'], name='game_category_price_id_idx'),
+            models.Index(fields=['category', 'title', 'id'], name='game_category_title_id_idx'),
+            models.Index(fields=['category', 'created_at', 'id'], name='game_category_created_id_idx'),
+            models.Index(fields=['created_at', 'id'], name='game_created_id_idx'),
+        ]
 
     def __str__(self):
         return f'{self.title}  --  {self.category}'
@@ -1,3 +1,19 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
 class Pagination:
     PER_PAGE_OPTIONS = [4, 6, 8, 12]
 
@@ -22,3 +38,258 @@ class SortingMixin:
 
         # default: newest
         return queryset.order_by(f"-{prefix}created_at")
+
+
+# =====================================================
+# API PAGINATION
+# =====================================================
+class KeysetPagination(pagination.BasePagination):
+    """
+    Cursor pagination that seeks on the full ordering tuple instead of OFFSET.
+
+    The active ordering (usually set by OrderingFilter) always gets `id` appended
+    as a tie-breaker, so every page boundary is unique and each page is a single
+    index range scan over the matching composite index. When every field sorts
+    the same way the seek is one row-value comparison, `(price, id) > (%s, %s)`,
+    which the planner uses as the start of that range.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    ordering = ('-id',)
+    tie_breaker = 'id'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, cursor = self.seek_queryset(queryset, request)
+        return self.take_page(list(queryset), cursor)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset, cursor = self.seek_queryset(queryset, request)
+        return self.take_page([row async for row in queryset], cursor)
+
+    def seek_queryset(self, queryset, request):
+        """The (lazy) queryset for one page plus a row of lookahead, and the decoded cursor."""
+        self.request = request
+        self.ordering_fields = self.get_ordering(queryset)
+        cursor = self.decode_cursor(request)
+
+        self.reverse = bool(cursor and cursor['r'])
+        ordering = [self._invert(f) for f in self.ordering_fields] if self.reverse else self.ordering_fields
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            try:
+                queryset = queryset.filter(self._seek(queryset, ordering, cursor['v']))
+            except (ValidationError, TypeError, ValueError):
+                # Well-formed JSON whose values do not fit the columns
+                raise NotFound(self.invalid_cursor_message)
+        return queryset[:self.page_size + 1], cursor
+
+    def take_page(self, rows, cursor):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_ordering(self, queryset):
+        ordering = [f for f in queryset.query.order_by if isinstance(f, str)] or list(self.ordering)
+        if self.tie_breaker not in {f.lstrip('-') for f in ordering}:
+            direction = '-' if ordering[0].startswith('-') else ''
+            ordering.append(f'{direction}{self.tie_breaker}')
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, obj, reverse):
+        # Rows may be model instances or .values() dicts (see FastGameSerializer)
+        get = obj.get if isinstance(obj, dict) else lambda name: getattr(obj, name)
+        values = [self._dump(get(f.lstrip('-'))) for f in self.ordering_fields]
+        payload = json.dumps({'o': self.ordering_fields, 'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = urlsafe_b64encode(payload.encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode()))
+            valid = (
+                cursor['o'] == self.ordering_fields
+                and len(cursor['v']) == len(self.ordering_fields)
+                and cursor['r'] in (0, 1)
+            )
+        except (TypeError, ValueError, KeyError):
+            valid = False
+        if not valid:
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    @staticmethod
+    def _seek(queryset, ordering, values):
+        descending = {field.startswith('-') for field in ordering}
+        fields = [_concrete_field(queryset.model, field.lstrip('-')) for field in ordering]
+        if len(descending) == 1 and all(fields):
+            connection = connections[queryset.db]
+            quote = connection.ops.quote_name
+            table = quote(queryset.model._meta.db_table)
+            columns = ', '.join(f'{table}.{quote(field.column)}' for field in fields)
+            placeholders = ', '.join(['%s'] * len(fields))
+            operator = '<' if descending.pop() else '>'
+            params = [field.get_db_prep_value(value, connection) for field, value in zip(fields, values)]
+            return RawSQL(f'({columns}) {operator} ({placeholders})', params, output_field=BooleanField())
+
+        # Mixed ASC/DESC (or annotations): (a, b, c) > (x, y, z) expanded to
+        # a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _dump(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    @classmethod
+    def is_requested(cls, request):
+        return (
+            cls.cursor_query_param in request.query_params
+            or request.query_params.get('pagination') == 'cursor'
+        )
+
+
+def _concrete_field(model, name):
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    return field if field.concrete else None
+
+
+class AsyncPageNumberPagination(pagination.PageNumberPagination):
+    """PageNumberPagination that can also count and fetch the page through the async ORM."""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        self.page.object_list = [row async for row in self.page.object_list]
+        return list(self.page)
+
+
+class GamePagination(pagination.BasePagination):
+    """
+    Page-number pagination by default (?page=N), keyset pagination when the
+    client asks for it with ?pagination=cursor or follows a ?cursor= link.
+    """
+
+    def __init__(self):
+        self.page_number = AsyncPageNumberPagination()
+        self.keyset = KeysetPagination()
+        self.active = self.page_number
+
+    @property
+    def display_page_controls(self):
+        return self.active.display_page_controls
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.active = self.keyset if KeysetPagination.is_requested(request) else self.page_number
+        return self.active.paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.active = self.keyset if KeysetPagination.is_requested(request) else self.page_number
+        return await self.active.apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.active.to_html()
+
+
+class CommentPagination(KeysetPagination):
+    """
+    Oldest-first keyset pages over the (game, created_at, id) index. The total
+    comes from the view's `get_total_count()` (a denormalized counter), so no
+    page ever runs COUNT(*).
+    """
+    ordering = ('created_at', 'id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = view.get_total_count() if hasattr(view, 'get_total_count') else None
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.count = await view.aget_total_count() if hasattr(view, 'aget_total_count') else None
+        return await super().apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {'type': 'integer', 'nullable': True}
+        return response_schema
@@ -0,0 +1,188 @@
+"""
+Purchase service shared by the API (GameBuyApiView) and template (game_buy) views.
+
+Every purchase locks its rows in one global order — game rows first, then user
+rows, each by ascending primary key — so concurrent purchases touching the
+same buyer or seller queue up instead of deadlocking. Balances move through
+single UPDATE ... SET money = money +/- amount statements, never through a
+Python read-modify-write.
+
+Wallets hold whole units while prices have cents: the amount moved is the
+price rounded up, debited and credited identically so no money is created or
+destroyed.
+"""
+from decimal import ROUND_CEILING, Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from exam_project.accounts.counters import adjust_user_counter
+from exam_project.accounts.user_cache import invalidate_users
+from exam_project.games.cache import bump_catalog_version
+
+from exam_project.common.models import BoughtGame
+from exam_project.games.models import GameModel
+
+UserModel = get_user_model()
+
+
+class PurchaseError(Exception):
+    status_code = 400
+    code = "error"
+    detail = "Purchase failed."
+
+    def __init__(self, detail=None):
+        super().__init__(detail or self.detail)
+        self.detail = detail or self.detail
+
+
+class GameNotFound(PurchaseError):
+    status_code = 404
+    code = "not_found"
+    detail = "Game not found."
+
+
+class OwnGame(PurchaseError):
+    code = "own_game"
+    detail = "You cannot buy your own game."
+
+
+class AlreadyPurchased(PurchaseError):
+    code = "already_purchased"
+    detail = "Already purchased."
+
+
+class InsufficientFunds(PurchaseError):
+    code = "insufficient_funds"
+    detail = "Insufficient funds."
+
+
+def charge_amount(price):
+    return int(Decimal(price).to_integral_value(rounding=ROUND_CEILING))
+
+
+def lock_users(user_ids):
+    """Lock user rows in primary key order and return {pk: money}."""
+    return dict(
+        UserModel.objects
+        .select_for_update()
+        .filter(pk__in={pk for pk in user_ids if pk is not None})
+        .order_by('pk')
+        .values_list('pk', 'money')
+    )
+
+
+def transfer(buyer_id, seller_id, amount):
+    debited = (
+        UserModel.objects
+        .filter(pk=buyer_id, money__gte=amount)
+        .update(money=F('money') - amount, updated_at=timezone.now())
+    )
+    if not debited:
+        raise InsufficientFunds()
+    if seller_id is not None:
+        UserModel.objects.filter(pk=seller_id).update(money=F('money') + amount, updated_at=timezone.now())
+    invalidate_users([buyer_id, seller_id])
+
+
+def purchase_game(buyer, game_id):
+    """Buy one game for `buyer`; raises a PurchaseError subclass on refusal."""
+    with transaction.atomic():
+        game = GameModel.objects.select_for_update().filter(pk=game_id).first()
+        if game is None:
+            raise GameNotFound()
+        if game.user_id == buyer.pk:
+            raise OwnGame()
+
+        balances = lock_users([buyer.pk, game.user_id])
+
+        if BoughtGame.objects.filter(user_id=buyer.pk, game_id=game.pk).exists():
+            raise AlreadyPurchased()
+        if balances[buyer.pk] < game.price:
+            raise InsufficientFunds()
+
+        transfer(buyer.pk, game.user_id, charge_amount(game.price))
+        BoughtGame.objects.create(user_id=buyer.pk, game=game)
+
+    # Keep the in-memory user (request.user) in line with the database
+    buyer.refresh_from_db(fields=['money', 'updated_at'])
+    return game
+
+
+def checkout(buyer, game_ids):
+    """
+    Buy several games in one transaction.
+
+    Locks all involved rows in one batch (same global order as purchase_game),
+    checks ownership and funds once, then moves money with one debit and one
+    credit UPDATE and bulk-inserts the BoughtGame rows. Games the buyer cannot
+    afford are skipped in cart order. Returns one outcome dict per distinct id.
+    """
+    game_ids = list(dict.fromkeys(game_ids))
+    outcomes = {}
+
+    with transaction.atomic():
+        games = {
+            game.pk: game
+            for game in GameModel.objects.select_for_update().filter(pk__in=game_ids).order_by('pk')
+        }
+        owned = set(
+            BoughtGame.objects
+            .filter(user_id=buyer.pk, game_id__in=games)
+            .values_list('game_id', flat=True)
+        )
+        balances = lock_users([buyer.pk, *(game.user_id for game in games.values())])
+
+        remaining = balances[buyer.pk]
+        to_buy = []
+        for game_id in game_ids:
+            game = games.get(game_id)
+            if game is None:
+                error = GameNotFound()
+            elif game.user_id == buyer.pk:
+                error = OwnGame()
+            elif game_id in owned:
+                error = AlreadyPurchased()
+            elif remaining < game.price:
+                error = InsufficientFunds()
+            else:
+                remaining -= charge_amount(game.price)
+                to_buy.append(game)
+                outcomes[game_id] = {"game_id": game_id, "status": "purchased"}
+                continue
+            outcomes[game_id] = {"game_id": game_id, "status": error.code, "detail": error.detail}
+
+        if to_buy:
+            credits = {}
+            for game in to_buy:
+                if game.user_id is not None:
+                    credits[game.user_id] = credits.get(game.user_id, 0) + charge_amount(game.price)
+            total = sum(charge_amount(game.price) for game in to_buy)
+
+            debited = (
+                UserModel.objects
+                .filter(pk=buyer.pk, money__gte=total)
+                .update(money=F('money') - total, updated_at=timezone.now())
+            )
+            if not debited:
+                raise InsufficientFunds()
+            if credits:
+                UserModel.objects.filter(pk__in=credits).update(
+                    money=F('money') + Case(
+                        *(When(pk=pk, then=Value(amount)) for pk, amount in credits.items()),
+                        default=Value(0),
+                    ),
+                    updated_at=timezone.now(),
+                )
+            invalidate_users([buyer.pk, *credits])
+
+            BoughtGame.objects.bulk_create([BoughtGame(user_id=buyer.pk, game=game) for game in to_buy])
+            # bulk_create sends no signals
+            adjust_user_counter('bought_count', {buyer.pk: len(to_buy)})
+
+    if to_buy:
+        bump_catalog_version()
+        buyer.refresh_from_db(fields=['money', 'updated_at'])
+    return [outcomes[game_id] for game_id in game_ids]
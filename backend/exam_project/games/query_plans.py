@@ -0,0 +1,165 @@
+"""
+Query plan check for the filtered games list (see the `check_query_plans` command).
+
+The first-page query the API runs for a combination of GameFilter parameters
+and an ordering is EXPLAINed: GamesListCreateApiView's filters,
+FastGameSerializer's columns and KeysetPagination's ORDER BY ... LIMIT. A plan
+passes only when every read of the games table is either
+
+* an index range that already yields the ORDER BY: an index condition bounds
+  the rows read and no sort step follows; or
+* for an unfiltered query, an ordered scan of the whole table or index with no
+  sort step after it, so the LIMIT stops it after one page.
+
+A sequential scan fails, and so does any plan with a sort step (even after an
+index range: the whole range is read before the first row is returned), or a
+scan that reads the whole index and only filters its rows.
+
+No set of B-tree indexes can serve a range on one column ordered by another,
+so the indexes on GameModel are meant for the INDEXED cases: the equality
+filters (category, seller) with any ordering, plus a price range ordered by
+price and a created_after range ordered by created_at. `plan_cases()` yields those; `plan_cases(every=True)` yields every
+combination, to see what the others cost.
+
+On PostgreSQL the EXPLAIN runs with `enable_seqscan = off`. The verdict then
+does not depend on table size or statistics: the planner only falls back to
+a Seq Scan when no index can serve the query. SQLite's EXPLAIN QUERY PLAN does
+not show filters, so there a SCAN of a filtered query (bare, in rowid order,
+or along an index) counts as a scan that only filters rows.
+"""
+import re
+from itertools import combinations
+
+from django.db import connection, transaction
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from exam_project.games.api_views import GamesListCreateApiView, fast_rows
+from exam_project.games.filtering import FILTER_PARAMS
+from exam_project.games.models import GameModel
+from exam_project.games.pagination_sort import KeysetPagination
+
+SAMPLE_VALUES = {
+    'category': 'ACTION',
+    'min_price': '20',
+    'max_price': '100',
+    'seller': '1',
+    'created_after': '2024-01-01',
+}
+ORDERINGS = ('', 'price', '-price', 'title', '-title', 'created_at', '-created_at', 'id')
+
+TABLE = GameModel._meta.db_table
+
+
+EQUALITY_FILTERS = ('category', 'seller')
+# Range filters, and the orderings an index range on them already yields
+RANGE_ORDERINGS = {
+    'min_price': ('price', '-price'),
+    'max_price': ('price', '-price'),
+    'created_after': ('created_at', '-created_at'),
+}
+
+
+def is_indexed_case(params):
+    """Whether the GameModel indexes are meant to serve `params` without a sort."""
+    ordering = params.get('ordering', '')
+    return all(
+        name == 'ordering' or name in EQUALITY_FILTERS or ordering in RANGE_ORDERINGS.get(name, ())
+        for name in params
+    )
+
+
+def plan_cases(every=False):
+    """Query params for every filter subset × ordering (unfiltered included) the indexes serve, or all of them."""
+    for size in range(len(FILTER_PARAMS) + 1):
+        for names in combinations(FILTER_PARAMS, size):
+            for ordering in ORDERINGS:
+                params = {name: SAMPLE_VALUES[name] for name in names}
+                if ordering:
+                    params['ordering'] = ordering
+                if every or is_indexed_case(params):
+                    yield params
+
+
+def page_queryset(params):
+    """The first-page queryset GamesListCreateApiView builds for `params`."""
+    request = Request(RequestFactory().get('/api/games/', params))
+    view = GamesListCreateApiView(request=request, format_kwarg=None, args=(), kwargs={})
+    queryset = view.filter_queryset(view.get_queryset())
+    page, _ = KeysetPagination().seek_queryset(fast_rows(queryset), request)
+    return page
+
+
+def explain(queryset):
+    if connection.vendor == 'postgresql':
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            return queryset.explain()
+    return queryset.explain()
+
+
+def _postgres_problems(plan, filtered):
+    lines = plan.splitlines()
+    sorted_ = any(re.search(r'(^|->\s+)(Incremental )?Sort\b', line.strip()) for line in lines)
+    problems = []
+    for i, line in enumerate(lines):
+        if f' on {TABLE}' not in line:
+            continue
+        node = line.strip().removeprefix('->').strip()
+        if node.startswith('Seq Scan'):
+            problems.append(f'sequential scan: {node}')
+            continue
+        # Detail lines of this node run until the next plan node
+        details = []
+        for detail in lines[i + 1:]:
+            if '->' in detail:
+                break
+            details.append(detail.strip())
+        bounded = any(d.startswith(('Index Cond', 'Recheck Cond')) for d in details)
+        if sorted_:
+            kind = 'index range' if bounded else 'full index scan'
+            problems.append(f'{kind} followed by a sort: {node}')
+        elif not bounded and any(d.startswith('Filter') for d in details):
+            problems.append(f'index scan that only filters rows: {node}')
+    return problems
+
+
+def _sqlite_problems(plan, filtered):
+    sorted_ = 'USE TEMP B-TREE FOR' in plan
+    problems = []
+    for line in plan.splitlines():
+        match = re.search(rf'\b(SCAN|SEARCH) {TABLE}\b(.*)', line)
+        if not match:
+            continue
+        if sorted_:
+            kind = 'index range' if match.group(1) == 'SEARCH' else 'full scan'
+            problems.append(f'{kind} followed by a sort: {line.strip()}')
+        elif match.group(1) == 'SCAN' and filtered:
+            # Walks the whole table (or index) and tests every row against the filters
+            problems.append(f'full scan that only filters rows: {line.strip()}')
+    return problems
+
+
+PLAN_CHECKS = {'postgresql': _postgres_problems, 'sqlite': _sqlite_problems}
+
+
+def plan_problems(plan, vendor=None, filtered=True):
+    """Reasons `plan` reads the games table without an index range or index order.
+
+    `filtered` says whether the query has a WHERE clause: only an unfiltered
+    query may walk the whole table or index, in the ORDER BY's order.
+    """
+    vendor = vendor or connection.vendor
+    if vendor not in PLAN_CHECKS:
+        raise ValueError(f'No plan check for "{vendor}"; supported: {", ".join(PLAN_CHECKS)}.')
+    return PLAN_CHECKS[vendor](plan, filtered)
+
+
+def check_query_plans(cases=None):
+    """`[(params, plan, problems)]` for every case, by default the indexed ones."""
+    results = []
+    for params in cases if cases is not None else plan_cases():
+        plan = explain(page_queryset(params))
+        filtered = any(name in params for name in FILTER_PARAMS)
+        results.append((params, plan, plan_problems(plan, filtered=filtered)))
+    return results
@@ -1,24 +1,88 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
+from exam_project.common.images import absolute_url, variant_urls, variant_urls_for
 from .models import GameModel
 from exam_project.common.models import BoughtGame
 
 
 class GameSerializer(serializers.ModelSerializer):
     seller_display = serializers.CharField(source='user.display_name', read_only=True)
+    game_picture_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = GameModel
         fields = [
             'id', 'title', 'summary', 'price', 'category',
-            'game_picture', 'user', 'seller_display', 'created_at'
+            'game_picture', 'game_picture_variants', 'user', 'seller_display', 'created_at'
         ]
         read_only_fields = ['id', 'user', 'seller_display']
 
+    def get_game_picture_variants(self, obj):
+        return variant_urls(obj, 'game_picture', self.context.get('request'))
+
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
 
+class FastGameSerializer:
+    """
+    Read-only stand-in for GameSerializer(many=True) on list endpoints.
+
+    Works on `.values()` rows instead of model instances and builds each dict
+    directly, reusing GameSerializer's field objects only where their
+    formatting is non-trivial (decimal quantizing, timezone handling). The
+    output is identical to GameSerializer's, key order included.
+    """
+    columns = (
+        'id', 'title', 'summary', 'price', 'category', 'game_picture', 'game_picture_variants',
+        'user', 'user__first_name', 'user__last_name', 'user__email', 'created_at',
+    )
+    _price = GameSerializer().fields['price']
+    _created_at = GameSerializer().fields['created_at']
+
+    def __init__(self, rows, context=None):
+        self.rows = rows
+        self.request = (context or {}).get('request')
+
+    @classmethod
+    def values(cls, queryset, *extra):
+        return queryset.values(*cls.columns, *(name for name in extra if name not in cls.columns))
+
+    @staticmethod
+    def display_name(row):
+        # Mirrors AppUser.display_name
+        full_name = f"{row['user__first_name'] or ''} {row['user__last_name'] or ''}".strip()
+        if not full_name or full_name.lower() == "none none":
+            return row['user__email']
+        return full_name
+
+    def to_representation(self, row):
+        request = self.request
+        picture = row['game_picture']
+        summary = row['summary']
+        data = {
+            'id': row['id'],
+            'title': row['title'],
+            'summary': summary if summary is None else str(summary),
+            'price': self._price.to_representation(row['price']),
+            'category': row['category'],
+            'game_picture': absolute_url(request, default_storage.url(picture)) if picture else None,
+            'game_picture_variants': variant_urls_for(picture, row['game_picture_variants'], request),
+            'user': row['user'],
+            'seller_display': self.display_name(row),
+            'created_at': self._created_at.to_representation(row['created_at']),
+        }
+        if row['user'] is None:
+            # GameSerializer skips the field when `user.display_name` can't be resolved
+            del data['seller_display']
+        return data
+
+    @property
+    def data(self):
+        return [self.to_representation(row) for row in self.rows]
+
+
 class GameUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = GameModel
@@ -32,3 +96,11 @@ class BoughtGameSerializer(serializers.ModelSerializer):
         model = BoughtGame
         fields = ['id', 'game', 'created_at']
         read_only_fields = ['id', 'user', 'created_at']
+
+
+class CheckoutSerializer(serializers.Serializer):
+    game_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=100,
+    )
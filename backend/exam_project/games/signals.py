@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from exam_project.common.models import BoughtGame, GameComment
+from exam_project.games.cache import bump_catalog_version
+from exam_project.games.models import GameModel
+
+UserModel = get_user_model()
+
+# The catalog shows each game's seller by display_name, built from these
+SELLER_NAME_FIELDS = ('first_name', 'last_name', 'email')
+
+
+@receiver(post_save, sender=GameModel)
+@receiver(post_delete, sender=GameModel)
+@receiver(post_save, sender=BoughtGame)
+@receiver(post_delete, sender=BoughtGame)
+def invalidate_catalog_cache(sender, **kwargs):
+    # Bump now so this process stops serving the old version, and again after
+    # commit so nothing cached from the pre-commit snapshot survives.
+    bump_catalog_version()
+    transaction.on_commit(bump_catalog_version)
+
+
+def _seller_name(instance):
+    return tuple(instance.__dict__.get(field) for field in SELLER_NAME_FIELDS)
+
+
+@receiver(post_init, sender=UserModel)
+def remember_seller_name(sender, instance, **kwargs):
+    # Skip deferred loads, like remember_game_owner in accounts.signals
+    if all(field in instance.__dict__ for field in SELLER_NAME_FIELDS):
+        instance._catalog_name = _seller_name(instance)
+
+
+@receiver(post_save, sender=UserModel)
+def invalidate_catalog_on_seller_rename(sender, instance, created, **kwargs):
+    if created or not hasattr(instance, '_catalog_name'):
+        return
+    if _seller_name(instance) != instance._catalog_name:
+        instance._catalog_name = _seller_name(instance)
+        # Cached catalog pages carry the old seller_display
+        invalidate_catalog_cache(sender)
+
+
+def adjust_comments_count(game_id, delta):
+    GameModel.objects.filter(pk=game_id).update(
+        comments_count=Greatest(F('comments_count') + delta, Value(0)),
+        comments_updated_at=timezone.now(),
+    )
+
+
+@receiver(post_save, sender=GameComment)
+def count_comment_created(sender, instance, created, **kwargs):
+    if created:
+        adjust_comments_count(instance.game_id, 1)
+    else:
+        GameModel.objects.filter(pk=instance.game_id).update(comments_updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=GameComment)
+def count_comment_deleted(sender, instance, **kwargs):
+    adjust_comments_count(instance.game_id, -1)
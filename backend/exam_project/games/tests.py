@@ -1,8 +1,31 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import threading
+import time
+from base64 import urlsafe_b64encode
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from django.core.cache import cache
+from django.db import connection, models
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth import get_user_model
+from exam_project.games import purchases
+from exam_project.games.cache import CATALOG_VERSION_KEY, AsyncSingleFlight, SingleFlight, get_catalog_version
+from exam_project.games import loadgen
+from exam_project.games import query_plans
+from exam_project.games.filtering import FILTER_PARAMS
+from exam_project.games.importer import INITIAL_GAMES_FIXTURE, import_games, iter_json_array, read_records
 from exam_project.games.models import GameModel
-from exam_project.common.models import BoughtGame
+from exam_project.games.serializers import FastGameSerializer, GameSerializer
+from exam_project.games.search import search_games
+from exam_project.common.models import BoughtGame, GameComment
 
 UserModel = get_user_model()
 
@@ -65,3 +88,690 @@ class GameTests(TestCase):
         response = self.client.post(reverse('game buy', args=[game.pk]))
         self.assertEqual(response.status_code, 302)
         self.assertFalse(BoughtGame.objects.filter(user=poor_user, game=game).exists())
+
+
+class GameApiPaginationTests(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(email='seller@example.com', password='StrongPass123!')
+        for i in range(30):
+            # Only 5 distinct prices, so most page boundaries fall inside a tie
+            GameModel.objects.create(title=f'Game {i:02d}', category='ACTION', price=f'{10 + i % 5}.00', user=self.user)
+
+    def walk(self, url):
+        ids = []
+        while url:
+            data = self.client.get(url).json()
+            ids.extend(game['id'] for game in data['results'])
+            url = data['next']
+        return ids
+
+    def test_page_number_contract_is_default(self):
+        data = self.client.get(reverse('games_list_create')).json()
+        self.assertEqual(data['count'], 30)
+        self.assertEqual(len(data['results']), 12)
+
+    def test_cursor_walk_matches_full_ordering(self):
+        for ordering, expected in (
+            ('-id', GameModel.objects.order_by('-id')),
+            ('price', GameModel.objects.order_by('price', 'id')),
+            ('-price', GameModel.objects.order_by('-price', '-id')),
+            ('title', GameModel.objects.order_by('title', 'id')),
+            ('price,-title', GameModel.objects.order_by('price', '-title', 'id')),
+            ('-created_at', GameModel.objects.order_by('-created_at', '-id')),
+        ):
+            with self.subTest(ordering=ordering):
+                ids = self.walk(f"{reverse('games_list_create')}?pagination=cursor&ordering={ordering}")
+                self.assertEqual(ids, list(expected.values_list('id', flat=True)))
+
+    def test_cursor_previous_link(self):
+        first = self.client.get(f"{reverse('games_list_create')}?pagination=cursor&ordering=price").json()
+        second = self.client.get(first['next']).json()
+        back = self.client.get(second['previous']).json()
+        self.assertEqual([g['id'] for g in back['results']], [g['id'] for g in first['results']])
+        self.assertIsNone(back['previous'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f"{reverse('games_list_create')}?cursor=garbage")
+        self.assertEqual(response.status_code, 404)
+
+        # Valid JSON with the right ordering, but values the columns cannot take
+        for values in (['cheap', 1], ['10.00', 'x'], [{'a': 1}, 1]):
+            payload = json.dumps({'o': ['price', 'id'], 'v': values, 'r': 0}).encode()
+            cursor = urlsafe_b64encode(payload).decode()
+            response = self.client.get(reverse('games_list_create'), {'ordering': 'price', 'cursor': cursor})
+            self.assertEqual(response.status_code, 404, values)
+
+    def test_cursor_without_direction(self):
+        cursor = urlsafe_b64encode(json.dumps({'o': ['-id'], 'v': [5]}).encode()).decode()
+        for name in ('games_list_create', 'games_list_async'):
+            response = self.client.get(reverse(name), {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, name)
+
+    def test_uniform_ordering_seeks_with_a_row_comparison(self):
+        first = self.client.get(reverse('games_list_create'), {'pagination': 'cursor', 'ordering': '-price'}).json()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first['next'])
+        self.assertTrue(any(' < (' in query['sql'] and '"price", ' in query['sql'] for query in queries))
+
+
+class GameSearchTests(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(email='seller@example.com', password='StrongPass123!')
+        self.by_title = GameModel.objects.create(title='Chess Master', category='OTHER', price='20.00', summary='Play online')
+        self.by_summary = GameModel.objects.create(title='Grandmaster', category='OTHER', price='20.00', summary='A chess trainer')
+        self.by_category = GameModel.objects.create(title='Poker Night', category='BOARD', price='20.00', summary='Cards')
+        GameModel.objects.create(title='Racer', category='SPORTS', price='20.00', summary='Fast cars', user=self.user)
+
+    def test_ranked_by_field_weight(self):
+        results = list(search_games(GameModel.objects.all(), 'chess'))
+        self.assertEqual(results, [self.by_title, self.by_summary])
+
+    def test_matches_category_label(self):
+        self.assertEqual(list(search_games(GameModel.objects.all(), 'card game')), [self.by_category])
+
+    def test_title_substring_still_matches(self):
+        self.assertEqual(list(search_games(GameModel.objects.all(), 'ker ni')), [self.by_category])
+
+    def test_ranking_stays_in_the_query(self):
+        GameModel.objects.bulk_create(
+            GameModel(title=f'Chess Variant {i}', category='OTHER', price='20.00') for i in range(50)
+        )
+        with self.assertNumQueries(0):
+            results = search_games(GameModel.objects.all(), 'chess')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(results[:3]), 3)
+        # One page is read, and its SQL does not list every match
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn(' IN (', queries[0]['sql'])
+
+    def test_api_search_uses_relevance_unless_ordering_given(self):
+        url = reverse('games_list_create')
+        ranked = [g['id'] for g in self.client.get(url, {'search': 'chess'}).json()['results']]
+        self.assertEqual(ranked, [self.by_title.id, self.by_summary.id])
+        ordered = [g['id'] for g in self.client.get(url, {'search': 'chess', 'ordering': '-title'}).json()['results']]
+        self.assertEqual(ordered, [self.by_title.id, self.by_summary.id][::-1])
+
+    def test_index_view_search(self):
+        response = self.client.get(reverse('index'), {'q': 'chess'})
+        self.assertEqual(list(response.context['games']), [self.by_title, self.by_summary])
+
+
+class GameResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel.objects.create_user(email='seller@example.com', password='StrongPass123!', money=100)
+        self.game = GameModel.objects.create(title='Cached', category='ACTION', price='20.00', user=self.user)
+
+    def test_list_is_served_from_cache(self):
+        url = reverse('games_list_create')
+        self.client.get(url, {'search': 'Cached '})
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'search': 'cached'})
+        self.assertEqual(response.json()['results'][0]['id'], self.game.id)
+
+    def test_save_and_purchase_invalidate(self):
+        url = reverse('games_detail', args=[self.game.pk])
+        self.client.get(url)
+        self.game.title = 'Renamed'
+        self.game.save()
+        self.assertEqual(self.client.get(url).json()['title'], 'Renamed')
+
+        version = get_catalog_version()
+        BoughtGame.objects.create(user=self.user, game=self.game)
+        self.assertNotEqual(get_catalog_version(), version)
+
+    def test_seller_rename_invalidates(self):
+        url = reverse('games_detail', args=[self.game.pk])
+        self.assertEqual(self.client.get(url).json()['seller_display'], 'seller@example.com')
+
+        seller = UserModel.objects.get(pk=self.user.pk)
+        seller.first_name, seller.last_name = 'Ada', 'Lovelace'
+        seller.save()
+        self.assertEqual(self.client.get(url).json()['seller_display'], 'Ada Lovelace')
+
+        version = get_catalog_version()
+        seller.money = 50
+        seller.save()  # not shown in the catalog: cached pages stay valid
+        self.assertEqual(get_catalog_version(), version)
+
+    def test_single_flight_collapses_concurrent_calls(self):
+        flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'value'
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do('key', compute)))
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(flight.do('key', compute))) for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        time.sleep(0.2)  # let the followers reach the in-flight call
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 5)
+
+    async def test_async_single_flight_collapses_concurrent_calls(self):
+        flight = AsyncSingleFlight()
+        calls = []
+        release = asyncio.Event()
+
+        async def compute():
+            calls.append(1)
+            await release.wait()
+            return 'value'
+
+        async def fail():
+            raise ValueError('boom')
+
+        waiting = asyncio.gather(*(flight.do('key', compute) for _ in range(5)))
+        await asyncio.sleep(0)
+        release.set()
+        self.assertEqual(await waiting, ['value'] * 5)
+        self.assertEqual(len(calls), 1)
+
+        results = await asyncio.gather(flight.do('key', fail), flight.do('key', fail), return_exceptions=True)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        # Finished calls are forgotten: the next miss computes again
+        self.assertEqual(await flight.do('key', compute), 'value')
+        self.assertEqual(len(calls), 2)
+
+
+class PurchaseServiceTests(TestCase):
+    def setUp(self):
+        self.buyer = UserModel.objects.create_user(email='buyer@example.com', password='StrongPass123!', money=100)
+        self.seller = UserModel.objects.create_user(email='seller@example.com', password='StrongPass123!', money=0)
+        self.game = GameModel.objects.create(title='Service', category='ACTION', price='29.50', user=self.seller)
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+
+    def test_api_buy_moves_same_amount_both_ways(self):
+        response = self.client.post(reverse('games_buy', args=[self.game.pk]))
+        self.assertEqual(response.status_code, 201)
+        self.buyer.refresh_from_db()
+        self.seller.refresh_from_db()
+        self.assertEqual((self.buyer.money, self.seller.money), (70, 30))
+
+        response = self.client.post(reverse('games_buy', args=[self.game.pk]))
+        self.assertEqual(response.json()['detail'], 'Already purchased.')
+
+    def test_refusals_leave_balances_untouched(self):
+        self.assertRaises(purchases.OwnGame, purchases.purchase_game, self.seller, self.game.pk)
+        self.assertRaises(purchases.GameNotFound, purchases.purchase_game, self.buyer, 0)
+        UserModel.objects.filter(pk=self.buyer.pk).update(money=29)
+        self.assertRaises(purchases.InsufficientFunds, purchases.purchase_game, self.buyer, self.game.pk)
+        self.assertEqual(
+            list(UserModel.objects.order_by('pk').values_list('money', flat=True)),
+            [29, 0],
+        )
+        self.assertFalse(BoughtGame.objects.exists())
+
+
+class CheckoutTests(TestCase):
+    def setUp(self):
+        self.buyer = UserModel.objects.create_user(email='buyer@example.com', password='StrongPass123!', money=100)
+        self.sellers = [
+            UserModel.objects.create_user(email=f'seller{i}@example.com', password='StrongPass123!')
+            for i in range(2)
+        ]
+        self.games = [
+            GameModel.objects.create(title=f'Cart {i}', category='ACTION', price='30.00', user=self.sellers[i % 2])
+            for i in range(4)
+        ]
+        self.own = GameModel.objects.create(title='Mine', category='ACTION', price='10.00', user=self.buyer)
+        BoughtGame.objects.create(user=self.buyer, game=self.games[0])
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+
+    def test_per_item_outcomes(self):
+        ids = [g.pk for g in self.games] + [self.own.pk, 999999]
+        response = self.client.post(reverse('games_checkout'), {'game_ids': ids}, format='json')
+        self.assertEqual(response.status_code, 201)
+        statuses = [item['status'] for item in response.json()['items']]
+        self.assertEqual(statuses, [
+            'already_purchased', 'purchased', 'purchased', 'purchased', 'own_game', 'not_found',
+        ])
+        self.buyer.refresh_from_db()
+        self.assertEqual((self.buyer.money, self.buyer.bought_count), (10, 4))
+        self.assertEqual(
+            sorted(UserModel.objects.filter(pk__in=[s.pk for s in self.sellers]).values_list('money', flat=True)),
+            [30, 60],
+        )
+
+    def test_skips_what_buyer_cannot_afford(self):
+        UserModel.objects.filter(pk=self.buyer.pk).update(money=50)
+        response = self.client.post(reverse('games_checkout'), {'game_ids': [self.games[1].pk, self.games[2].pk]}, format='json')
+        self.assertEqual([i['status'] for i in response.json()['items']], ['purchased', 'insufficient_funds'])
+        self.assertEqual(response.json()['money'], 20)
+
+    def test_query_count_is_flat_in_cart_size(self):
+        GameModel.objects.bulk_create(
+            GameModel(title=f'Bulk {i}', category='ACTION', price='10.00', user=self.sellers[i % 2])
+            for i in range(101)
+        )
+        bulk = list(GameModel.objects.filter(title__startswith='Bulk ').values_list('pk', flat=True))
+        UserModel.objects.filter(pk=self.buyer.pk).update(money=10_000)
+
+        counts = []
+        for cart in (bulk[:1], bulk[1:]):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(reverse('games_checkout'), {'game_ids': cart}, format='json')
+            self.assertEqual([item['status'] for item in response.json()['items']], ['purchased'] * len(cart))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class GameConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel.objects.create_user(email='seller@example.com', password='StrongPass123!')
+        self.game = GameModel.objects.create(title='Tagged', category='ACTION', price='20.00', user=self.user)
+
+    def test_detail_not_modified_until_row_changes(self):
+        url = reverse('games_detail', args=[self.game.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.game.price = '25.00'
+        self.game.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_etag_follows_catalog_version(self):
+        url = reverse('games_list_create')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertNotEqual(self.client.get(url, {'ordering': 'price'})['ETag'], etag)
+
+        self.game.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+# =====================================================
+# IMPORTER
+# =====================================================
+class GameImporterTests(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(email='importer@example.com', password='StrongPass123!')
+
+    def test_json_array_is_read_across_chunk_boundaries(self):
+        records = [{'title': f'Game {i}', 'summary': 'x' * i} for i in range(50)]
+        parsed = list(iter_json_array(io.StringIO(json.dumps(records, indent=2)), read_size=7))
+        self.assertEqual(parsed, records)
+
+    def test_initial_fixture_loads_on_non_empty_catalog(self):
+        GameModel.objects.create(title='MINECRAFT', category='ACTION', price='99.00', user=self.user)
+        with open(INITIAL_GAMES_FIXTURE, encoding='utf-8') as f:
+            total = len(json.load(f))
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        body = client.post(reverse('load_games')).json()
+
+        self.assertEqual(body['created'], total - 1)
+        self.assertEqual(GameModel.objects.count(), total)
+        # Existing games are left alone by the endpoint
+        self.assertEqual(str(GameModel.objects.get(title='MINECRAFT').price), '99.00')
+
+    def test_upsert_csv_and_ndjson(self):
+        version = get_catalog_version()
+        csv_data = io.StringIO(
+            "title,category,price,summary,seller_id\n"
+            f"Alpha,Puzzle,12.5,First,{self.user.pk}\n"
+            "Beta,STRATEGY,30,,999999\n"
+            "Broken,ACTION,5,,\n"
+        )
+        stats = import_games(read_records(csv_data, 'csv'), batch_size=2)
+        self.assertEqual((stats.created, stats.updated, stats.skipped), (2, 0, 1))
+        self.assertNotEqual(get_catalog_version(), version)
+
+        alpha = GameModel.objects.get(title='Alpha')
+        self.assertEqual((alpha.category, str(alpha.price), alpha.user_id), ('PUZZLE', '12.50', self.user.pk))
+        self.assertIsNone(GameModel.objects.get(title='Beta').user_id)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.games_count, 1)
+
+        ndjson = io.StringIO('{"title": "Alpha", "category": "ACTION", "price": "15.00"}\n\n'
+                             '{"title": "Gamma", "category": "OTHER", "price": "20.00"}\n')
+        stats = import_games(read_records(ndjson, 'ndjson'))
+        self.assertEqual((stats.created, stats.updated), (1, 1))
+        alpha.refresh_from_db()
+        # Upsert updates the catalog fields but keeps the seller
+        self.assertEqual((alpha.category, str(alpha.price), alpha.user_id), ('ACTION', '15.00', self.user.pk))
+
+    def test_upsert_keeps_columns_missing_from_the_input(self):
+        GameModel.objects.create(
+            title='Alpha', category='ACTION', price='10.00', summary='Kept', game_picture='game_pics/alpha.jpg',
+        )
+        GameModel.objects.create(title='Beta', category='ACTION', price='10.00', summary='Replaced')
+        ndjson = io.StringIO('{"title": "Alpha", "category": "PUZZLE", "price": "12.00"}\n'
+                             '{"title": "Beta", "category": "PUZZLE", "price": "12.00", "summary": "New"}\n'
+                             '{"title": "Gamma", "category": "PUZZLE", "price": "12.00"}\n')
+        stats = import_games(read_records(ndjson, 'ndjson'))
+        self.assertEqual((stats.created, stats.updated), (1, 2))
+
+        alpha = GameModel.objects.get(title='Alpha')
+        self.assertEqual((alpha.category, alpha.summary, alpha.game_picture.name),
+                         ('PUZZLE', 'Kept', 'game_pics/alpha.jpg'))
+        self.assertEqual(GameModel.objects.get(title='Beta').summary, 'New')
+        # New games still get the model defaults
+        self.assertEqual(GameModel.objects.get(title='Gamma').game_picture.name, 'game_pics/no-image.jpg')
+
+
+# =====================================================
+# LOAD DATA GENERATOR
+# =====================================================
+class LoadDataGeneratorTests(TestCase):
+    SIZES = dict(users=40, games=120, purchases=300, comments=60, seed=7, batch_size=50)
+
+    def snapshot(self):
+        games = GameModel.objects.filter(user__email__endswith=f'@{loadgen.LOAD_DOMAIN}').order_by('pk')
+        return list(games.values_list('title', 'category', 'price', 'summary'))
+
+    def test_same_seed_reproduces_the_data_set(self):
+        counts = loadgen.generate(**self.SIZES)
+        first = self.snapshot()
+        self.assertEqual((counts['users'], counts['games']), (40, 120))
+        self.assertEqual(len({title for title, *_ in first}), 120)
+
+        user_ids = set(loadgen.generated_users().values_list('pk', flat=True))
+        with mock.patch.object(loadgen, 'invalidate_users') as invalidate:
+            loadgen.clear_load_data()
+        self.assertEqual(set(invalidate.call_args.args[0]), user_ids)
+        self.assertFalse(loadgen.generated_users().exists())
+        self.assertEqual(loadgen.generate(**self.SIZES), counts)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_clearing_recounts_the_rows_left_behind(self):
+        loadgen.generate(**self.SIZES)
+        buyer = UserModel.objects.create_user(email='real-buyer@example.com', password='StrongPass123!')
+        own_game = GameModel.objects.create(title='Real Game', category='ACTION', price='10.00', user=buyer)
+        generated_game = GameModel.objects.filter(user__in=loadgen.generated_users()).first()
+        BoughtGame.objects.create(user=buyer, game=generated_game)
+        GameComment.objects.create(user=buyer, game=generated_game, text='Fun')
+        GameComment.objects.create(user=loadgen.generated_users().first(), game=own_game, text='Nice')
+
+        loadgen.clear_load_data()
+        buyer.refresh_from_db()
+        own_game.refresh_from_db()
+        self.assertEqual((buyer.bought_count, buyer.comments_count, buyer.games_count), (0, 0, 1))
+        self.assertEqual(own_game.comments_count, 0)
+
+    def test_counters_match_generated_rows(self):
+        loadgen.generate(**self.SIZES)
+        self.assertFalse(BoughtGame.objects.filter(game__user=models.F('user')).exists())
+        for user in loadgen.generated_users():
+            self.assertEqual(user.games_count, GameModel.objects.filter(user=user).count())
+            self.assertEqual(user.bought_count, BoughtGame.objects.filter(user=user).count())
+        for game in GameModel.objects.all():
+            self.assertEqual(game.comments_count, game.gamecomment_set.count())
+
+
+# =====================================================
+# FAST LIST SERIALIZER
+# =====================================================
+class FastGameSerializerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        named = UserModel.objects.create_user(email='named@example.com', first_name='Ada', last_name='Lovelace')
+        half = UserModel.objects.create_user(email='half@example.com', first_name='Ada')
+        legacy = UserModel.objects.create_user(email='legacy@example.com', first_name='None', last_name='None')
+        GameModel.objects.create(title='Named', category='ACTION', price='10.5', user=named, summary='Ünïcode')
+        GameModel.objects.create(title='Half', category='BOARD', price='999.99', user=half, summary=None)
+        GameModel.objects.create(title='Legacy', category='OTHER', price='12.00', user=legacy, game_picture='')
+        GameModel.objects.create(
+            title='Orphan', category='PUZZLE', price='20.00', user=None, game_picture='game_pics/a.png',
+            game_picture_variants={'source': 'game_pics/a.png', 'webp': {'160': 'derivatives/game_pics/a.1.160w.webp'}},
+        )
+        GameModel.objects.create(
+            title='Stale', category='PUZZLE', price='20.00', user=named, game_picture='game_pics/new.png',
+            game_picture_variants={'source': 'game_pics/old.png', 'webp': {'160': 'derivatives/old.webp'}},
+        )
+
+    def test_output_is_byte_identical(self):
+        context = {'request': RequestFactory().get('/api/games/')}
+        queryset = GameModel.objects.select_related('user').order_by('id')
+        renderer = JSONRenderer()
+
+        expected = renderer.render(GameSerializer(queryset, many=True, context=context).data)
+        actual = renderer.render(FastGameSerializer(FastGameSerializer.values(queryset), context).data)
+        self.assertEqual(actual, expected)
+
+    def test_list_endpoints_use_values_rows(self):
+        url = reverse('games_list_create')
+        response = self.client.get(url, {'ordering': 'price', 'pagination': 'cursor'})
+        request = response.wsgi_request
+        expected = GameSerializer(
+            GameModel.objects.select_related('user').order_by('price', 'id')[:12], many=True,
+            context={'request': request},
+        ).data
+        self.assertEqual(response.json()['results'], json.loads(JSONRenderer().render(expected)))
+
+
+# =====================================================
+# ASYNC READ ENDPOINTS
+# =====================================================
+class AsyncReadEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.seller = UserModel.objects.create_user(email='seller@example.com', first_name='Ada', last_name='Byron')
+        self.buyer = UserModel.objects.create_user(email='buyer@example.com', password='StrongPass123!')
+        self.games = [
+            GameModel.objects.create(title=f'Async Quest {i}', category='ACTION', price=f'{10 + i}.99', user=self.seller)
+            for i in range(15)
+        ]
+        for game in self.games[:3]:
+            BoughtGame.objects.create(user=self.buyer, game=game)
+        self.token = str(AccessToken.for_user(self.buyer))
+
+    def assertSamePayload(self, sync_url, async_url, params=None, **headers):
+        expected = self.client.get(sync_url, params, **headers)
+        # Drop the shared response cache (not the version) so the async view computes the page
+        version = get_catalog_version()
+        cache.clear()
+        cache.set(CATALOG_VERSION_KEY, version, timeout=None)
+        actual = self.client.get(async_url, params, **headers)
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(actual['ETag'], expected['ETag'])
+        self.assertEqual(
+            actual.content.replace(b'/api/async/', b'/api/'),
+            expected.content,
+        )
+        return actual
+
+    def test_list_matches_sync_view(self):
+        sync_url, async_url = reverse('games_list_create'), reverse('games_list_async')
+        self.assertSamePayload(sync_url, async_url)
+        self.assertSamePayload(sync_url, async_url, {'page': 2, 'ordering': 'price'})
+        self.assertSamePayload(sync_url, async_url, {'search': 'quest'})
+        first = self.assertSamePayload(sync_url, async_url, {'pagination': 'cursor'}).json()
+        self.assertSamePayload(sync_url, async_url, parse_qs(urlsplit(first['next']).query))
+
+    def test_detail_conditional_get_and_404(self):
+        game = self.games[0]
+        response = self.assertSamePayload(reverse('games_detail', args=[game.pk]), reverse('games_detail_async', args=[game.pk]))
+        url = reverse('games_detail_async', args=[game.pk])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        missing = self.client.get(reverse('games_detail_async', args=[0]))
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(missing.json(), {'detail': 'No GameModel matches the given query.'})
+
+    def test_bought_games_requires_jwt(self):
+        url = reverse('bought_games_list_async')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer nope').status_code, 401)
+
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {self.token}'}
+        payload = self.assertSamePayload(reverse('bought_games_list'), url, **auth).json()
+        self.assertEqual(payload['count'], 3)
+
+    async def test_served_on_the_event_loop(self):
+        response = await self.async_client.get(
+            reverse('bought_games_list_async'), headers={'authorization': f'Bearer {self.token}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([game['title'] for game in response.json()['results']], ['Async Quest 2', 'Async Quest 1', 'Async Quest 0'])
+
+        response = await self.async_client.get(reverse('games_list_async'), {'pagination': 'cursor'})
+        self.assertEqual(len(response.json()['results']), 12)
+
+
+# =====================================================
+# FACETS
+# =====================================================
+class GameFacetsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seller = UserModel.objects.create_user(email='facets@example.com')
+        for title, category, price in [
+            ('Space Racer', 'SPORTS', '19.99'),
+            ('Space Siege', 'STRATEGY', '20.00'),
+            ('Chess Night', 'BOARD', '499.99'),
+            ('Deep Space', 'ACTION', '999.99'),
+            ('Farm Day', 'OTHER', '10.00'),
+        ]:
+            GameModel.objects.create(title=title, category=category, price=price, user=seller)
+        self.url = reverse('games_facets')
+
+    def test_counts_in_one_query_then_from_cache(self):
+        with self.assertNumQueries(1):
+            body = self.client.get(self.url).json()
+        self.assertEqual(body['count'], 5)
+        counts = {c['value']: c['count'] for c in body['categories']}
+        self.assertEqual(counts, {'ACTION': 1, 'ADVENTURE': 0, 'PUZZLE': 0, 'STRATEGY': 1, 'SPORTS': 1, 'BOARD': 1, 'OTHER': 1})
+        buckets = {(b['min'], b['max']): b['count'] for b in body['price']['buckets']}
+        self.assertEqual(buckets[('10.00', '20.00')], 2)
+        self.assertEqual(buckets[('20.00', '30.00')], 1)
+        self.assertEqual(buckets[('250.00', '500.00')], 1)
+        self.assertEqual(buckets[('500.00', None)], 1)
+        self.assertEqual(sum(buckets.values()), 5)
+        self.assertEqual((body['price']['min'], body['price']['max']), ('10.00', '999.99'))
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_follows_search_and_catalog_changes(self):
+        body = self.client.get(self.url, {'search': 'space'}).json()
+        self.assertEqual(body['count'], 3)
+        self.assertEqual(sum(b['count'] for b in body['price']['buckets']), 3)
+
+        GameModel.objects.create(title='Space Puzzle', category='PUZZLE', price='30.00')
+        body = self.client.get(self.url, {'search': 'space'}).json()
+        self.assertEqual(body['count'], 4)
+        self.assertEqual(next(c['count'] for c in body['categories'] if c['value'] == 'PUZZLE'), 1)
+
+
+# =====================================================
+# FILTERS & QUERY PLANS
+# =====================================================
+class GameFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = UserModel.objects.create_user(email='alice@example.com')
+        self.bob = UserModel.objects.create_user(email='bob@example.com')
+        for title, category, price, user in [
+            ('Cheap Action', 'ACTION', '15.00', self.alice),
+            ('Mid Action', 'ACTION', '45.00', self.bob),
+            ('Pricey Action', 'ACTION', '450.00', self.alice),
+            ('Mid Board', 'BOARD', '45.00', self.alice),
+            ('Mid Puzzle', 'PUZZLE', '60.00', self.bob),
+        ]:
+            GameModel.objects.create(title=title, category=category, price=price, user=user)
+        GameModel.objects.filter(title='Cheap Action').update(created_at='2020-01-01T00:00:00Z')
+        self.url = reverse('games_list_create')
+
+    def titles(self, **params):
+        response = self.client.get(self.url, {'ordering': 'price', **params})
+        self.assertEqual(response.status_code, 200)
+        return [game['title'] for game in response.json()['results']]
+
+    def test_filters_combine(self):
+        self.assertEqual(self.titles(category='action'), ['Cheap Action', 'Mid Action', 'Pricey Action'])
+        self.assertEqual(self.titles(category='ACTION,Board/Card Game', min_price='40', max_price='100'), ['Mid Action', 'Mid Board'])
+        self.assertEqual(self.titles(seller=self.bob.pk), ['Mid Action', 'Mid Puzzle'])
+        self.assertEqual(self.titles(category='ACTION', created_after='2021-06-01'), ['Mid Action', 'Pricey Action'])
+        self.assertEqual(self.titles(min_price='45', pagination='cursor', search='mid'), ['Mid Action', 'Mid Board', 'Mid Puzzle'])
+
+    def test_invalid_values_are_rejected(self):
+        for params in ({'category': 'RPG'}, {'min_price': 'cheap'}, {'max_price': 'NaN'},
+                       {'min_price': '1e999999999'}, {'max_price': '10.001'}, {'seller': 'alice'},
+                       {'seller': '²'}, {'seller': '0'}, {'seller': str(2 ** 64)}, {'created_after': '2024-02-30'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(next(iter(params)), response.json())
+
+    def test_filters_reach_facets_and_cache_keys(self):
+        body = self.client.get(reverse('games_facets'), {'min_price': '40', 'max_price': '100'}).json()
+        self.assertEqual(body['count'], 3)
+        self.assertEqual(len(self.titles(category='BOARD')), 1)
+        self.assertEqual(len(self.titles(category='PUZZLE')), 1)
+        self.assertEqual(self.titles(category='PUZZLE'), self.titles(category=' puzzle '))
+
+
+class QueryPlanTests(TestCase):
+    def test_every_indexed_combination_is_index_backed(self):
+        failures = [(params, problems) for params, plan, problems in query_plans.check_query_plans() if problems]
+        self.assertEqual(failures, [])
+        # Every filter is checked in at least one case
+        checked = {name for params in query_plans.plan_cases() for name in params}
+        self.assertLessEqual(set(FILTER_PARAMS), checked)
+
+    def test_range_on_another_column_than_the_ordering_fails(self):
+        cases = [{'min_price': '20', 'ordering': 'title'}, {'created_after': '2024-01-01'}]
+        self.assertFalse(any(query_plans.is_indexed_case(params) for params in cases))
+        for params, plan, problems in query_plans.check_query_plans(cases):
+            self.assertNotEqual(problems, [], params)
+
+    def test_sqlite_plans(self):
+        problems = query_plans.plan_problems
+        self.assertEqual(problems('3 0 0 SCAN games_gamemodel', 'sqlite', filtered=False), [])
+        self.assertEqual(problems('6 0 0 SEARCH games_gamemodel USING INDEX game_category_id_idx (category=?)', 'sqlite'), [])
+        for bad in [
+            '3 0 0 SCAN games_gamemodel\n20 0 0 USE TEMP B-TREE FOR ORDER BY',
+            '6 0 0 SEARCH games_gamemodel USING INDEX game_price_id_idx (price>?)\n40 0 0 USE TEMP B-TREE FOR ORDER BY',
+            '3 0 0 SCAN games_gamemodel',
+            '6 0 0 SCAN games_gamemodel USING INDEX game_title_id_idx',
+        ]:
+            self.assertEqual(len(problems(bad, 'sqlite')), 1, bad)
+
+    def test_postgres_plans(self):
+        problems = query_plans.plan_problems
+        sorted_plan = '\n'.join([
+            'Limit  (cost=9.1..9.2 rows=13 width=100)',
+            '  ->  Sort  (cost=9.1..9.2 rows=40 width=100)',
+            '        Sort Key: games_gamemodel.title DESC, games_gamemodel.id DESC',
+            '        ->  Index Scan using game_price_id_idx on games_gamemodel  (cost=0.1..8.5 rows=40 width=100)',
+            '              Filter: (created_at >= now())',
+        ])
+        ranged_then_sorted = sorted_plan.replace('Filter:', 'Index Cond:')
+        filter_only = '\n'.join([
+            'Limit  (cost=0.1..9.2 rows=13 width=100)',
+            '  ->  Index Scan Backward using game_title_id_idx on games_gamemodel  (cost=0.1..8.5 rows=40 width=100)',
+            '        Filter: (price >= 20.00)',
+        ])
+        ranged = filter_only.replace('Filter:', 'Index Cond:').replace('game_title_id_idx', 'game_price_id_idx')
+        for bad in (sorted_plan, ranged_then_sorted, filter_only, 'Seq Scan on games_gamemodel  (cost=0.0..1.0 rows=1 width=4)'):
+            self.assertEqual(len(problems(bad, 'postgresql')), 1, bad)
+        self.assertIn('sequential scan', problems('Seq Scan on games_gamemodel  (cost=0.0..1.0 rows=1 width=4)', 'postgresql')[0])
+        self.assertEqual(problems(ranged, 'postgresql'), [])
+        self.assertEqual(problems(filter_only.replace('        Filter: (price >= 20.00)', ''), 'postgresql', filtered=False), [])
+
+    def test_unknown_vendor_names_the_supported_ones(self):
+        with self.assertRaisesMessage(ValueError, 'postgresql, sqlite'):
+            query_plans.plan_problems('', 'oracle')
@@ -7,14 +7,20 @@ from django.views.decorators.http import require_POST
 from datetime import datetime
 import random
 from decimal import Decimal
-from django.core.management import call_command
-from django.http import HttpResponse
+from django.db.models import Prefetch, Sum
+from django.http import Http404, HttpResponse
 
 from exam_project.common.models import BoughtGame, GameComment
 from exam_project.common.forms import GameCommentForm
+from exam_project.accounts.counters import adjust_user_counter
+from exam_project.accounts.user_context import user_context
+from exam_project.games.cache import bump_catalog_version
+from exam_project.games.importer import INITIAL_GAMES_FIXTURE, ImportFormatError, import_file
 from exam_project.games.forms import GameAddForm, GameEditForm
 from exam_project.games.models import GameModel
 from exam_project.games.pagination_sort import Pagination, SortingMixin
+from exam_project.games.purchases import AlreadyPurchased, GameNotFound, InsufficientFunds, OwnGame, purchase_game
+from exam_project.games.search import search_games
 
 
 class IndexView(Pagination, SortingMixin, views.ListView):
@@ -27,18 +33,18 @@ class IndexView(Pagination, SortingMixin, views.ListView):
         query = self.request.GET.get('q')
 
         if query:
-            queryset = queryset.filter(title__icontains=query)
+            queryset = search_games(queryset, query)
+            # Keep relevance order unless the user picked a sort explicitly
+            if 'sort' not in self.request.GET:
+                return queryset
 
         return self.apply_sorting(queryset)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        qs = self.get_queryset()
-
-        if self.request.user.is_authenticated:
-            context['user'] = self.request.user
-            context['profile_money'] = self.request.user.money
+        qs = self.object_list
 
+        # The balance comes from user_context (see accounts.user_context), read only by base.html
         context.update({
             'search_query': self.request.GET.get('q', ''),
             'per_page': self.get_paginate_by(qs),
@@ -62,14 +68,20 @@ class BoughtGamesView(Pagination, SortingMixin, LoginRequiredMixin, views.ListVi
     context_object_name = 'bought_games'
 
     def get_queryset(self):
-        qs = BoughtGame.objects.filter(user=self.request.user)
+        qs = BoughtGame.objects.filter(user=self.request.user).select_related('game')
         return self.apply_sorting(qs, prefix="game__")
 
+    def get_paginator(self, queryset, per_page, *args, **kwargs):
+        paginator = super().get_paginator(queryset, per_page, *args, **kwargs)
+        # bought_count is kept in step with BoughtGame rows, so no COUNT(*) is needed
+        paginator.count = user_context(self.request).owned_count
+        return paginator
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        qs = self.get_queryset()
+        qs = self.object_list
 
-        total_spent = sum(bg.game.price for bg in qs)
+        total_spent = qs.aggregate(total=Sum('game__price'))['total'] or 0
 
         context.update({
             'search_query': self.request.GET.get('q', ''),
@@ -100,13 +112,15 @@ class MyGamesView(Pagination, SortingMixin, LoginRequiredMixin, views.ListView):
         query = self.request.GET.get('q')
 
         if query:
-            qs = qs.filter(title__icontains=query)
+            qs = search_games(qs, query)
+            if 'sort' not in self.request.GET:
+                return qs
 
         return self.apply_sorting(qs)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        qs = self.get_queryset()
+        qs = self.object_list
 
         context.update({
             'search_query': self.request.GET.get('q', ''),
@@ -144,19 +158,22 @@ def game_add(request):
 
 @login_required
 def game_details(request, pk):
-    game = (
+    game = get_object_or_404(
         GameModel.objects
         .select_related("user")
-        .prefetch_related("gamecomment_set__user")
-        .get(pk=pk)
+        .prefetch_related(Prefetch(
+            "gamecomment_set",
+            queryset=GameComment.objects.select_related("user").order_by("created_at", "id"),
+        )),
+        pk=pk,
     )
 
     user = request.user
     is_owner = user == game.user
     is_bought = BoughtGame.objects.filter(user=user, game=game).exists()
 
-    # All comments already prefetched
-    comments = list(game.gamecomment_set.all().order_by("created_at"))
+    # All comments already prefetched, in order; re-ordering here would query again
+    comments = list(game.gamecomment_set.all())
     existing_comment = next((c for c in comments if c.user_id == user.id), None)
 
     if request.method == "POST" and not existing_comment:
@@ -167,6 +184,7 @@ def game_details(request, pk):
             comment.user = user
             comment.game = game
             comment.profile_picture = user.profile_picture  # same as serializer.save(profile_picture=user.profile_picture)
+            comment.profile_picture_variants = user.profile_picture_variants
             comment.save()
             return redirect("game details", pk=pk)
     else:
@@ -185,25 +203,20 @@ def game_details(request, pk):
 
 @login_required
 def game_buy(request, pk):
-    game = get_object_or_404(GameModel, pk=pk)
-    user = request.user
-
-    if game.user == user:
+    try:
+        game = purchase_game(request.user, pk)
+    except GameNotFound:
+        raise Http404("Game not found.")
+    except OwnGame:
         messages.error(request, "You cannot buy your own game.")
         return redirect("index")
-
-    purchase, created = BoughtGame.objects.get_or_create(user=user, game=game)
-    if not created:
+    except AlreadyPurchased:
         messages.warning(request, "You already own this game.")
         return redirect("index")
-
-    if user.money < game.price:
+    except InsufficientFunds:
         messages.error(request, "Not enough money to buy this game.")
         return redirect("index")
 
-    user.money -= game.price
-    user.save()
-
     messages.success(request, f"You bought {game.title} successfully!")
     return redirect("bought games")
 
@@ -242,7 +255,7 @@ def seed_games(request):
     categories = [c[0] for c in GameModel._meta.get_field("category").choices]
     now = datetime.now().strftime("%m%d%H%M%S")
 
-    GameModel.objects.bulk_create([
+    games = GameModel.objects.bulk_create([
         GameModel(
             title=f"Game {i} - {now}",
             category=random.choice(categories),
@@ -252,17 +265,19 @@ def seed_games(request):
         )
         for i in range(1, 20)
     ])
+    bump_catalog_version()
+    adjust_user_counter('games_count', {request.user.id: len(games)})
 
     return render(request, 'game/seed_games.html')
 
 
 @login_required
 def load_games(request):
-    if GameModel.objects.exists():
-        return HttpResponse("Games already exists. Skipping.")
-
     try:
-        call_command("loaddata", "initial_games.json")
-        return render(request, 'game/seed_games.html')
-    except Exception as e:
+        stats = import_file(INITIAL_GAMES_FIXTURE, update=False)
+    except (OSError, ImportFormatError) as e:
         return HttpResponse(f"Error loading games: {e}")
+
+    if not stats.created:
+        return HttpResponse("Games already exists. Skipping.")
+    return render(request, 'game/seed_games.html')
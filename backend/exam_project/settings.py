@@ -3,6 +3,7 @@ from datetime import timedelta
 from django.urls import reverse_lazy
 import os
 from dotenv import load_dotenv
+from corsheaders.defaults import default_headers
 
 # ==========================
 # Base Directory
@@ -31,6 +32,13 @@ ALLOWED_HOSTS = os.getenv("DJANGO_ALLOWED_HOSTS", "*").split(",")
 
 SESSION_COOKIE_NAME = os.getenv("SESSION_COOKIE_NAME", "sessionid")
 
+# "exam_project.accounts.sessions" gives cache-first sessions with lazy database
+# writes; it needs a cache backend shared by all workers (DJANGO_CACHE_BACKEND)
+SESSION_ENGINE = os.getenv("SESSION_ENGINE", "django.contrib.sessions.backends.db")
+# Non-login session changes reach django_session at most this often (seconds)
+SESSION_PERSIST_INTERVAL = int(os.getenv("SESSION_PERSIST_INTERVAL", "300"))
+SESSION_PURGE_BATCH_SIZE = int(os.getenv("SESSION_PURGE_BATCH_SIZE", "1000"))
+
 # ==========================
 # Installed Apps
 # ==========================
@@ -59,7 +67,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "exam_project.common.middleware.AsyncWhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -68,11 +76,30 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Opt-in SQL/serializer/template timing for a sample of requests (see common.instrumentation)
+REQUEST_METRICS = os.getenv("REQUEST_METRICS", "False") == "True"
+REQUEST_METRICS_SAMPLE_RATE = float(os.getenv("REQUEST_METRICS_SAMPLE_RATE", "0.05"))
+REQUEST_METRICS_DUPLICATE_THRESHOLD = int(os.getenv("REQUEST_METRICS_DUPLICATE_THRESHOLD", "3"))
+if REQUEST_METRICS:
+    MIDDLEWARE.insert(0, "exam_project.common.instrumentation.RequestMetricsMiddleware")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "exam_project.request_metrics": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
+
 # ==========================
-# URL & WSGI
+# URL & WSGI / ASGI
 # ==========================
 ROOT_URLCONF = "exam_project.urls"
 WSGI_APPLICATION = "exam_project.wsgi.application"
+ASGI_APPLICATION = "exam_project.asgi.application"
 
 # ==========================
 # Templates
@@ -97,17 +124,44 @@ TEMPLATES = [
 # ==========================
 # Database
 # ==========================
+# DB_POOL=True keeps each worker's connections in a pool (see common.db) instead
+# of opening a new Postgres connection for every request. Off until the
+# bench_db_pool numbers for this deployment justify it
+DB_POOL = os.getenv("DB_POOL", "False") == "True"
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "exam_project.common.db" if DB_POOL else "django.db.backends.postgresql",
         "NAME": os.getenv("DB_NAME", "examdb"),
         "USER": os.getenv("DB_USER", "examuser"),
         "PASSWORD": os.getenv("DB_PASSWORD", "exampass"),
         "HOST": os.getenv("DB_HOST", "db"),
         "PORT": os.getenv("DB_PORT", "5432"),
+        "POOL": {
+            # Open connections per worker (idle + in use), and how long a checkout waits for one
+            "MAX_SIZE": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            "TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            # Seconds before a connection is replaced, and idle seconds before a checkout pings it
+            "MAX_LIFETIME": int(os.getenv("DB_POOL_MAX_LIFETIME", "1800")),
+            "CHECK_IDLE": float(os.getenv("DB_POOL_CHECK_IDLE", "5")),
+        },
     }
 }
 
+# ==========================
+# Cache
+# ==========================
+# Local memory is per process: use a shared backend (e.g. Redis/Memcached)
+# when running more than one worker so catalog invalidation reaches all of them.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", ""),
+    }
+}
+
+CATALOG_CACHE_TIMEOUT = int(os.getenv("CATALOG_CACHE_TIMEOUT", "60"))
+
 # ==========================
 # Fixtures (IMPORTANT)
 # ==========================
@@ -131,12 +185,14 @@ CORS_ALLOWED_ORIGINS = [
 
 CSRF_TRUSTED_ORIGINS = CORS_ALLOWED_ORIGINS
 
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+
 # ==========================
 # Django REST Framework
 # ==========================
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "exam_project.accounts.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
@@ -145,6 +201,12 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 12,
 }
 
+# Stored Idempotency-Key responses are replayed for this long (seconds)
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", str(24 * 60 * 60)))
+# An unfinished first request older than this (seconds) is taken as dead and its key
+# can be claimed again; keep it above the worker timeout (gunicorn: 30s)
+IDEMPOTENCY_IN_PROGRESS_TIMEOUT = int(os.getenv("IDEMPOTENCY_IN_PROGRESS_TIMEOUT", "60"))
+
 # ==========================
 # JWT Settings
 # ==========================
@@ -153,6 +215,11 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
 }
 
+# Per-process LRU of users loaded by JWT authentication (see accounts.user_cache); 0 disables it.
+# It is also off unless DJANGO_CACHE_BACKEND is shared by the workers
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+
 # ==========================
 # Password Validation
 # ==========================
@@ -181,6 +248,17 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "mediafiles"
+# Media transfer offload to the front proxy (see common.media): "" streams from
+# Django, "x-accel-redirect" for nginx (an internal location at
+# MEDIA_ACCEL_PREFIX aliasing MEDIA_ROOT), "x-sendfile" for Apache/lighttpd
+MEDIA_ACCEL = os.getenv("MEDIA_ACCEL", "")
+MEDIA_ACCEL_PREFIX = os.getenv("MEDIA_ACCEL_PREFIX", "/protected-media/")
+# Cache lifetime of uploads without a content hash in their name (seconds)
+MEDIA_CACHE_MAX_AGE = int(os.getenv("MEDIA_CACHE_MAX_AGE", "3600"))
+
+# Resized derivatives of uploaded pictures (see common.images)
+IMAGE_VARIANT_WIDTHS = (160, 320, 640)
+IMAGE_VARIANTS_ASYNC = os.getenv("IMAGE_VARIANTS_ASYNC", "True") == "True"
 
 # ==========================
 # Authentication
@@ -1,5 +1,4 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import (
@@ -8,6 +7,8 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
+from exam_project.common.media import serve_media
+
 urlpatterns = [
     path("admin/", admin.site.urls),
 
@@ -21,12 +22,15 @@ urlpatterns = [
     path("api/games/", include("exam_project.games.api_urls")),
     path("api/common/", include("exam_project.common.api_urls")),
 
+    # Async read endpoints (ASGI), same payloads as their /api/ counterparts
+    path("api/async/games/", include("exam_project.games.async_urls")),
+    path("api/async/common/", include("exam_project.common.async_urls")),
+
     # Django template routes
     path("accounts/", include("exam_project.accounts.urls")),
     path("", include("exam_project.games.urls")),
     path("dashboard/", include("exam_project.common.urls")),
-]
 
-# Serve media files during development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    # Uploaded files, with or without DEBUG (offloaded to the proxy when MEDIA_ACCEL is set)
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", serve_media, name="media"),
+]